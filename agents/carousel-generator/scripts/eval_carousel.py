@@ -19,7 +19,10 @@ Usage:
       --research "/path/to/Superhuman.md" \
       --pillar pillar_01 \
       --max-iterations 5 \
-      --threshold 0.85
+      --threshold 0.85 \
+      --max-cost 2.00 \
+      --daily-budget 10.00 \
+      --ledger data/cost_ledger.sqlite
 """
 
 import sys
@@ -27,6 +30,7 @@ import os
 import json
 from pathlib import Path
 from dotenv import load_dotenv
+from agent_utils import BudgetExceeded, BudgetGuard, CostLedger
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
@@ -41,10 +45,16 @@ from src.carousel_pipeline.carousel_eval import (
     store_expected_output
 )
 from src.carousel_pipeline.prompt_iterator import iterate_prompt
-from src.carousel_pipeline.prompt_builder import load_prompt_template
+from src.carousel_pipeline.prompt_builder import build_carousel_prompt, load_prompt_template
 
 load_dotenv()
 
+# Must match generate_with_claude / analyze_diff_with_claude
+GENERATION_MODEL = "claude-sonnet-4-20250514"
+GENERATION_MAX_TOKENS = 8000
+ITERATION_MODEL = "claude-sonnet-4-20250514"
+ITERATION_MAX_TOKENS = 2000
+
 
 def store_expected_command(args):
     """Store expected output in Supabase."""
@@ -87,6 +97,8 @@ def eval_command(args):
     pillar_id = args.get("pillar")
     max_iterations = int(args.get("max_iterations", 5))
     threshold = float(args.get("threshold", 0.85))
+    max_cost = float(args["max_cost"]) if "max_cost" in args else None
+    daily_budget = float(args["daily_budget"]) if "daily_budget" in args else None
 
     if not all([research_path, pillar_id]):
         print("❌ Missing required arguments: --research, --pillar")
@@ -95,6 +107,10 @@ def eval_command(args):
     research_name = Path(research_path).stem
     supabase = get_supabase_client()
 
+    # Clients don't expose usage, so each call is charged its worst-case estimate
+    ledger = CostLedger(args["ledger"]) if "ledger" in args else None
+    guard = BudgetGuard(run_limit=max_cost, daily_limit=daily_budget, ledger=ledger, agent="carousel-generator")
+
     print("\n" + "="*70)
     print("🔬 CAROUSEL EVALUATION LOOP")
     print("="*70)
@@ -102,6 +118,8 @@ def eval_command(args):
     print(f"Pillar: {pillar_id}")
     print(f"Target threshold: {threshold}")
     print(f"Max iterations: {max_iterations}")
+    if max_cost is not None or daily_budget is not None:
+        print(f"Budget: ${guard.remaining():.2f} available")
 
     # Get expected output
     try:
@@ -123,6 +141,19 @@ def eval_command(args):
         print(f"ITERATION {iteration}/{max_iterations}")
         print("-"*70)
 
+        # A cheaper model would skew the eval, so over budget means stop, not downgrade
+        try:
+            generation = guard.check(
+                "anthropic",
+                GENERATION_MODEL,
+                user_prompt=build_carousel_prompt(Path(research_path).read_text(encoding="utf-8"), pillar_id),
+                max_output_tokens=GENERATION_MAX_TOKENS,
+                allow_downgrade=False
+            )
+        except BudgetExceeded as e:
+            print(f"\n🛑 Stopping before iteration {iteration}: {e.decision['reason']}")
+            break
+
         # Generate carousel
         print(f"\n🤖 Generating carousel...")
         carousel = generate_carousel_for_pillar(
@@ -130,6 +161,7 @@ def eval_command(args):
             pillar_id=pillar_id,
             use_chatgpt_tightening=False  # Eval on Claude output only
         )
+        guard.commit(generation, stage="generate")
 
         # Evaluate
         print(f"\n📊 Evaluating...")
@@ -162,16 +194,32 @@ def eval_command(args):
 
         # If not last iteration, iterate prompt
         if iteration < max_iterations:
+            generated = json.loads(json.dumps(carousel.model_dump(), default=str))
+
+            try:
+                rewrite = guard.check(
+                    "anthropic",
+                    ITERATION_MODEL,
+                    user_prompt=current_prompt + json.dumps([expected, generated, evaluation], default=str),
+                    max_output_tokens=ITERATION_MAX_TOKENS,
+                    allow_downgrade=False
+                )
+            except BudgetExceeded as e:
+                print(f"\n🛑 Stopping after iteration {iteration}: {e.decision['reason']}")
+                print(f"   Final score: {match_score:.2f}")
+                break
+
             print(f"\n🔄 Score below threshold. Iterating prompt...")
 
             iteration_result = iterate_prompt(
                 pillar_id=pillar_id,
                 expected=expected,
-                generated=json.loads(json.dumps(carousel.model_dump(), default=str)),
+                generated=generated,
                 evaluation=evaluation,
                 current_prompt=current_prompt,
                 current_version=current_version
             )
+            guard.commit(rewrite, stage="iterate")
 
             current_prompt = iteration_result["new_prompt"]
             current_version = iteration_result["version"]
@@ -188,13 +236,18 @@ def eval_command(args):
     print("EVALUATION COMPLETE")
     print("="*70)
 
+    if max_cost is not None or daily_budget is not None:
+        print(f"\n{guard.report()}")
+    if ledger is not None:
+        ledger.close()
+
 
 def main():
     """Main CLI entry point."""
     if len(sys.argv) < 2:
         print("Usage:")
         print("  python scripts/eval_carousel.py store-expected --research <name> --pillar <id> --expected-file <path>")
-        print("  python scripts/eval_carousel.py eval --research <path> --pillar <id> [--max-iterations 5] [--threshold 0.85]")
+        print("  python scripts/eval_carousel.py eval --research <path> --pillar <id> [--max-iterations 5] [--threshold 0.85] [--max-cost 2.00] [--daily-budget 10.00] [--ledger <path>]")
         sys.exit(1)
 
     command = sys.argv[1]
@@ -204,7 +257,8 @@ def main():
     i = 2
     while i < len(sys.argv):
         if sys.argv[i].startswith("--"):
-            key = sys.argv[i][2:]
+            # --max-cost -> max_cost, matching the keys the commands read
+            key = sys.argv[i][2:].replace("-", "_")
             if i + 1 < len(sys.argv):
                 value = sys.argv[i + 1]
                 args[key] = value
@@ -0,0 +1,7 @@
+"""
+Test configuration: make the scripts importable like running them from the agent root does.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
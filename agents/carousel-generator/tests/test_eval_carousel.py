@@ -0,0 +1,56 @@
+"""
+Tests for the eval_carousel CLI argument handling.
+"""
+import sys
+
+import pytest
+
+pytest.importorskip("anthropic")
+
+import eval_carousel
+
+
+class _GuardBuilt(Exception):
+    pass
+
+
+def test_budget_flags_reach_guard(monkeypatch):
+    """Hyphenated flags like --max-cost must reach BudgetGuard, not be dropped."""
+    captured = {}
+
+    def fake_guard(**kwargs):
+        captured.update(kwargs)
+        raise _GuardBuilt
+
+    monkeypatch.setattr(eval_carousel, "get_supabase_client", lambda: None)
+    monkeypatch.setattr(eval_carousel, "BudgetGuard", fake_guard)
+    monkeypatch.setattr(sys, "argv", [
+        "eval_carousel.py", "eval",
+        "--research", "Superhuman.md",
+        "--pillar", "pillar_01",
+        "--max-cost", "5",
+        "--daily-budget", "12.5",
+    ])
+
+    with pytest.raises(_GuardBuilt):
+        eval_carousel.main()
+
+    assert captured["run_limit"] == 5.0
+    assert captured["daily_limit"] == 12.5
+
+
+def test_store_expected_reads_hyphenated_flag(monkeypatch, tmp_path, capsys):
+    """--expected-file is read as expected_file."""
+    missing = tmp_path / "missing.json"
+    monkeypatch.setattr(sys, "argv", [
+        "eval_carousel.py", "store-expected",
+        "--research", "Superhuman",
+        "--pillar", "pillar_01",
+        "--expected-file", str(missing),
+    ])
+
+    # Gets past the required-argument check to the file lookup
+    with pytest.raises(SystemExit) as exc:
+        eval_carousel.main()
+    assert exc.value.code == 1
+    assert "Expected file not found" in capsys.readouterr().out
@@ -0,0 +1,130 @@
+"""Benchmark the database layer: bulk URL updates and concurrent load.
+
+Runs Database against a stand-in Supabase client that counts requests and
+sleeps a fixed round trip on execute() (like the sync supabase-py client
+does on the wire).
+
+- Bulk: mark_urls_processed vs the old one-update-per-URL loop.
+- Concurrent: many get_reddit_urls calls at once, with queries run inline
+  on the event loop (as before) vs on the DB thread pool. Reports wall time,
+  per-call latency and the longest event-loop stall seen by a 5 ms ticker.
+
+Usage:
+    python benchmarks/bench_db.py --urls 200 --rtt-ms 40 --concurrent 32
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from database.db import Database
+
+
+class FakeQuery:
+    """Chainable stand-in for a PostgREST query builder"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        self.client.requests += 1
+        time.sleep(self.client.rtt)
+        return self
+
+
+class FakeClient:
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.requests = 0
+
+    def schema(self, name):
+        return self
+
+    def table(self, name):
+        return FakeQuery(self)
+
+
+async def per_url_loop(db: Database, prospect_id: str, urls):
+    """mark_urls_processed as it was: one update per URL"""
+    for url in urls:
+        db.client.schema('case_studies_factory').table('brand_google_reddit').update({'processed': True}).eq('prospect_id', prospect_id).eq('url', url).execute()
+
+
+class InlineDatabase(Database):
+    """Database as it was: queries execute on the event loop thread"""
+
+    async def _execute(self, query):
+        return query.execute()
+
+
+async def concurrent_load(db: Database, calls: int):
+    """Run `calls` lookups at once; return wall time, p50/max latency and the longest loop stall"""
+    stall = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal stall
+        while not done.is_set():
+            before = time.perf_counter()
+            await asyncio.sleep(0.005)
+            stall = max(stall, time.perf_counter() - before - 0.005)
+
+    # Latency runs from when all calls were issued, so time spent queued behind a blocked loop counts
+    async def call(i: int):
+        await db.get_reddit_urls(f"p{i}")
+        return time.perf_counter() - start
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    latencies = sorted(await asyncio.gather(*(call(i) for i in range(calls))))
+    wall = time.perf_counter() - start
+    done.set()
+    await tick
+    return wall, latencies[len(latencies) // 2], latencies[-1], stall
+
+
+async def timed(label: str, fn, client: FakeClient):
+    client.requests = 0
+    start = time.perf_counter()
+    await fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {client.requests:>5} requests  {elapsed * 1000:>8.1f} ms")
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--urls", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=40.0)
+    parser.add_argument("--concurrent", type=int, default=32)
+    args = parser.parse_args()
+
+    client = FakeClient(args.rtt_ms / 1000)
+    db = Database.__new__(Database)
+    db.client = db.factory_schema = client
+    urls = [f"https://reddit.com/r/test/comments/{i:06d}" for i in range(args.urls)]
+
+    print(f"{args.urls} URLs, {args.rtt_ms:.0f} ms round trip")
+    loop = await timed("per-URL loop", lambda: per_url_loop(db, "p1", urls), client)
+    bulk = await timed("mark_urls_processed", lambda: db.mark_urls_processed("p1", urls), client)
+    print(f"speedup: {loop / bulk:.0f}x")
+
+    print(f"\n{args.concurrent} concurrent get_reddit_urls calls")
+    print(f"{'':<14} {'wall ms':>9} {'p50 ms':>9} {'max ms':>9} {'loop stall ms':>14}")
+    for label, cls in (("inline", InlineDatabase), ("thread pool", Database)):
+        db = cls.__new__(cls)
+        db.client = db.factory_schema = client
+        wall, p50, worst, stall = await concurrent_load(db, args.concurrent)
+        print(f"{label:<14} {wall * 1000:>9.1f} {p50 * 1000:>9.1f} {worst * 1000:>9.1f} {stall * 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""Benchmark near-duplicate collapsing on synthetic Reddit comments.
+
+Generates comments from a Zipf-distributed vocabulary and plants lightly
+edited copies (a word inserted, dropped or swapped, punctuation, a prefix)
+of a share of them. DataProcessor.collapse_near_duplicates runs at several
+sizes to show the time grows linearly, and the planted copies measure recall
+and precision.
+
+Usage:
+    python benchmarks/bench_near_dup.py --rows 100000 --dup-rate 0.2
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from modules.data_processor import DataProcessor
+from utils.simhash import NEAR_DUPLICATE_DISTANCE
+
+
+def vocabulary(size: int, rng: random.Random):
+    return ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9))) for _ in range(size)]
+
+
+def edit(text: str, words, rng: random.Random) -> str:
+    tokens = text.split()
+    change = rng.randrange(5)
+    if change == 0:
+        tokens.insert(rng.randrange(len(tokens) + 1), rng.choice(words))
+    elif change == 1 and len(tokens) > 8:
+        del tokens[rng.randrange(len(tokens))]
+    elif change == 2:
+        tokens[rng.randrange(len(tokens))] = rng.choice(words)
+    elif change == 3:
+        tokens[-1] += rng.choice(["!", "!!", "?", " lol", "."])
+    else:
+        tokens.insert(0, rng.choice(["honestly", "same", "this", "exactly"]))
+    return " ".join(tokens)
+
+
+def synthetic_items(n: int, dup_rate: float, seed: int = 0):
+    """Items plus, per item, the id of the original it copies (its own id if original)"""
+    rng = random.Random(seed)
+    words = vocabulary(5000, rng)
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    items, origin = [], []
+    for i in range(n):
+        if items and rng.random() < dup_rate:
+            source = rng.randrange(len(items))
+            text = edit(items[source]['text'], words, rng)
+            origin.append(origin[source])
+        else:
+            text = " ".join(rng.choices(words, weights, k=rng.randint(10, 80)))
+            origin.append(i)
+        items.append({'id': i, 'text': text, 'upVotes': rng.randint(0, 100)})
+    return items, origin
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dup-rate", type=float, default=0.2)
+    parser.add_argument("--distance", type=int, default=NEAR_DUPLICATE_DISTANCE)
+    args = parser.parse_args()
+
+    processor = DataProcessor(near_duplicate_distance=args.distance)
+    for rows in (args.rows // 4, args.rows // 2, args.rows):
+        items, origin = synthetic_items(rows, args.dup_rate)
+        start = time.perf_counter()
+        kept = processor.collapse_near_duplicates([dict(item) for item in items])
+        elapsed = time.perf_counter() - start
+
+        originals = len(set(origin))
+        kept_origins = [origin[item['id']] for item in kept]
+        # Recall: planted copies removed. Precision: kept items that are distinct originals.
+        removed_copies = rows - originals - (len(kept) - len(set(kept_origins)))
+        recall = removed_copies / max(rows - originals, 1)
+        precision = len(set(kept_origins)) / originals
+        print(
+            f"{rows:>8} rows  {elapsed:>6.2f} s  {rows / elapsed / 1e3:>5.1f}k rows/s  "
+            f"kept {len(kept)} of {originals} originals  recall {recall:.3f}  originals kept {precision:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
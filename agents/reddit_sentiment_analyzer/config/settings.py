@@ -30,6 +30,21 @@ class Settings:
         self.MAX_REDDIT_URLS = 10
         self.MAX_POSTS_PER_URL = 20
         self.MAX_COMMENTS_PER_POST = 20
+        self.MAX_CONCURRENT_SCRAPES = 5
+        self.SCRAPE_TIMEOUT_SECONDS = 310.0  # Per URL; Apify sync runs cap at 300 s
+        self.APIFY_ASYNC_RUNS = False  # Start runs + page datasets instead of the sync endpoint
+        self.APIFY_RUN_TIMEOUT_SECONDS = 1800.0  # Per run in async mode
+        self.SCRAPE_CACHE_DIR = "data/scrape_cache"
+        self.SCRAPE_CACHE_TTL_HOURS = 72  # Older scrapes are refreshed from Apify
+        self.INCREMENTAL_REFRESH = True  # Refreshes keep stored rows and add only new posts/comments
+        self.PIPELINE_QUEUE_SIZE = 4  # Batches buffered between pipeline stages
+        self.DB_MAX_WORKERS = 8  # Threads running blocking supabase queries off the event loop
+        self.APIFY_MAX_CONCURRENT_RUNS = 8  # Across all prospects in a batch run
+        self.OPENAI_MAX_CONCURRENT = 4  # Analyses in flight across all prospects
+        self.BATCH_CONCURRENCY = 4  # Prospects processed at once in batch mode
+        self.BATCH_CHECKPOINT = "data/batch_checkpoint.json"
+        self.GOOGLE_QUERY_VARIANTS = ["reddit:{brand}"]  # Query templates per brand in batched search
+        self.GOOGLE_QUERIES_PER_RUN = 50  # Queries submitted together in one Google-search actor run
 
 
 @lru_cache()
@@ -2,16 +2,40 @@
 Database connection and operations
 """
 
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from supabase import create_client, Client
 from config.settings import get_settings
 from typing import Optional, List, Dict, Any
 
 settings = get_settings()
 
+# supabase-py is synchronous; queries run here so they never block the event loop.
+# Shared by every Database instance. Threads share each client's httpx pool, so
+# keep this under its 20 keep-alive connections.
+_executor = ThreadPoolExecutor(max_workers=settings.DB_MAX_WORKERS, thread_name_prefix="supabase")
+
+# URLs per `in_` filter; PostgREST puts filters in the query string, so keep it well under URL limits
+URL_FILTER_CHUNK = 100
+
 
 class Database:
     def __init__(self):
         self.client: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+        # client.schema() builds a new PostgREST client, with its own httpx session, on
+        # every call; build it once so case_studies_factory queries reuse pooled connections
+        self.factory_schema = self.client.schema('case_studies_factory')
+        self._close_factory_schema = weakref.finalize(self, self.factory_schema.aclose)
+    
+    def close(self) -> None:
+        """Close the case_studies_factory client's connections (also done when the instance is collected)"""
+        self._close_factory_schema()
+    
+    async def _execute(self, query: Any) -> Any:
+        """Run a built PostgREST query on the DB thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, query.execute)
     
     def _map_prospect_to_app(self, db_prospect: Dict[str, Any]) -> Dict[str, Any]:
         """Map dim_prospects columns to app format"""
@@ -41,7 +65,7 @@ class Database:
 
     async def get_prospect_by_name(self, brand_name: str) -> Optional[Dict[str, Any]]:
         """Get prospect by brand name"""
-        response = self.client.table('dim_prospects').select('*').eq('company_name', brand_name).execute()
+        response = await self._execute(self.client.table('dim_prospects').select('*').eq('company_name', brand_name))
         if response.data:
             return self._map_prospect_to_app(response.data[0])
         return None
@@ -49,30 +73,48 @@ class Database:
     async def create_prospect(self, prospect_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create new prospect"""
         db_data = self._map_app_to_prospect(prospect_data)
-        response = self.client.table('dim_prospects').insert(db_data).execute()
+        response = await self._execute(self.client.table('dim_prospects').insert(db_data))
         return self._map_prospect_to_app(response.data[0])
 
+    async def get_prospects_by_names(self, brand_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get prospects for many brand names in one request, keyed by brand name"""
+        if not brand_names:
+            return {}
+        response = await self._execute(self.client.table('dim_prospects').select('*').in_('company_name', list(brand_names)))
+        prospects = [self._map_prospect_to_app(p) for p in response.data]
+        return {p['brand_name']: p for p in prospects}
+
     async def get_all_prospects(self) -> List[Dict[str, Any]]:
         """Get all prospects"""
-        response = self.client.table('dim_prospects').select('*').execute()
+        response = await self._execute(self.client.table('dim_prospects').select('*'))
         return [self._map_prospect_to_app(p) for p in response.data]
 
     async def update_prospect(self, prospect_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
         """Update prospect"""
         db_data = self._map_app_to_prospect(data)
-        response = self.client.table('dim_prospects').update(db_data).eq('id', prospect_id).execute()
+        response = await self._execute(self.client.table('dim_prospects').update(db_data).eq('id', prospect_id))
         return self._map_prospect_to_app(response.data[0])
     
     async def insert_reddit_urls(self, urls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Insert Reddit URLs"""
-        response = self.client.schema('case_studies_factory').table('brand_google_reddit').insert(urls).execute()
+        response = await self._execute(self.factory_schema.table('brand_google_reddit').insert(urls))
         return response.data
 
     async def get_reddit_urls(self, prospect_id: str) -> List[Dict[str, Any]]:
         """Get Reddit URLs for prospect"""
-        response = self.client.schema('case_studies_factory').table('brand_google_reddit').select('*').eq('prospect_id', prospect_id).execute()
+        response = await self._execute(self.factory_schema.table('brand_google_reddit').select('*').eq('prospect_id', prospect_id))
         return response.data
 
+    async def get_reddit_urls_for_prospects(self, prospect_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Get Reddit URLs for many prospects in one request, grouped by prospect"""
+        grouped: Dict[str, List[Dict[str, Any]]] = {prospect_id: [] for prospect_id in prospect_ids}
+        if not prospect_ids:
+            return grouped
+        response = await self._execute(self.factory_schema.table('brand_google_reddit').select('*').in_('prospect_id', list(prospect_ids)))
+        for row in response.data:
+            grouped.setdefault(row['prospect_id'], []).append(row)
+        return grouped
+
     async def insert_posts_comments(self, data: List[Dict[str, Any]]) -> None:
         """Bulk insert posts and comments"""
         if not data:
@@ -82,15 +124,44 @@ class Database:
         chunk_size = 1000
         for i in range(0, len(data), chunk_size):
             chunk = data[i:i + chunk_size]
-            self.client.schema('case_studies_factory').table('brand_reddit_posts_comments').insert(chunk).execute()
+            await self._execute(self.factory_schema.table('brand_reddit_posts_comments').insert(chunk))
+
+    async def get_posts_comments(self, prospect_id: str, urls: List[str]) -> List[Dict[str, Any]]:
+        """Stored posts/comments for a prospect's URLs (all pages; PostgREST caps a response at 1000 rows)"""
+        rows: List[Dict[str, Any]] = []
+        page_size = 1000
+        for i in range(0, len(urls), URL_FILTER_CHUNK):
+            chunk = urls[i:i + URL_FILTER_CHUNK]
+            offset = 0
+            while True:
+                response = await self._execute(self.factory_schema.table('brand_reddit_posts_comments').select('*').eq('prospect_id', prospect_id).in_('url', chunk).range(offset, offset + page_size - 1))
+                rows.extend(response.data)
+                if len(response.data) < page_size:
+                    break
+                offset += page_size
+        return rows
+
+    async def delete_posts_comments(self, prospect_id: str, urls: List[str]) -> None:
+        """Delete scraped posts/comments for URLs (before re-inserting a refreshed scrape)"""
+        await asyncio.gather(*(
+            self._execute(self.factory_schema.table('brand_reddit_posts_comments').delete().eq('prospect_id', prospect_id).in_('url', urls[i:i + URL_FILTER_CHUNK]))
+            for i in range(0, len(urls), URL_FILTER_CHUNK)
+        ))
 
     async def insert_analysis_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
         """Insert analysis result"""
-        response = self.client.schema('case_studies_factory').table('reddit_brand_analysis_results').insert(result).execute()
+        response = await self._execute(self.factory_schema.table('reddit_brand_analysis_results').insert(result))
         return response.data[0]
 
     async def mark_urls_processed(self, prospect_id: str, urls: List[str]) -> None:
-        """Mark URLs as processed after scraping"""
-        for url in urls:
-            self.client.schema('case_studies_factory').table('brand_google_reddit').update({'processed': True}).eq('prospect_id', prospect_id).eq('url', url).execute()
+        """Mark URLs as processed after scraping (one request per URL_FILTER_CHUNK URLs)"""
+        await self.set_urls_processed(prospect_id, urls, True)
+
+    async def set_urls_processed(self, prospect_id: str, urls: List[str], processed: bool) -> None:
+        """Set the processed flag on many URLs with an `in_` filter instead of one update per URL"""
+        unique_urls = list(dict.fromkeys(urls))
+        await asyncio.gather(*(
+            self._execute(self.factory_schema.table('brand_google_reddit').update({'processed': processed}).eq('prospect_id', prospect_id).in_('url', unique_urls[i:i + URL_FILTER_CHUNK]))
+            for i in range(0, len(unique_urls), URL_FILTER_CHUNK)
+        ))
 
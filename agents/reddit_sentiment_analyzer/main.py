@@ -3,7 +3,10 @@ Brand Reddit Analysis - Main Workflow
 Orchestrates the complete brand analysis pipeline
 """
 
+import argparse
 import asyncio
+import time
+from typing import Any, Dict, List, Optional
 from rich.console import Console
 from rich.prompt import Prompt, Confirm
 from modules.brand_selector import BrandSelector
@@ -11,10 +14,15 @@ from modules.google_search import GoogleSearcher
 from modules.reddit_scraper import RedditScraper
 from modules.data_processor import DataProcessor
 from modules.analysis import Analyzer
+from config.settings import get_settings
+from utils.checkpoint import BatchCheckpoint
+from utils.limits import service_limit
 from utils.logger import setup_logger
+from utils.streams import buffered, collect
 
 console = Console()
 logger = setup_logger()
+settings = get_settings()
 
 
 async def main():
@@ -34,9 +42,9 @@ async def main():
     choice = Prompt.ask("\nEnter your choice", choices=["1", "2", "3"], default="2")
 
     if choice == "1":
-        # Run all prospects
-        prospects = await brand_selector.get_all_prospects()
-        console.print(f"[green]Found {len(prospects)} prospects to analyze[/green]")
+        # Run all prospects concurrently, same as `python main.py --all`
+        await batch_main(settings.BATCH_CONCURRENCY, settings.BATCH_CHECKPOINT)
+        return
 
     elif choice == "2":
         # Select from existing prospects
@@ -75,8 +83,60 @@ async def main():
         await process_prospect(prospect)
 
 
-async def process_prospect(prospect: dict):
-    """Process a single prospect through the entire pipeline"""
+async def batch_main(concurrency: int, checkpoint_path: str, retry_failed: bool = False):
+    """Non-interactive: run every prospect, `concurrency` at a time, resuming from the checkpoint"""
+    console.print("\n[bold cyan]🔍 Brand Reddit Analysis Tool - batch mode[/bold cyan]\n")
+    
+    prospects = await BrandSelector().get_all_prospects()
+    checkpoint = BatchCheckpoint(checkpoint_path)
+    todo = [p for p in prospects if not checkpoint.should_skip(p['id'], retry_failed)]
+    console.print(
+        f"[green]{len(prospects)} prospects: {len(prospects) - len(todo)} skipped per checkpoint, "
+        f"{len(todo)} to run ({concurrency} at a time)[/green]"
+    )
+    
+    # One batched search for every brand instead of one actor run each
+    start = time.perf_counter()
+    found = await GoogleSearcher().search_many([p['brand_name'] for p in todo]) if todo else {}
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def run(prospect: dict) -> Dict[str, Any]:
+        async with semaphore:
+            checkpoint.update(prospect['id'], prospect['brand_name'], 'running')
+            started = time.perf_counter()
+            outcome = await process_prospect(prospect, found.get(prospect['brand_name']))
+            outcome['seconds'] = round(time.perf_counter() - started, 1)
+            checkpoint.update(prospect['id'], prospect['brand_name'], **outcome)
+            return outcome
+    
+    outcomes = await asyncio.gather(*(run(p) for p in todo))
+    elapsed = time.perf_counter() - start
+    
+    # Aggregate throughput
+    by_status: Dict[str, int] = {}
+    for outcome in outcomes:
+        by_status[outcome['status']] = by_status.get(outcome['status'], 0) + 1
+    items = sum(outcome.get('items', 0) for outcome in outcomes)
+    console.print(f"\n[bold cyan]Batch complete in {elapsed:.0f}s[/bold cyan]")
+    console.print(f"Prospects: {', '.join(f'{n} {status}' for status, n in sorted(by_status.items())) or 'none run'}")
+    if outcomes and elapsed > 0:
+        console.print(
+            f"Throughput: {len(outcomes) / elapsed * 60:.1f} prospects/min, "
+            f"{items / elapsed:.1f} cleaned items/s"
+        )
+    console.print(f"Checkpoint: {checkpoint.path}")
+
+
+async def process_prospect(prospect: dict, reddit_urls: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+    """
+    Process a single prospect through the entire pipeline.
+    
+    Pass reddit_urls (e.g. from a batched GoogleSearcher.search_many) to skip the search.
+    
+    Returns:
+        {'status': 'done' | 'no_urls' | 'failed', 'items': cleaned item count, 'error'?}
+    """
     brand_name = prospect['brand_name']
     prospect_id = prospect['id']
     
@@ -84,46 +144,69 @@ async def process_prospect(prospect: dict):
     
     try:
         # Step 2: Google Search for Reddit URLs
-        console.print(f"[yellow]Step 2: Searching Reddit URLs for {brand_name}[/yellow]")
         searcher = GoogleSearcher()
-        reddit_urls = await searcher.search_reddit_urls(brand_name, prospect.get('industry_category', ''))
+        if reddit_urls is None:
+            console.print(f"[yellow]Step 2: Searching Reddit URLs for {brand_name}[/yellow]")
+            reddit_urls = await searcher.search_reddit_urls(brand_name, prospect.get('industry_category', ''))
         
         if not reddit_urls:
             console.print(f"[red]No Reddit URLs found for {brand_name}[/red]")
-            return
+            return {'status': 'no_urls', 'items': 0}
         
         console.print(f"[green]Found {len(reddit_urls)} Reddit URLs[/green]")
         
         # Step 3: Update prospect with URLs
         await searcher.update_prospect_urls(prospect_id, reddit_urls, brand_name)
         
-        # Step 4: Scrape Reddit Posts & Comments
+        # Steps 4-5 run as one stream: each URL's records are stored and cleaned as soon as
+        # it's scraped, while the other URLs are still scraping. Bounded queues between the
+        # stages keep a slow stage from letting raw records pile up in memory.
         console.print(f"[yellow]Step 3: Scraping Reddit posts & comments[/yellow]")
+        console.print(f"[yellow]Step 4: Processing and cleaning data as it arrives[/yellow]")
         scraper = RedditScraper()
-        posts_comments = await scraper.scrape_all_urls(reddit_urls, brand_name, prospect_id)
-        
-        console.print(f"[green]Scraped {len(posts_comments)} posts/comments[/green]")
-        
-        # Step 5: Process & Clean Data
-        console.print(f"[yellow]Step 4: Processing and cleaning data[/yellow]")
         processor = DataProcessor()
-        cleaned_data = await processor.process_data(posts_comments, brand_name, prospect_id)
+        queue_size = settings.PIPELINE_QUEUE_SIZE
+        
+        scraped = buffered(scraper.stream_batches(reddit_urls, brand_name, prospect_id), queue_size)
+        stored = buffered(scraper.store_stream(scraped, brand_name, prospect_id), queue_size)
+        cleaned_data = await collect(processor.process_stream(stored, brand_name, prospect_id))
+        cleaned_data = processor.collapse_near_duplicates(cleaned_data)
         
         console.print(f"[green]Cleaned data: {len(cleaned_data)} valid items[/green]")
         
         # Step 6: Run Analysis
         console.print(f"[yellow]Step 5: Running ChatGPT analysis[/yellow]")
         analyzer = Analyzer()
-        analysis_result = await analyzer.analyze(cleaned_data, brand_name, prospect_id)
+        async with service_limit('openai'):
+            analysis_result = await analyzer.analyze(cleaned_data, brand_name, prospect_id)
         
         console.print(f"[bold green]✓ Analysis complete for {brand_name}![/bold green]")
         console.print(f"[cyan]Key Insight:[/cyan] {analysis_result['key_insight'][:200]}...")
+        return {'status': 'done', 'items': len(cleaned_data)}
         
     except Exception as e:
         logger.error(f"Error processing {brand_name}: {str(e)}")
         console.print(f"[red]Error: {str(e)}[/red]")
+        return {'status': 'failed', 'items': 0, 'error': str(e)}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Brand Reddit Analysis")
+    parser.add_argument("--all", action="store_true",
+                        help="Analyze every prospect without prompts (batch mode)")
+    parser.add_argument("--concurrency", type=int, default=settings.BATCH_CONCURRENCY,
+                        help="Prospects processed at once in batch mode")
+    parser.add_argument("--checkpoint", default=settings.BATCH_CHECKPOINT,
+                        help="Per-prospect status file; finished prospects are skipped on restart")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="Also rerun prospects that failed in an earlier batch run")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_args()
+    if args.all:
+        asyncio.run(batch_main(args.concurrency, args.checkpoint, args.retry_failed))
+    else:
+        asyncio.run(main())
 
@@ -0,0 +1,201 @@
+"""
+Apify Run Orchestrator
+Starts actor runs asynchronously, polls them and pages through their datasets
+
+The run-sync-get-dataset-items endpoint holds a connection open for up to
+300 s and returns the whole dataset in one response. Here a run is started
+(POST /acts/{actor}/runs), polled with Apify's long-poll waitForFinish
+parameter, and its dataset read back in pages, so runs can take as long as
+they need and items arrive a page at a time.
+"""
+
+import asyncio
+import time
+import httpx
+from typing import Any, AsyncIterator, Dict, List, Optional
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+APIFY_BASE_URL = "https://api.apify.com/v2"
+TERMINAL_STATUSES = {"SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT"}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class ApifyRunError(RuntimeError):
+    """An actor run finished without succeeding, or didn't finish in time"""
+
+    def __init__(self, message: str, run: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.run = run or {}
+
+
+class ApifyOrchestrator:
+    """
+    Start, poll and read Apify actor runs without blocking on the sync endpoint.
+
+    Pass a shared httpx.AsyncClient to pool connections across many runs;
+    otherwise one is created and closed with the orchestrator.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        client: Optional[httpx.AsyncClient] = None,
+        base_url: str = APIFY_BASE_URL,
+        poll_interval: float = 5.0,
+        wait_seconds: int = 60,
+        page_size: int = 1000,
+        max_retries: int = 3
+    ):
+        self.token = token
+        self.base_url = base_url.rstrip('/')
+        self.poll_interval = poll_interval
+        self.wait_seconds = wait_seconds  # Apify long-polls up to 60 s per status request
+        self.page_size = page_size
+        self.max_retries = max_retries
+        self._own_client = client is None
+        self.client = client or httpx.AsyncClient(timeout=wait_seconds + 30.0)
+
+    async def __aenter__(self) -> "ApifyOrchestrator":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._own_client:
+            await self.client.aclose()
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Call the Apify API, retrying rate limits and server errors with backoff"""
+        params = {"token": self.token, **kwargs.pop("params", {})}
+        for attempt in range(self.max_retries + 1):
+            response = await self.client.request(method, f"{self.base_url}{path}", params=params, **kwargs)
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                response.raise_for_status()
+                return response
+            delay = min(30.0, 2 ** attempt)
+            logger.warning(f"Apify {method} {path} returned {response.status_code}, retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+
+    async def start_run(self, actor: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Start an actor run and return the run object (id, status, defaultDatasetId)"""
+        response = await self._request(
+            "POST", f"/acts/{actor}/runs",
+            json=payload, headers={"Content-Type": "application/json"}
+        )
+        run = response.json()["data"]
+        logger.info(f"Started Apify run {run['id']} ({actor})")
+        return run
+
+    async def get_run(self, run_id: str, wait: int = 0) -> Dict[str, Any]:
+        """Fetch a run, long-polling up to `wait` seconds for it to finish"""
+        params = {"waitForFinish": wait} if wait else {}
+        response = await self._request("GET", f"/actor-runs/{run_id}", params=params)
+        return response.json()["data"]
+
+    async def abort_run(self, run_id: str) -> None:
+        """Abort a run (best effort - stops Apify billing for abandoned runs)"""
+        try:
+            await self._request("POST", f"/actor-runs/{run_id}/abort")
+            logger.info(f"Aborted Apify run {run_id}")
+        except httpx.HTTPError as e:
+            logger.warning(f"Could not abort Apify run {run_id}: {str(e)}")
+
+    async def wait_for_run(self, run_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Poll a run until it finishes.
+
+        Raises:
+            ApifyRunError: If the run fails, is aborted, times out on Apify's
+                           side, or doesn't finish within `timeout` seconds
+                           (the run is then aborted)
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        try:
+            while True:
+                run = await self.get_run(run_id, wait=self.wait_seconds)
+                status = run.get("status")
+                if status in TERMINAL_STATUSES:
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    await self.abort_run(run_id)
+                    raise ApifyRunError(f"Apify run {run_id} still {status} after {timeout:.0f}s", run)
+                await asyncio.sleep(self.poll_interval)
+        except asyncio.CancelledError:
+            # Caller gave up (e.g. a per-URL timeout) - don't leave the run billing
+            await asyncio.shield(self.abort_run(run_id))
+            raise
+
+        if status != "SUCCEEDED":
+            raise ApifyRunError(f"Apify run {run_id} finished with status {status}", run)
+        return run
+
+    async def iter_dataset_pages(
+        self,
+        dataset_id: str,
+        page_size: Optional[int] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield dataset items a page at a time"""
+        limit = page_size or self.page_size
+        offset = 0
+        while True:
+            response = await self._request(
+                "GET", f"/datasets/{dataset_id}/items",
+                params={"offset": offset, "limit": limit, "clean": "true", "format": "json"}
+            )
+            items = response.json()
+            if items:
+                yield items
+            offset += len(items)
+
+            total = response.headers.get("x-apify-pagination-total")
+            if len(items) < limit or (total is not None and offset >= int(total)):
+                return
+
+    async def run_actor_pages(
+        self,
+        actor: str,
+        payload: Dict[str, Any],
+        timeout: Optional[float] = None,
+        page_size: Optional[int] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Start a run, wait for it and yield its dataset a page at a time"""
+        run = await self.start_run(actor, payload)
+        run = await self.wait_for_run(run["id"], timeout=timeout)
+        async for page in self.iter_dataset_pages(run["defaultDatasetId"], page_size):
+            yield page
+
+    async def run_actor(
+        self,
+        actor: str,
+        payload: Dict[str, Any],
+        timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Start a run, wait for it and return all dataset items"""
+        items = []
+        async for page in self.run_actor_pages(actor, payload, timeout=timeout):
+            items.extend(page)
+        return items
+
+    async def run_many(
+        self,
+        actor: str,
+        payloads: List[Dict[str, Any]],
+        max_concurrent: int = 5,
+        timeout: Optional[float] = None
+    ) -> List[Any]:
+        """
+        Run one actor over many inputs concurrently.
+
+        Returns:
+            Items per payload, in order; a failed run's entry is its exception
+        """
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def run(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self.run_actor(actor, payload, timeout=timeout)
+
+        return await asyncio.gather(*(run(payload) for payload in payloads), return_exceptions=True)
@@ -8,8 +8,11 @@ using multi-lens framework for product strategy
 import sys
 import os
 import json
+import heapq
+import math
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from pathlib import Path
 
 # Add credentials path
@@ -18,17 +21,47 @@ from get_credential import get_credential
 
 import requests
 
-
-def analyze_reddit_data(app_name: str, reddit_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+# Token budget for the Reddit posts in the prompt; the template and the memo come on top
+CONTEXT_TOKEN_BUDGET = 20000
+# Rough tokens per character of English text; close enough to plan a budget without a tokenizer
+TOKENS_PER_CHAR = 0.25
+
+# Map-reduce mode, for corpora that don't fit CONTEXT_TOKEN_BUDGET: a cheaper model extracts
+# findings per shard in parallel, the memo model writes from the merged findings
+MAP_MODEL = "gpt-4o-mini"
+REDUCE_MODEL = "gpt-4o"
+SHARD_TOKEN_BUDGET = 12000  # Posts per map call
+MAP_MAX_TOKENS = 2000  # Findings per shard
+MAP_MAX_WORKERS = 8  # Shards in flight at once
+SAMPLE_TOKEN_BUDGET = 6000  # Verbatim posts sent with the merged findings, for quotes
+
+ANALYST_SYSTEM_PROMPT = "You are a Senior Product Data Scientist + Behavioral Scientist + Cultural Intelligence Analyst. You produce rigorous, evidence-based intelligence memos for growth leaders."
+EXTRACTOR_SYSTEM_PROMPT = "You extract structured, evidence-backed findings from Reddit discussions. You answer with JSON only."
+
+FINDINGS_SCHEMA = """{
+  "themes": [{"theme": str, "sentiment": "positive|negative|mixed|neutral", "posts": int, "evidence": [verbatim quotes]}],
+  "pain_points": [{"pain": str, "posts": int, "quote": str}],
+  "motivations": [{"motivation": str, "posts": int, "quote": str}],
+  "behaviors": [{"behavior": str, "posts": int, "quote": str}],
+  "language": [distinctive phrases users use],
+  "competitors": [{"name": str, "context": str}]
+}"""
+
+
+def analyze_reddit_data(app_name: str, reddit_data: List[Dict[str, Any]], mode: str = "auto") -> Dict[str, Any]:
     """
     Analyze Reddit data using behavioral intelligence framework
 
     Args:
         app_name: Name of the app
         reddit_data: List of cleaned Reddit posts/comments
+        mode: "single" packs posts into one prompt, "map_reduce" covers every post
+            through per-shard findings, "auto" map-reduces when the posts don't fit
+            CONTEXT_TOKEN_BUDGET
 
     Returns:
-        dict with 'markdown' (full memo) and 'json' (structured data)
+        dict with 'markdown' (full memo), 'json' (structured data) and 'context'
+        (what the memo was written from)
     """
 
     print(f"  🧠 Running behavioral intelligence analysis for {app_name}...")
@@ -36,8 +69,24 @@ def analyze_reddit_data(app_name: str, reddit_data: List[Dict[str, Any]]) -> Dic
     # Get API key from Bitwarden (using OpenAI for deep analysis)
     api_key = get_credential("Open AI", "api_key")
 
+    if mode == "auto":
+        corpus_tokens = sum(estimate_tokens(format_post(post, len(reddit_data))) for post in reddit_data)
+        mode = "map_reduce" if corpus_tokens > CONTEXT_TOKEN_BUDGET else "single"
+
     # Prepare Reddit data for analysis
-    data_summary = prepare_reddit_data_summary(reddit_data)
+    if mode == "map_reduce":
+        data_summary, context = map_reduce_reddit_data(api_key, app_name, reddit_data)
+        print(
+            f"  🗂️  Extracted findings from {context['included']}/{context['total']} posts in "
+            f"{context['shards'] - context['shards_failed']}/{context['shards']} shards"
+        )
+    else:
+        data_summary, context = pack_reddit_data(reddit_data)
+        print(
+            f"  📦 Packed {context['included']}/{context['total']} posts into "
+            f"~{context['tokens']}/{context['budget']} tokens across {len(context['subreddits'])} subreddits"
+        )
+    context['mode'] = mode
 
     # Get metadata
     metadata = extract_metadata(app_name, reddit_data)
@@ -46,7 +95,7 @@ def analyze_reddit_data(app_name: str, reddit_data: List[Dict[str, Any]]) -> Dic
     prompt = create_behavioral_analysis_prompt(app_name, data_summary, metadata)
 
     # Call OpenAI API
-    response = call_openai_api(api_key, prompt)
+    response = call_openai_api(api_key, prompt, model=REDUCE_MODEL)
 
     # Parse response
     markdown = response
@@ -56,32 +105,274 @@ def analyze_reddit_data(app_name: str, reddit_data: List[Dict[str, Any]]) -> Dic
 
     return {
         'markdown': markdown,
-        'json': json_data
+        'json': json_data,
+        'context': context
     }
 
 
-def prepare_reddit_data_summary(reddit_data: List[Dict[str, Any]]) -> str:
-    """Format Reddit data for analysis"""
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of text"""
+    return math.ceil(len(text) * TOKENS_PER_CHAR)
+
+
+def format_post(post: Dict[str, Any], number: int) -> str:
+    """One post as it appears in the prompt"""
+
+    block = f"\n---\n[Post {number}]\n"
+    block += f"Subreddit: {post.get('subreddit', 'Unknown')}\n"
+    block += f"Date: {post.get('createdAt', 'Unknown')}\n"
+    block += f"Upvotes: {post.get('upVotes', 0)}\n"
+    if post.get('duplicateCount', 1) > 1:
+        block += f"Echoed: {post['duplicateCount']} near-identical posts/comments\n"
+    block += f"Text: {post.get('text', '')}\n"
+    return block
+
+
+def relevance(post: Dict[str, Any]) -> float:
+    """How much a post is worth to the analysis: upvotes and echoes, with diminishing returns"""
+    return 1.0 + math.log1p(max(post.get('upVotes') or 0, 0)) + math.log1p(max(post.get('duplicateCount', 1) - 1, 0))
+
+
+def pack_reddit_data(
+    reddit_data: List[Dict[str, Any]],
+    token_budget: int = CONTEXT_TOKEN_BUDGET
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Fill a token budget with the posts giving the most relevance per token.
+
+    Picks greedily by relevance / tokens, dividing by 1 + the number of posts
+    already taken from the same subreddit and from the same month, so a single
+    busy subreddit or week can't crowd out the rest. Posts that no longer fit
+    are skipped in favour of shorter ones.
+
+    Returns:
+        (formatted posts, report) - the report has 'included', 'total', 'tokens',
+        'budget', 'subreddits' (posts per subreddit) and the included date range
+    """
+
+    costs = [estimate_tokens(format_post(post, len(reddit_data))) for post in reddit_data]
+    per_subreddit: Dict[str, int] = {}
+    per_month: Dict[str, int] = {}
+
+    def score(i: int) -> float:
+        post = reddit_data[i]
+        crowding = (1 + per_subreddit.get(post.get('subreddit') or 'Unknown', 0)) * \
+            (1 + per_month.get((post.get('createdAt') or '')[:7], 0))
+        return relevance(post) / costs[i] / crowding
+
+    # Lazy greedy: scores only fall as posts are taken, so a popped post whose
+    # rescored value still beats the next stored one is the true best
+    heap = [(-score(i), i) for i in range(len(reddit_data))]
+    heapq.heapify(heap)
+    selected: List[int] = []
+    used = 0
+    while heap:
+        _, i = heapq.heappop(heap)
+        if used + costs[i] > token_budget:
+            continue
+        current = score(i)
+        if heap and current < -heap[0][0]:
+            heapq.heappush(heap, (-current, i))
+            continue
+        selected.append(i)
+        used += costs[i]
+        post = reddit_data[i]
+        subreddit = post.get('subreddit') or 'Unknown'
+        per_subreddit[subreddit] = per_subreddit.get(subreddit, 0) + 1
+        month = (post.get('createdAt') or '')[:7]
+        per_month[month] = per_month.get(month, 0) + 1
+
+    summary = "".join(format_post(reddit_data[i], n) for n, i in enumerate(selected, 1))
+    dates = [reddit_data[i]['createdAt'] for i in selected if reddit_data[i].get('createdAt')]
+    report = {
+        'included': len(selected),
+        'total': len(reddit_data),
+        'tokens': estimate_tokens(summary),
+        'budget': token_budget,
+        'subreddits': per_subreddit,
+        'date_start': min(dates) if dates else 'Unknown',
+        'date_end': max(dates) if dates else 'Unknown'
+    }
+    return summary, report
+
+
+def prepare_reddit_data_summary(reddit_data: List[Dict[str, Any]], token_budget: int = CONTEXT_TOKEN_BUDGET) -> str:
+    """Format Reddit data for analysis, packed into token_budget"""
+
+    return pack_reddit_data(reddit_data, token_budget)[0]
+
+
+def shard_reddit_data(
+    reddit_data: List[Dict[str, Any]],
+    shard_budget: int = SHARD_TOKEN_BUDGET
+) -> List[List[Dict[str, Any]]]:
+    """
+    Split posts into shards of at most shard_budget tokens, covering every post.
+
+    Posts are ordered by subreddit then date first, so a shard reads as one
+    conversation rather than a random sample. A post longer than the budget
+    gets a shard of its own.
+    """
 
-    # Sort by date and upvotes
-    sorted_data = sorted(
-        reddit_data,
-        key=lambda x: (x.get('upVotes', 0), x.get('createdAt', '')),
-        reverse=True
-    )
+    ordered = sorted(reddit_data, key=lambda post: (post.get('subreddit') or '', post.get('createdAt') or ''))
+    shards: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    used = 0
+    for post in ordered:
+        cost = estimate_tokens(format_post(post, len(reddit_data)))
+        if current and used + cost > shard_budget:
+            shards.append(current)
+            current, used = [], 0
+        current.append(post)
+        used += cost
+    if current:
+        shards.append(current)
+    return shards
 
-    # Take top 50 most relevant posts
-    top_posts = sorted_data[:50]
 
-    summary = ""
-    for i, post in enumerate(top_posts, 1):
-        summary += f"\n---\n[Post {i}]\n"
-        summary += f"Subreddit: {post.get('subreddit', 'Unknown')}\n"
-        summary += f"Date: {post.get('createdAt', 'Unknown')}\n"
-        summary += f"Upvotes: {post.get('upVotes', 0)}\n"
-        summary += f"Text: {post.get('text', '')}\n"
+def parse_findings(response: str) -> Dict[str, Any]:
+    """Findings object from a JSON-mode response ({} if it isn't one)"""
 
-    return summary
+    try:
+        findings = json.loads(response)
+    except json.JSONDecodeError:
+        findings = extract_json_from_response(response)
+    return findings if isinstance(findings, dict) else {}
+
+
+def extract_shard_findings(api_key: str, app_name: str, shard: List[Dict[str, Any]], index: int, count: int) -> Dict[str, Any]:
+    """Map step: structured findings for one shard of posts"""
+
+    posts = "".join(format_post(post, n) for n, post in enumerate(shard, 1))
+    prompt = f"""You are reading shard {index} of {count} of the Reddit posts about {app_name}. A later step merges all shards into a behavioral intelligence memo, so record only what this shard shows.
+
+Return a JSON object:
+{FINDINGS_SCHEMA}
+
+"posts" is how many posts in this shard support the item. Quote users verbatim. Keep each list to the 8 strongest items; leave a list empty rather than guess.
+
+REDDIT POSTS ({len(shard)}):
+{posts}"""
+
+    findings = parse_findings(call_openai_api(
+        api_key, prompt, model=MAP_MODEL, max_tokens=MAP_MAX_TOKENS,
+        system_prompt=EXTRACTOR_SYSTEM_PROMPT, json_mode=True
+    ))
+    if not findings:
+        raise Exception(f"Shard {index}: response was not a findings object")
+    findings['shard_posts'] = len(shard)
+    return findings
+
+
+def merge_findings(api_key: str, app_name: str, findings: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge several findings objects into one with the same keys"""
+
+    prompt = f"""These findings were extracted from different shards of the same Reddit corpus about {app_name}. Merge them into one JSON object with the same keys:
+{FINDINGS_SCHEMA}
+
+Combine items that mean the same thing and add up their "posts" counts. Keep the strongest verbatim quotes. Keep each list to the 15 strongest items, ranked by "posts".
+
+FINDINGS:
+{json.dumps(findings, ensure_ascii=False)}"""
+
+    merged = parse_findings(call_openai_api(
+        api_key, prompt, model=MAP_MODEL, max_tokens=MAP_MAX_TOKENS * 2,
+        system_prompt=EXTRACTOR_SYSTEM_PROMPT, json_mode=True
+    ))
+    if not merged:
+        raise Exception("Merge response was not a findings object")
+    merged['shard_posts'] = sum(f.get('shard_posts', 0) for f in findings)
+    return merged
+
+
+def run_parallel(tasks: List[Tuple[Any, ...]], fn, max_workers: int) -> Tuple[List[Any], int]:
+    """Run fn(*args) for each task on a thread pool; results in task order, failures dropped and counted"""
+
+    results: Dict[int, Any] = {}
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks)))) as executor:
+        future_to_index = {executor.submit(fn, *args): i for i, args in enumerate(tasks)}
+        for future in as_completed(future_to_index):
+            try:
+                results[future_to_index[future]] = future.result()
+            except Exception as e:
+                print(f"  ⚠️  {e}")
+                failed += 1
+    return [results[i] for i in sorted(results)], failed
+
+
+def map_reduce_reddit_data(
+    api_key: str,
+    app_name: str,
+    reddit_data: List[Dict[str, Any]],
+    shard_budget: int = SHARD_TOKEN_BUDGET,
+    max_workers: int = MAP_MAX_WORKERS
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Findings from every post, condensed to fit the memo prompt.
+
+    Map: each shard gets its own findings from MAP_MODEL, max_workers at a
+    time, so latency grows with shards / max_workers rather than corpus size.
+    Reduce: findings are merged in groups that fit CONTEXT_TOKEN_BUDGET until one
+    object is left. The summary is that object plus a packed sample of verbatim
+    posts for the memo to quote.
+
+    Returns:
+        (data summary, report) - 'included' counts posts whose shard succeeded
+    """
+
+    shards = shard_reddit_data(reddit_data, shard_budget)
+    tasks = [(api_key, app_name, shard, i, len(shards)) for i, shard in enumerate(shards, 1)]
+    findings, shards_failed = run_parallel(tasks, extract_shard_findings, max_workers)
+    if not findings:
+        raise Exception(f"All {len(shards)} shards failed to extract findings")
+
+    merge_rounds = 0
+    while len(findings) > 1:
+        groups: List[List[Dict[str, Any]]] = [[]]
+        used = 0
+        for finding in findings:
+            cost = estimate_tokens(json.dumps(finding, ensure_ascii=False))
+            if groups[-1] and used + cost > CONTEXT_TOKEN_BUDGET:
+                groups.append([])
+                used = 0
+            groups[-1].append(finding)
+            used += cost
+        if all(len(group) == 1 for group in groups):
+            break  # Each finding alone fills the budget; nothing left to merge
+        merge_rounds += 1
+        merged, _ = run_parallel(
+            [(api_key, app_name, group) for group in groups if len(group) > 1], merge_findings, max_workers
+        )
+        if not merged:
+            raise Exception("Merging shard findings failed")
+        findings = merged + [group[0] for group in groups if len(group) == 1]
+
+    # A failed merge drops its group, so count coverage from what survived
+    included = sum(f.get('shard_posts', 0) for f in findings)
+    for finding in findings:
+        finding.pop('shard_posts', None)
+    final = findings[0] if len(findings) == 1 else findings
+    sample, sample_report = pack_reddit_data(reddit_data, SAMPLE_TOKEN_BUDGET)
+
+    summary = f"""FINDINGS FROM {included} OF {len(reddit_data)} POSTS (extracted per shard and merged; "posts" counts supporting posts):
+```json
+{json.dumps(final, indent=2, ensure_ascii=False)}
+```
+
+REPRESENTATIVE POSTS ({sample_report['included']} verbatim, for quotes):
+{sample}"""
+
+    report = {
+        'included': included,
+        'total': len(reddit_data),
+        'shards': len(shards),
+        'shards_failed': shards_failed,
+        'merge_rounds': merge_rounds,
+        'sample': sample_report,
+        'tokens': estimate_tokens(summary)
+    }
+    return summary, report
 
 
 def extract_metadata(app_name: str, reddit_data: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -142,8 +433,15 @@ REDDIT DATA:
     return prompt
 
 
-def call_openai_api(api_key: str, prompt: str) -> str:
-    """Call OpenAI API for analysis"""
+def call_openai_api(
+    api_key: str,
+    prompt: str,
+    model: str = "gpt-4o",
+    max_tokens: int = 16000,
+    system_prompt: str = ANALYST_SYSTEM_PROMPT,
+    json_mode: bool = False
+) -> str:
+    """Call OpenAI API for analysis (json_mode asks for a single JSON object)"""
 
     url = "https://api.openai.com/v1/chat/completions"
     headers = {
@@ -152,11 +450,11 @@ def call_openai_api(api_key: str, prompt: str) -> str:
     }
 
     payload = {
-        "model": "gpt-4o",
+        "model": model,
         "messages": [
             {
                 "role": "system",
-                "content": "You are a Senior Product Data Scientist + Behavioral Scientist + Cultural Intelligence Analyst. You produce rigorous, evidence-based intelligence memos for growth leaders."
+                "content": system_prompt
             },
             {
                 "role": "user",
@@ -164,8 +462,10 @@ def call_openai_api(api_key: str, prompt: str) -> str:
             }
         ],
         "temperature": 0.3,
-        "max_tokens": 16000
+        "max_tokens": max_tokens
     }
+    if json_mode:
+        payload["response_format"] = {"type": "json_object"}
 
     response = requests.post(url, json=payload, headers=headers)
 
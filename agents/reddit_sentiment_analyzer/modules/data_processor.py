@@ -3,14 +3,23 @@ Module 4: Data Processor
 Cleans, deduplicates, and filters Reddit data
 """
 
-from typing import List, Dict, Any, Set
+from bisect import bisect_right
+from collections import Counter
+from typing import List, Dict, Any, Set, Optional, AsyncIterator, Tuple
 from utils.logger import get_logger
+from utils.simhash import NEAR_DUPLICATE_DISTANCE, near_duplicate_clusters, shingles, simhash
 
 logger = get_logger(__name__)
 
 
+# Texts with fewer distinct character trigrams than this are too short to fingerprint reliably
+MIN_SHINGLES = 16
+
+
 class DataProcessor:
-    def __init__(self):
+    def __init__(self, near_duplicate_distance: Optional[int] = NEAR_DUPLICATE_DISTANCE):
+        # Max SimHash bit difference for two texts to count as near-duplicates; None turns it off
+        self.near_duplicate_distance = near_duplicate_distance
         self.filter_patterns = {
             'bot': [
                 "I am a bot",
@@ -27,6 +36,95 @@ class DataProcessor:
             'welcome': ["Welcome to", "welcome to the", "Thanks for joining"],
             'spam': ["check out my", "follow me on", "link in bio", "dm me for"]
         }
+        self._compile_filters()
+    
+    def _compile_filters(self) -> None:
+        """
+        Flatten filter_patterns into lowercased (term, category) pairs, once.
+        
+        Category order is kept, so the first category with a matching term wins,
+        as before. Call again after changing filter_patterns.
+        """
+        seen: Set[str] = set()
+        self._filter_terms: List[Tuple[str, str]] = []
+        for category, patterns in self.filter_patterns.items():
+            for pattern in patterns:
+                term = pattern.lower()
+                if term and term not in seen:
+                    seen.add(term)
+                    self._filter_terms.append((term, category))
+    
+    def match_category(self, text: str) -> Optional[str]:
+        """Filter category matching text (case-insensitive), or None"""
+        text = text.lower()
+        for term, category in self._filter_terms:
+            if term in text:
+                return category
+        return None
+    
+    def filter_batch(
+        self, 
+        data: List[Dict[str, Any]], 
+        min_length: int = 20,
+        chunk_size: int = 50_000
+    ) -> Tuple[List[Dict[str, Any]], Counter]:
+        """
+        Filter bot/spam/deleted content from a batch of any size.
+        
+        Rather than testing every term against every item, each chunk of bodies
+        is joined into one string and each term is found with str.find across
+        the whole chunk, then hits are mapped back to items by offset. That's
+        one C-level scan per term per chunk instead of a Python loop per item.
+        
+        Returns:
+            Items to keep, and a Counter of why the rest were dropped
+            ('too_short' or the matched category)
+        """
+        kept = []
+        dropped: Counter = Counter()
+        
+        for begin in range(0, len(data), chunk_size):
+            chunk = data[begin:begin + chunk_size]
+            texts = [(item.get('body') or '').lower() for item in chunk]
+            categories = self._match_texts(texts)
+            
+            for item, text, category in zip(chunk, texts, categories):
+                # Skip empty
+                if len(text) < min_length:
+                    dropped['too_short'] += 1
+                elif category is not None:
+                    dropped[category] += 1
+                else:
+                    kept.append(item)
+        
+        return kept, dropped
+    
+    def _match_texts(self, texts: List[str]) -> List[Optional[str]]:
+        """First matching category per lowercased text, scanning all texts at once per term"""
+        matched: List[Optional[str]] = [None] * len(texts)
+        if not texts:
+            return matched
+        
+        # NUL can't occur in a term, so no match spans two texts
+        corpus = '\x00'.join(texts)
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+        ends = starts[1:] + [len(corpus)]
+        
+        find = corpus.find
+        for term, category in self._filter_terms:
+            i = find(term)
+            while i != -1:
+                index = bisect_right(starts, i) - 1
+                if matched[index] is None:
+                    matched[index] = category
+                # One hit per text is enough; resume at the next text
+                i = find(term, ends[index])
+        
+        return matched
     
     async def process_data(
         self, 
@@ -48,33 +146,48 @@ class DataProcessor:
         deduped = self._deduplicate(normalized)
         logger.info(f"After deduplication: {len(deduped)} items")
         
+        # Step 3b: Collapse reposts, quotes and copy-pasted comments
+        deduped = self.collapse_near_duplicates(deduped)
+        
         # Step 4: Trim text length
         trimmed = self._trim_text(deduped, max_length=1200)
         
         return trimmed
     
-    def _filter_unwanted(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Filter out bot posts, spam, deleted content"""
-        filtered = []
+    async def process_stream(
+        self, 
+        batches: AsyncIterator[List[Dict[str, Any]]], 
+        brand_name: str, 
+        prospect_id: str
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Clean raw batches as they arrive, deduplicating across the whole stream.
         
-        for item in data:
-            text = (item.get('body') or '').lower()
-            
-            # Skip empty
-            if not text or len(text) < 20:
-                continue
-            
-            # Check filter patterns
-            should_filter = False
-            for category, patterns in self.filter_patterns.items():
-                if any(pattern.lower() in text for pattern in patterns):
-                    should_filter = True
-                    break
-            
-            if not should_filter:
-                filtered.append(item)
+        Near-duplicates are left in: picking each cluster's representative needs
+        every item, so run collapse_near_duplicates on the collected result.
+        """
+        seen: Set[str] = set()
+        received = 0
+        kept = 0
+        
+        async for batch in batches:
+            received += len(batch)
+            filtered = self._filter_unwanted(batch)
+            normalized = self._normalize(filtered, brand_name, prospect_id)
+            deduped = self._deduplicate(normalized, seen)
+            cleaned = self._trim_text(deduped, max_length=1200)
+            kept += len(cleaned)
+            if cleaned:
+                yield cleaned
         
-        return filtered
+        logger.info(f"Processed {received} items as a stream, kept {kept}")
+    
+    def _filter_unwanted(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Filter out bot posts, spam, deleted content"""
+        kept, dropped = self.filter_batch(data)
+        if dropped:
+            logger.debug(f"Filtered {sum(dropped.values())} items: {dict(dropped)}")
+        return kept
     
     def _normalize(
         self, 
@@ -99,9 +212,13 @@ class DataProcessor:
         
         return normalized
     
-    def _deduplicate(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Remove duplicate posts based on URL + text snippet"""
-        seen: Set[str] = set()
+    def _deduplicate(
+        self, 
+        data: List[Dict[str, Any]], 
+        seen: Optional[Set[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Remove duplicate posts based on URL + text snippet (pass `seen` to carry keys across batches)"""
+        seen = set() if seen is None else seen
         deduped = []
         
         for item in data:
@@ -113,6 +230,46 @@ class DataProcessor:
         
         return deduped
     
+    def collapse_near_duplicates(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Keep one item per cluster of near-duplicate texts.
+        
+        Texts whose SimHash fingerprints differ in at most near_duplicate_distance
+        bits form a cluster (LSH banding keeps this linear in practice). The
+        highest-upvoted member is kept, earliest on ties, with duplicateCount set
+        to the cluster size - how widely that view was echoed. Every kept item gets
+        duplicateCount; texts too short to fingerprint count as their own cluster.
+        """
+        if self.near_duplicate_distance is None:
+            return data
+        
+        fingerprinted = []
+        fingerprints = []
+        for index, item in enumerate(data):
+            item['duplicateCount'] = 1
+            features = shingles(item.get('text') or '')
+            if len(features) >= MIN_SHINGLES:
+                fingerprinted.append(index)
+                fingerprints.append(simhash(features))
+        
+        dropped: Set[int] = set()
+        sizes = []
+        for members in near_duplicate_clusters(fingerprints, self.near_duplicate_distance):
+            if len(members) == 1:
+                continue
+            indexes = [fingerprinted[m] for m in members]
+            keep = max(indexes, key=lambda i: (data[i].get('upVotes') or 0, -i))
+            data[keep]['duplicateCount'] = len(indexes)
+            dropped.update(i for i in indexes if i != keep)
+            sizes.append(len(indexes))
+        
+        if sizes:
+            logger.info(
+                f"Collapsed {len(dropped)} near-duplicates into {len(sizes)} clusters "
+                f"(largest {max(sizes)})"
+            )
+        return [item for index, item in enumerate(data) if index not in dropped]
+    
     def _trim_text(self, data: List[Dict[str, Any]], max_length: int) -> List[Dict[str, Any]]:
         """Trim text to max length"""
         for item in data:
@@ -3,10 +3,14 @@ Module 2: Google Search for Reddit URLs
 Uses Apify to search Google for Reddit discussions
 """
 
+import asyncio
 import httpx
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from config.settings import get_settings
 from database.db import Database
+from modules.apify_client import ApifyOrchestrator
+from modules.scrape_cache import normalize_reddit_url
+from utils.limits import service_limit
 from utils.logger import get_logger
 
 settings = get_settings()
@@ -25,38 +29,114 @@ class GoogleSearcher:
         search_query = f"reddit:{brand_name}"
         
         logger.info(f"Searching: {search_query}")
+        results = await self._run_search([search_query])
         
-        # Call Apify actor
+        reddit_urls = self._extract_reddit_urls(results)
+        
+        logger.info(f"Found {len(reddit_urls)} Reddit URLs")
+        return reddit_urls
+    
+    async def search_many(
+        self, 
+        brand_names: List[str], 
+        variants: Optional[List[str]] = None,
+        queries_per_run: Optional[int] = None
+    ) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Search Google for Reddit URLs about many brands in as few actor runs as possible.
+        
+        Every brand x variant query (variants are templates with {brand}, default
+        GOOGLE_QUERY_VARIANTS) goes into shared runs of up to queries_per_run
+        newline-separated queries, so N brands pay the actor start-up cost once
+        per run rather than once per brand. Results are demultiplexed by each
+        page's searchQuery.term, merged across a brand's variants in order,
+        deduplicated by normalized thread URL and capped at MAX_REDDIT_URLS.
+        
+        Returns:
+            Reddit URLs per brand name - an empty list for brands with no hits;
+            brands whose queries all sat in failed runs are left out, so the
+            caller can retry them
+        """
+        variants = variants or settings.GOOGLE_QUERY_VARIANTS
+        queries_per_run = queries_per_run or settings.GOOGLE_QUERIES_PER_RUN
+        
+        brands = list(dict.fromkeys(brand_names))
+        
+        # Two brands can produce the same query; it's searched once and serves both
+        queries = list(dict.fromkeys(variant.format(brand=brand).strip() for brand in brands for variant in variants))
+        
+        chunks = [queries[i:i + queries_per_run] for i in range(0, len(queries), queries_per_run)]
+        logger.info(f"Searching {len(queries)} queries for {len(brands)} brands in {len(chunks)} runs")
+        runs = await asyncio.gather(*(self._run_search(chunk) for chunk in chunks), return_exceptions=True)
+        
+        # Demultiplex result pages back to their query, in query then page order
+        pages_by_query: Dict[str, List[Dict[str, Any]]] = {query: [] for query in queries}
+        failed = set()
+        for chunk, results in zip(chunks, runs):
+            if isinstance(results, BaseException):
+                logger.error(f"Search run for {len(chunk)} queries failed: {str(results)}")
+                failed.update(chunk)
+                continue
+            for page in results:
+                term = ((page.get('searchQuery') or {}).get('term') or '').strip()
+                if term in pages_by_query:
+                    pages_by_query[term].append(page)
+                elif len(chunk) == 1:
+                    pages_by_query[chunk[0]].append(page)
+                else:
+                    logger.warning(f"Dropping search results for unknown query {term!r}")
+        
+        found: Dict[str, List[Dict[str, str]]] = {}
+        for brand_name in brands:
+            brand_queries = [variant.format(brand=brand_name).strip() for variant in variants]
+            if all(query in failed for query in brand_queries):
+                continue
+            pages = []
+            for query in brand_queries:
+                query_pages = pages_by_query[query]
+                pages.extend(sorted(query_pages, key=lambda page: (page.get('searchQuery') or {}).get('page', 0)))
+            found[brand_name] = self._extract_reddit_urls(pages)
+        
+        logger.info(f"Found Reddit URLs for {sum(1 for urls in found.values() if urls)}/{len(brands)} brands")
+        return found
+    
+    async def _run_search(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """One Google-search actor run over newline-separated queries; returns its result pages"""
         url = f"https://api.apify.com/v2/acts/{self.apify_actor}/run-sync-get-dataset-items"
         params = {"token": self.apify_token}
         headers = {"Content-Type": "application/json"}
-        payload = {"queries": search_query, "maxPagesPerQuery": 1}
-        
-        async with httpx.AsyncClient(timeout=310.0) as client:
-            response = await client.post(url, json=payload, headers=headers, params=params)
-            response.raise_for_status()
-            results = response.json()
+        payload = {"queries": "\n".join(queries), "maxPagesPerQuery": 1}
         
-        # Extract Reddit URLs with metadata
+        async with service_limit('apify'):
+            if settings.APIFY_ASYNC_RUNS:
+                async with ApifyOrchestrator(self.apify_token) as orchestrator:
+                    return await orchestrator.run_actor(
+                        self.apify_actor, payload, timeout=settings.APIFY_RUN_TIMEOUT_SECONDS
+                    )
+            async with httpx.AsyncClient(timeout=310.0) as client:
+                response = await client.post(url, json=payload, headers=headers, params=params)
+                response.raise_for_status()
+                return response.json()
+    
+    def _extract_reddit_urls(self, results: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Reddit thread URLs with metadata from result pages, deduplicated and capped at MAX_REDDIT_URLS"""
         reddit_urls = []
         seen_urls = set()
         for result in results:
             organic_results = result.get('organicResults', [])
             for item in organic_results:
                 url = item.get('url', '')
-                if 'reddit.com/r/' in url and url not in seen_urls:
+                key = normalize_reddit_url(url)
+                if 'reddit.com/r/' in url and key not in seen_urls:
                     reddit_urls.append({
                         'url': url,
                         'title': item.get('title', 'Reddit Discussion'),
                         'description': item.get('description', '')
                     })
-                    seen_urls.add(url)
+                    seen_urls.add(key)
         
         # Limit to MAX_REDDIT_URLS
-        reddit_urls = reddit_urls[:settings.MAX_REDDIT_URLS]
-        
-        logger.info(f"Found {len(reddit_urls)} Reddit URLs")
-        return reddit_urls
+        return reddit_urls[:settings.MAX_REDDIT_URLS]
     
     async def update_prospect_urls(self, prospect_id: str, urls: List[Dict[str, str]], brand_name: str) -> None:
         """Store Reddit URLs in database"""
@@ -3,10 +3,15 @@ Module 3: Reddit Scraper
 Scrapes posts and comments from Reddit URLs using Apify
 """
 
+import asyncio
 import httpx
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, AsyncIterator
 from config.settings import get_settings
+from modules.apify_client import ApifyOrchestrator
+from modules.scrape_cache import ScrapeCache, normalize_reddit_url
+from modules.watermarks import build_watermarks, is_thread_url, new_since
 from database.db import Database
+from utils.limits import service_limit
 from utils.logger import get_logger
 
 settings = get_settings()
@@ -14,54 +19,203 @@ logger = get_logger(__name__)
 
 
 class RedditScraper:
-    def __init__(self):
+    def __init__(self, cache: Optional[ScrapeCache] = None):
         self.db = Database()
+        self.cache = cache or ScrapeCache()
         self.apify_token = settings.APIFY_API_KEY
         self.apify_actor = "trudax~reddit-scraper-lite"
     
+    async def _processed_keys(self, prospect_id: str) -> Dict[str, List[str]]:
+        """Normalized URLs already scraped and stored for this prospect, with their stored spellings"""
+        try:
+            rows = await self.db.get_reddit_urls(prospect_id)
+            processed: Dict[str, List[str]] = {}
+            for row in rows or []:
+                if row.get('processed'):
+                    processed.setdefault(normalize_reddit_url(row['url']), []).append(row['url'])
+            return processed
+        except Exception as e:
+            logger.warning(f"Could not read processed URLs for {prospect_id}: {str(e)}")
+            return {}
+    
+    def _unique_urls(self, urls: List[Any]) -> List[str]:
+        """One URL per thread, however many spellings of it the search returned"""
+        url_list = []
+        seen_keys = set()
+        for url_info in urls:
+            url = url_info.get('url', '') if isinstance(url_info, dict) else url_info
+            key = normalize_reddit_url(url)
+            if key not in seen_keys:
+                seen_keys.add(key)
+                url_list.append(url)
+        return url_list
+    
+    async def stream_batches(
+        self, 
+        urls: List[Any], 
+        brand_name: str, 
+        prospect_id: str,
+        queue_size: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Scrape Reddit URLs concurrently, yielding each URL's records as soon as it finishes.
+        
+        Yields {'url', 'records', 'stored'}; `stored` is True when the records are already
+        in the database for this prospect (a fresh cached URL that was processed before).
+        A stale URL the prospect already has is refreshed incrementally (INCREMENTAL_REFRESH):
+        its batch also carries 'new_records', the scraped items not yet stored, while
+        'records' is the stored history plus those new items.
+        Fresh cached URLs come first, then scraped ones in completion order. Finished
+        scrapes wait in a queue of `queue_size`; when the consumer falls behind, the
+        scrape workers pause instead of piling records up in memory.
+        """
+        url_list = self._unique_urls(urls)
+        processed_keys = await self._processed_keys(prospect_id)
+        
+        # Fresh cache entries skip Apify
+        to_scrape = []
+        for url in url_list:
+            entry = self.cache.get(url)
+            if entry is None:
+                to_scrape.append(url)
+                continue
+            yield {
+                'url': url,
+                'records': self.cache.records_for(entry, url, brand_name, prospect_id),
+                'stored': normalize_reddit_url(url) in processed_keys
+            }
+        
+        if len(to_scrape) < len(url_list):
+            logger.info(f"Scrape cache: reusing {len(url_list) - len(to_scrape)}/{len(url_list)} URLs for {brand_name}")
+        if not to_scrape:
+            return
+        
+        # Watermarks for stale URLs already stored: what to skip, and where listings can resume
+        watermarks: Dict[str, Dict[str, Any]] = {}
+        refresh_keys = {normalize_reddit_url(url) for url in to_scrape} & set(processed_keys)
+        if refresh_keys and settings.INCREMENTAL_REFRESH:
+            stored_urls = [stored for key in refresh_keys for stored in processed_keys[key]]
+            watermarks = build_watermarks(await self.db.get_posts_comments(prospect_id, stored_urls))
+        
+        def scrape_kwargs(url: str) -> Dict[str, Any]:
+            # A thread is always fetched whole (its post predates the watermark); listings can skip old posts
+            since = watermarks.get(normalize_reddit_url(url), {}).get('last_created_at')
+            return {'since': since} if since and not is_thread_url(url) else {}
+        
+        timeout = settings.APIFY_RUN_TIMEOUT_SECONDS if settings.APIFY_ASYNC_RUNS else settings.SCRAPE_TIMEOUT_SECONDS
+        pending: asyncio.Queue = asyncio.Queue()
+        for url in to_scrape:
+            pending.put_nowait(url)
+        finished: asyncio.Queue = asyncio.Queue(maxsize=queue_size or settings.PIPELINE_QUEUE_SIZE)
+        
+        # One pooled client for every URL instead of a new connection per call
+        limits = httpx.Limits(max_connections=settings.MAX_CONCURRENT_SCRAPES)
+        async with httpx.AsyncClient(timeout=settings.SCRAPE_TIMEOUT_SECONDS, limits=limits) as client:
+            async def worker() -> None:
+                while not pending.empty():
+                    url = pending.get_nowait()
+                    logger.info(f"Scraping: {url}")
+                    # A failed or timed-out URL doesn't sink the rest
+                    try:
+                        async with service_limit('apify'):
+                            records = await asyncio.wait_for(
+                                self._scrape_url(url, brand_name, prospect_id, client=client, **scrape_kwargs(url)),
+                                timeout=timeout
+                            )
+                    except asyncio.TimeoutError:
+                        logger.error(f"Timed out scraping {url} after {timeout:.0f}s")
+                        records = None
+                    except Exception as e:
+                        logger.error(f"Error scraping {url}: {str(e)}")
+                        records = None
+                    await finished.put((url, records))
+            
+            workers = [
+                asyncio.create_task(worker())
+                for _ in range(min(settings.MAX_CONCURRENT_SCRAPES, len(to_scrape)))
+            ]
+            scraped = 0
+            try:
+                for _ in range(len(to_scrape)):
+                    url, records = await finished.get()
+                    if records is None:
+                        continue
+                    # A date-limited listing scrape is only the delta; caching it as the
+                    # URL's content would hand later cache hits a truncated history
+                    if 'since' not in scrape_kwargs(url):
+                        self.cache.put(url, records)
+                    scraped += 1
+                    key = normalize_reddit_url(url)
+                    if key in processed_keys and settings.INCREMENTAL_REFRESH:
+                        # Keep the stored history and add only what it hasn't seen
+                        watermark = watermarks.get(key)
+                        new_records = new_since(records, watermark)
+                        history = watermark['rows'] if watermark else []
+                        logger.info(f"Refreshed {url}: {len(new_records)} new of {len(records)} scraped, {len(history)} stored")
+                        yield {'url': url, 'records': history + new_records, 'new_records': new_records, 'stored': False}
+                        continue
+                    if key in processed_keys:
+                        # Refreshed URLs replace their old rows rather than duplicating them
+                        await self.db.delete_posts_comments(prospect_id, [url])
+                    yield {'url': url, 'records': records, 'stored': False}
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+        
+        if scraped < len(to_scrape):
+            logger.warning(f"Scraped {scraped}/{len(to_scrape)} URLs for {brand_name}")
+    
     async def scrape_all_urls(
         self, 
         urls: List[Dict[str, str]], 
         brand_name: str, 
         prospect_id: str
     ) -> List[Dict[str, Any]]:
-        """Scrape all Reddit URLs and store in database"""
-        all_data = []
-        scraped_urls = []
+        """Scrape Reddit URLs concurrently (fresh cached URLs are reused) and store in database"""
+        batches = [batch async for batch in self.stream_batches(urls, brand_name, prospect_id)]
         
-        for url_info in urls:
-            url = url_info.get('url', '') if isinstance(url_info, dict) else url_info
-            logger.info(f"Scraping: {url}")
-            try:
-                data = await self._scrape_url(url, brand_name, prospect_id)
-                all_data.extend(data)
-                scraped_urls.append(url)
-            except Exception as e:
-                logger.error(f"Error scraping {url}: {str(e)}")
-                continue
+        # Batches arrive in completion order; keep the caller's order
+        position = {url: i for i, url in enumerate(self._unique_urls(urls))}
+        batches.sort(key=lambda batch: position[batch['url']])
+        
+        all_data = [record for batch in batches for record in batch['records']]
+        new_batches = [batch for batch in batches if not batch['stored']]
         
         # Store in database
-        if all_data:
-            await self.db.insert_posts_comments(all_data)
-            logger.info(f"Stored {len(all_data)} posts/comments for {brand_name}")
+        new_data = [record for batch in new_batches for record in batch.get('new_records', batch['records'])]
+        if new_data:
+            await self.db.insert_posts_comments(new_data)
+            logger.info(f"Stored {len(new_data)} posts/comments for {brand_name}")
         
         # Mark URLs as processed
-        if scraped_urls:
-            await self.db.mark_urls_processed(prospect_id, scraped_urls)
-            logger.info(f"Marked {len(scraped_urls)} URLs as processed")
+        stored_urls = [batch['url'] for batch in new_batches]
+        if stored_urls:
+            await self.db.mark_urls_processed(prospect_id, stored_urls)
+            logger.info(f"Marked {len(stored_urls)} URLs as processed")
         
         return all_data
     
-    async def _scrape_url(
+    async def store_stream(
         self, 
-        url: str, 
+        batches: AsyncIterator[Dict[str, Any]], 
         brand_name: str, 
         prospect_id: str
-    ) -> List[Dict[str, Any]]:
-        """Scrape a single Reddit URL"""
-        api_url = f"https://api.apify.com/v2/acts/{self.apify_actor}/run-sync-get-dataset-items"
-        params = {"token": self.apify_token}
-        headers = {"Content-Type": "application/json"}
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Insert each new batch and mark its URL processed, then pass its records on"""
+        stored = 0
+        async for batch in batches:
+            if not batch['stored']:
+                new_records = batch.get('new_records', batch['records'])
+                await self.db.insert_posts_comments(new_records)
+                await self.db.mark_urls_processed(prospect_id, [batch['url']])
+                stored += len(new_records)
+            yield batch['records']
+        
+        logger.info(f"Stored {stored} posts/comments for {brand_name}")
+    
+    def _payload(self, url: str, since: Optional[str] = None) -> Dict[str, Any]:
+        """Actor input for one Reddit URL (since: only posts newer than this, for listings)"""
         payload = {
             "startUrls": [{"url": url}],
             "maxPosts": settings.MAX_POSTS_PER_URL,
@@ -70,31 +224,79 @@ class RedditScraper:
             "scrollTimeout": 40,
             "proxy": {"useApifyProxy": True}
         }
+        if since:
+            payload["postDateLimit"] = since
+        return payload
+    
+    async def _scrape_url(
+        self, 
+        url: str, 
+        brand_name: str, 
+        prospect_id: str,
+        client: Optional[httpx.AsyncClient] = None,
+        since: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Scrape a single Reddit URL (opens its own client if none is shared)"""
+        if settings.APIFY_ASYNC_RUNS:
+            records = []
+            async for page in self.stream_url(url, brand_name, prospect_id, client=client, since=since):
+                records.extend(page)
+            return records
+        
+        api_url = f"https://api.apify.com/v2/acts/{self.apify_actor}/run-sync-get-dataset-items"
+        params = {"token": self.apify_token}
+        headers = {"Content-Type": "application/json"}
+        payload = self._payload(url, since)
         
-        async with httpx.AsyncClient(timeout=310.0) as client:
+        if client is None:
+            async with httpx.AsyncClient(timeout=settings.SCRAPE_TIMEOUT_SECONDS) as own_client:
+                response = await own_client.post(api_url, json=payload, headers=headers, params=params)
+        else:
             response = await client.post(api_url, json=payload, headers=headers, params=params)
-            response.raise_for_status()
-            results = response.json()
+        response.raise_for_status()
+        results = response.json()
         
-        # Transform to database format
-        transformed = []
-        for item in results:
-            data_type = item.get('dataType', 'post')
-            
-            record = {
-                'url': url,
-                'post_id': item.get('id'),
-                'parent_id': item.get('postId') if data_type == 'comment' else None,
-                'category': item.get('category'),
-                'community_name': item.get('communityName'),
-                'created_at_reddit': item.get('createdAt'),
-                'up_votes': item.get('upVotes', 0),
-                'number_of_replies': item.get('numberOfReplies', 0),
-                'data_type': data_type,
-                'brand_name': brand_name,
-                'body': item.get('body') or item.get('title', ''),
-                'prospect_id': prospect_id
-            }
-            transformed.append(record)
+        return [self._transform_item(item, url, brand_name, prospect_id) for item in results]
+    
+    async def stream_url(
+        self, 
+        url: str, 
+        brand_name: str, 
+        prospect_id: str,
+        client: Optional[httpx.AsyncClient] = None,
+        since: Optional[str] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Scrape a Reddit URL as an async Apify run, yielding records a dataset page at a time"""
+        orchestrator = ApifyOrchestrator(self.apify_token, client=client)
+        try:
+            async for page in orchestrator.run_actor_pages(
+                self.apify_actor, self._payload(url, since), timeout=settings.APIFY_RUN_TIMEOUT_SECONDS
+            ):
+                yield [self._transform_item(item, url, brand_name, prospect_id) for item in page]
+        finally:
+            await orchestrator.aclose()
+    
+    def _transform_item(
+        self, 
+        item: Dict[str, Any], 
+        url: str, 
+        brand_name: str, 
+        prospect_id: str
+    ) -> Dict[str, Any]:
+        """Transform an Apify item to database format"""
+        data_type = item.get('dataType', 'post')
         
-        return transformed
+        return {
+            'url': url,
+            'post_id': item.get('id'),
+            'parent_id': item.get('postId') if data_type == 'comment' else None,
+            'category': item.get('category'),
+            'community_name': item.get('communityName'),
+            'created_at_reddit': item.get('createdAt'),
+            'up_votes': item.get('upVotes', 0),
+            'number_of_replies': item.get('numberOfReplies', 0),
+            'data_type': data_type,
+            'brand_name': brand_name,
+            'body': item.get('body') or item.get('title', ''),
+            'prospect_id': prospect_id
+        }
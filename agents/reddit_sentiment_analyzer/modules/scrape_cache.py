@@ -0,0 +1,102 @@
+"""
+Scrape Cache
+Local store of scraped Reddit records, keyed by normalized URL, with a TTL
+
+The same thread turns up under many URL spellings (old./www./m. hosts,
+slugs, tracking params, redd.it short links). Keying on the normalized URL
+lets repeat analyses reuse a fresh scrape instead of paying Apify again.
+"""
+
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+from config.settings import get_settings
+from utils.logger import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+_REDDIT_HOSTS = {"reddit.com", "www.reddit.com", "old.reddit.com", "new.reddit.com", "np.reddit.com", "m.reddit.com"}
+_THREAD_PATH = re.compile(r"^(?:/r/[^/]+)?/comments/([a-z0-9]+)")
+
+
+def normalize_reddit_url(url: str) -> str:
+    """
+    Canonical form of a Reddit URL.
+
+    Hosts collapse to reddit.com, threads reduce to their post id
+    (reddit.com/comments/<id>, which Reddit itself resolves), and query,
+    fragment and trailing slash go, so every spelling of a thread - including
+    redd.it short links - maps to one key. Non-Reddit URLs are only
+    lowercased and stripped.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().split(":")[0]
+    path = parts.path.lower().rstrip("/")
+
+    if host in ("redd.it", "www.redd.it") and path:
+        return f"https://reddit.com/comments/{path.strip('/')}"
+    if host not in _REDDIT_HOSTS:
+        return f"{parts.scheme.lower() or 'https'}://{host}{path}"
+
+    match = _THREAD_PATH.match(path)
+    if match:
+        return f"https://reddit.com/comments/{match.group(1)}"
+    return f"https://reddit.com{path}"
+
+
+class ScrapeCache:
+    """Scraped records per normalized URL, one JSON file each, fresh for ttl_seconds"""
+
+    def __init__(self, store_dir: Optional[str] = None, ttl_seconds: Optional[float] = None):
+        self.store_dir = Path(store_dir or settings.SCRAPE_CACHE_DIR)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.SCRAPE_CACHE_TTL_HOURS * 3600
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, url: str) -> Path:
+        key = normalize_reddit_url(url)
+        return self.store_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Fresh cache entry for a URL ({key, url, scraped_at, records}), or None if missing or stale"""
+        path = self._path(url)
+        if not path.exists():
+            return None
+        try:
+            entry = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable scrape cache entry for {url}: {str(e)}")
+            return None
+        if time.time() - entry.get('scraped_at', 0) > self.ttl_seconds:
+            return None
+        return entry
+
+    def put(self, url: str, records: List[Dict[str, Any]]) -> None:
+        """Store a URL's scraped records (written atomically)"""
+        path = self._path(url)
+        entry = {
+            'key': normalize_reddit_url(url),
+            'url': url,
+            'scraped_at': time.time(),
+            'records': records
+        }
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding='utf-8')
+        tmp.replace(path)
+
+    def records_for(
+        self,
+        entry: Dict[str, Any],
+        url: str,
+        brand_name: str,
+        prospect_id: str
+    ) -> List[Dict[str, Any]]:
+        """Cached records re-stamped for the URL spelling, brand and prospect asking for them"""
+        return [
+            {**record, 'url': url, 'brand_name': brand_name, 'prospect_id': prospect_id}
+            for record in entry['records']
+        ]
@@ -0,0 +1,47 @@
+"""
+Thread Watermarks
+What's already stored per Reddit URL, so a refresh only adds what's new
+"""
+
+from typing import Any, Dict, List, Optional, Set
+from modules.scrape_cache import normalize_reddit_url
+
+
+def is_thread_url(url: str) -> bool:
+    """True for a single thread (…/comments/<id>), False for listings like a subreddit"""
+    return "/comments/" in normalize_reddit_url(url)
+
+
+def build_watermarks(rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Per normalized URL: {'last_created_at', 'seen_ids', 'rows'} from stored posts/comments.
+
+    last_created_at is the newest created_at_reddit (ISO strings sort by time);
+    seen_ids are the stored post/comment ids; rows are the stored records themselves.
+    """
+    watermarks: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        mark = watermarks.setdefault(
+            normalize_reddit_url(row.get('url') or ''),
+            {'last_created_at': None, 'seen_ids': set(), 'rows': []}
+        )
+        mark['rows'].append(row)
+        if row.get('post_id'):
+            mark['seen_ids'].add(row['post_id'])
+        created = row.get('created_at_reddit')
+        if created and (mark['last_created_at'] is None or created > mark['last_created_at']):
+            mark['last_created_at'] = created
+    return watermarks
+
+
+def new_since(records: List[Dict[str, Any]], watermark: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Records not yet stored for a thread.
+
+    Ids decide, not dates: an old comment can still be new to us if an earlier
+    scrape hit MAX_COMMENTS_PER_POST before reaching it.
+    """
+    if not watermark:
+        return records
+    seen: Set[str] = watermark['seen_ids']
+    return [record for record in records if record.get('post_id') not in seen]
@@ -106,9 +106,12 @@ def mock_database():
     db.get_all_prospects = AsyncMock()
     db.update_prospect = AsyncMock()
     db.insert_reddit_urls = AsyncMock()
-    db.get_reddit_urls = AsyncMock()
+    db.get_reddit_urls = AsyncMock(return_value=[])
     db.insert_posts_comments = AsyncMock()
     db.insert_analysis_result = AsyncMock()
+    db.mark_urls_processed = AsyncMock()
+    db.delete_posts_comments = AsyncMock()
+    db.get_posts_comments = AsyncMock(return_value=[])
     return db
 
 
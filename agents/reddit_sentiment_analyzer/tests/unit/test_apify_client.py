@@ -0,0 +1,145 @@
+"""
+Unit tests for apify_client module, against a local Apify stand-in
+"""
+
+import asyncio
+import json
+import pytest
+import httpx
+from unittest.mock import patch
+from modules.apify_client import ApifyOrchestrator, ApifyRunError
+
+
+class FakeApify:
+    """In-process stand-in for the Apify API runs/datasets endpoints"""
+
+    def __init__(self, items_per_run=5, polls_until_done=2, final_status="SUCCEEDED", flaky=0):
+        self.items_per_run = items_per_run
+        self.polls_until_done = polls_until_done
+        self.final_status = final_status
+        self.flaky = flaky  # Number of 503s to return before behaving
+        self.runs = {}
+        self.requests = []
+        self.aborted = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        assert request.url.params["token"] == "test-token"
+        if self.flaky:
+            self.flaky -= 1
+            return httpx.Response(503)
+
+        path = request.url.path.replace("/v2", "", 1)
+        parts = path.strip("/").split("/")
+
+        if request.method == "POST" and parts[0] == "acts" and parts[2] == "runs":
+            run_id = f"run-{len(self.runs)}"
+            payload = json.loads(request.content)
+            self.runs[run_id] = {"polls": 0, "payload": payload, "status": "RUNNING"}
+            return httpx.Response(201, json={"data": self._run(run_id)})
+
+        if parts[0] == "actor-runs" and len(parts) == 3 and parts[2] == "abort":
+            self.aborted.append(parts[1])
+            self.runs[parts[1]]["status"] = "ABORTED"
+            return httpx.Response(200, json={"data": self._run(parts[1])})
+
+        if parts[0] == "actor-runs":
+            run = self.runs[parts[1]]
+            run["polls"] += 1
+            if run["status"] == "RUNNING" and run["polls"] >= self.polls_until_done:
+                run["status"] = self.final_status
+            return httpx.Response(200, json={"data": self._run(parts[1])})
+
+        if parts[0] == "datasets":
+            run_id = parts[1].replace("ds-", "")
+            tag = self.runs[run_id]["payload"].get("tag", run_id)
+            items = [{"id": f"{tag}-{i}"} for i in range(self.items_per_run)]
+            offset = int(request.url.params["offset"])
+            limit = int(request.url.params["limit"])
+            return httpx.Response(
+                200, json=items[offset:offset + limit],
+                headers={"X-Apify-Pagination-Total": str(len(items))}
+            )
+
+        return httpx.Response(404)
+
+    def _run(self, run_id):
+        return {"id": run_id, "status": self.runs[run_id]["status"], "defaultDatasetId": f"ds-{run_id}"}
+
+
+def orchestrator_for(fake: FakeApify, **kwargs) -> ApifyOrchestrator:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handler))
+    return ApifyOrchestrator("test-token", client=client, poll_interval=0, **kwargs)
+
+
+class TestApifyOrchestrator:
+    """Test cases for ApifyOrchestrator"""
+
+    @pytest.mark.asyncio
+    async def test_run_actor_polls_and_paginates(self):
+        """Test a run is started, polled to completion and read in pages"""
+        fake = FakeApify(items_per_run=5, polls_until_done=3)
+        orchestrator = orchestrator_for(fake, page_size=2)
+
+        pages = [page async for page in orchestrator.run_actor_pages("actor~x", {"tag": "a"})]
+
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert [item["id"] for page in pages for item in page] == [f"a-{i}" for i in range(5)]
+        assert fake.runs["run-0"]["polls"] == 3
+        polls = [r for r in fake.requests if r.url.path.endswith("/actor-runs/run-0")]
+        assert all(r.url.params["waitForFinish"] == "60" for r in polls)
+
+    @pytest.mark.asyncio
+    async def test_failed_run_raises(self):
+        """Test a run ending in FAILED raises ApifyRunError"""
+        fake = FakeApify(final_status="FAILED")
+        orchestrator = orchestrator_for(fake)
+
+        with pytest.raises(ApifyRunError, match="FAILED"):
+            await orchestrator.run_actor("actor~x", {})
+
+    @pytest.mark.asyncio
+    async def test_timeout_aborts_run(self):
+        """Test a run that outlives its timeout is aborted"""
+        fake = FakeApify(polls_until_done=10_000)
+        orchestrator = orchestrator_for(fake)
+
+        with pytest.raises(ApifyRunError, match="still RUNNING"):
+            await orchestrator.run_actor("actor~x", {}, timeout=0)
+        assert fake.aborted == ["run-0"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_wait_aborts_run(self):
+        """Test cancelling the caller (e.g. asyncio.wait_for) aborts the run"""
+        fake = FakeApify(polls_until_done=10_000)
+        orchestrator = orchestrator_for(fake)
+        orchestrator.poll_interval = 0.01
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(orchestrator.run_actor("actor~x", {}), timeout=0.05)
+        assert fake.aborted == ["run-0"]
+
+    @pytest.mark.asyncio
+    async def test_retries_server_errors(self):
+        """Test 5xx responses are retried"""
+        fake = FakeApify(flaky=2)
+        orchestrator = orchestrator_for(fake)
+
+        with patch("modules.apify_client.asyncio.sleep"):
+            items = await orchestrator.run_actor("actor~x", {"tag": "r"})
+        assert len(items) == 5
+
+    @pytest.mark.asyncio
+    async def test_run_many_concurrent_with_partial_failure(self):
+        """Test many runs proceed concurrently and one failure doesn't sink the rest"""
+        fake = FakeApify(items_per_run=3)
+        orchestrator = orchestrator_for(fake)
+
+        results = await orchestrator.run_many("actor~x", [{"tag": "a"}, {"tag": "b"}, {"tag": "c"}])
+        assert [[item["id"] for item in r] for r in results] == [
+            ["a-0", "a-1", "a-2"], ["b-0", "b-1", "b-2"], ["c-0", "c-1", "c-2"]
+        ]
+
+        fake.final_status = "ABORTED"
+        results = await orchestrator.run_many("actor~x", [{"tag": "d"}])
+        assert isinstance(results[0], ApifyRunError)
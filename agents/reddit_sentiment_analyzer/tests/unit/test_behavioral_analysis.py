@@ -0,0 +1,156 @@
+"""
+Unit tests for behavioral_analysis context packing
+"""
+
+import json
+import threading
+import pytest
+from unittest.mock import patch
+from modules import behavioral_analysis
+from modules.behavioral_analysis import (
+    analyze_reddit_data,
+    estimate_tokens,
+    map_reduce_reddit_data,
+    pack_reddit_data,
+    prepare_reddit_data_summary,
+    shard_reddit_data
+)
+
+
+def make_post(i, subreddit='Supplements', created='2024-01-15T10:00:00Z', upvotes=10, length=400):
+    return {
+        'text': f"post {i} " + "x" * length,
+        'subreddit': subreddit,
+        'createdAt': created,
+        'upVotes': upvotes,
+        'duplicateCount': 1
+    }
+
+
+class TestPackRedditData:
+    """Test cases for pack_reddit_data"""
+    
+    def test_stays_within_budget(self):
+        """Test the packed posts never exceed the token budget"""
+        posts = [make_post(i, upvotes=i) for i in range(200)]
+        
+        summary, report = pack_reddit_data(posts, token_budget=3000)
+        
+        assert 0 < report['included'] < 200
+        assert report['total'] == 200
+        assert report['tokens'] == estimate_tokens(summary) <= 3000
+    
+    def test_prefers_relevance_per_token(self):
+        """Test a short upvoted post beats a long one with the same votes"""
+        short = make_post('short', upvotes=50, length=100)
+        long = make_post('long', upvotes=50, length=2000)
+        
+        summary, report = pack_reddit_data([long, short], token_budget=estimate_tokens(short['text']) + 60)
+        
+        assert report['included'] == 1
+        assert 'post short' in summary
+    
+    def test_diversity_across_subreddits(self):
+        """Test one busy subreddit doesn't crowd out the others"""
+        posts = [make_post(i, subreddit='Busy', upvotes=100) for i in range(50)]
+        posts += [make_post(f"quiet{i}", subreddit=f"Quiet{i}", upvotes=20) for i in range(3)]
+        
+        _, report = pack_reddit_data(posts, token_budget=1500)
+        
+        assert set(report['subreddits']) == {'Busy', 'Quiet0', 'Quiet1', 'Quiet2'}
+    
+    def test_diversity_across_time(self):
+        """Test posts from other months make it in next to a popular month"""
+        posts = [make_post(i, created='2024-03-01T00:00:00Z', upvotes=100) for i in range(50)]
+        posts.append(make_post('old', created='2023-06-01T00:00:00Z', upvotes=20))
+        
+        _, report = pack_reddit_data(posts, token_budget=1000)
+        
+        assert report['date_start'] == '2023-06-01T00:00:00Z'
+    
+    def test_everything_fits(self):
+        """Test a small dataset is included whole, highest value first"""
+        posts = [make_post(i, subreddit=f"s{i}", upvotes=i) for i in range(5)]
+        
+        summary = prepare_reddit_data_summary(posts, token_budget=100000)
+        
+        assert summary.count('[Post ') == 5
+        assert summary.index('post 4 ') < summary.index('post 0 ')
+    
+    def test_empty(self):
+        """Test an empty dataset packs to nothing"""
+        summary, report = pack_reddit_data([])
+        
+        assert summary == ''
+        assert report['included'] == 0
+
+
+class TestMapReduce:
+    """Test cases for map-reduce analysis over large corpora"""
+    
+    @pytest.fixture
+    def corpus(self):
+        return [make_post(i, subreddit=f"s{i % 7}", created=f"2024-{i % 12 + 1:02d}-01T00:00:00Z") for i in range(300)]
+    
+    @pytest.fixture
+    def fake_openai(self):
+        """call_openai_api stand-in recording (model, json_mode, prompt) per call"""
+        calls = []
+        lock = threading.Lock()
+        
+        def call(api_key, prompt, model="gpt-4o", max_tokens=16000, system_prompt="", json_mode=False):
+            with lock:
+                calls.append((model, json_mode, prompt))
+            if 'FINDINGS:' in prompt:
+                return json.dumps({'themes': [{'theme': 'merged', 'posts': 2}]})
+            if 'shard 2 of' in prompt and 'FAIL_SHARD_2' in prompt:
+                raise Exception("rate limited")
+            return json.dumps({'themes': [{'theme': 'energy', 'posts': 1}]})
+        
+        with patch('modules.behavioral_analysis.call_openai_api', side_effect=call):
+            yield calls
+    
+    def test_shards_cover_every_post(self, corpus):
+        """Test shards stay within budget and together hold every post once"""
+        shards = shard_reddit_data(corpus, shard_budget=2000)
+        
+        assert len(shards) > 1
+        assert sum(len(shard) for shard in shards) == len(corpus)
+        assert {post['text'] for shard in shards for post in shard} == {post['text'] for post in corpus}
+        assert all(sum(estimate_tokens(behavioral_analysis.format_post(p, len(corpus))) for p in shard) <= 2000 for shard in shards)
+    
+    def test_map_reduce_covers_corpus(self, corpus, fake_openai):
+        """Test every shard is mapped with the cheap model and the findings merge into one object"""
+        summary, report = map_reduce_reddit_data("key", "Test Brand", corpus, shard_budget=2000, max_workers=4)
+        
+        map_calls = [c for c in fake_openai if 'FINDINGS:' not in c[2]]
+        merge_calls = [c for c in fake_openai if 'FINDINGS:' in c[2]]
+        assert len(map_calls) == report['shards'] > 1
+        assert all(model == behavioral_analysis.MAP_MODEL and json_mode for model, json_mode, _ in fake_openai)
+        assert len(merge_calls) == report['merge_rounds'] == 1
+        assert report['included'] == report['total'] == 300
+        assert report['shards_failed'] == 0
+        assert '"merged"' in summary
+        assert 'REPRESENTATIVE POSTS' in summary
+    
+    def test_failed_shard_is_reported(self, corpus, fake_openai):
+        """Test a failing shard is skipped and counted rather than sinking the analysis"""
+        shards = shard_reddit_data(corpus, shard_budget=2000)
+        shards[1][0]['text'] += ' FAIL_SHARD_2'
+        
+        _, report = map_reduce_reddit_data("key", "Test Brand", corpus, shard_budget=2000)
+        
+        assert report['shards_failed'] == 1
+        assert report['included'] == 300 - len(shards[1])
+    
+    def test_auto_mode(self, corpus, fake_openai):
+        """Test analyze_reddit_data map-reduces only when the posts don't fit the budget"""
+        with patch('modules.behavioral_analysis.get_credential', return_value="key"), \
+             patch('modules.behavioral_analysis.create_behavioral_analysis_prompt', return_value="memo prompt"), \
+             patch('modules.behavioral_analysis.CONTEXT_TOKEN_BUDGET', 5000):
+            small = analyze_reddit_data("Test Brand", corpus[:5])
+            large = analyze_reddit_data("Test Brand", corpus)
+        
+        assert small['context']['mode'] == 'single'
+        assert large['context']['mode'] == 'map_reduce'
+        assert fake_openai[-1][0] == behavioral_analysis.REDUCE_MODEL
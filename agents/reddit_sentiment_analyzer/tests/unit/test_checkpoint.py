@@ -0,0 +1,55 @@
+"""
+Unit tests for batch checkpoint and service limits
+"""
+
+import asyncio
+import json
+import pytest
+from unittest.mock import patch
+from utils.checkpoint import BatchCheckpoint
+from utils import limits
+
+
+class TestBatchCheckpoint:
+    """Test cases for BatchCheckpoint"""
+    
+    def test_restart_skips_finished(self, tmp_path):
+        """Test a reloaded checkpoint skips finished prospects and retries interrupted ones"""
+        path = tmp_path / "batch" / "checkpoint.json"
+        checkpoint = BatchCheckpoint(str(path))
+        checkpoint.update(1, "Done Brand", "done", items=12)
+        checkpoint.update(2, "Empty Brand", "no_urls")
+        checkpoint.update(3, "Broken Brand", "failed", error="boom")
+        checkpoint.update(4, "Crashed Brand", "running")
+        
+        reloaded = BatchCheckpoint(str(path))
+        
+        assert [reloaded.should_skip(i) for i in (1, 2, 3, 4, 5)] == [True, True, True, False, False]
+        assert reloaded.should_skip(3, retry_failed=True) is False
+        assert json.loads(path.read_text())["1"]["items"] == 12
+        assert not list(path.parent.glob("*.tmp"))
+
+
+class TestServiceLimits:
+    """Test cases for service_limit"""
+    
+    @pytest.mark.asyncio
+    async def test_service_limit_is_shared(self):
+        """Test every caller draws on one semaphore per service"""
+        in_flight = 0
+        peak = 0
+        
+        async def call():
+            nonlocal in_flight, peak
+            async with limits.service_limit('openai'):
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+        
+        with patch.dict(limits._semaphores, clear=True), \
+             patch('utils.limits.settings.OPENAI_MAX_CONCURRENT', 2):
+            assert limits.service_limit('openai') is limits.service_limit('openai')
+            await asyncio.gather(*(call() for _ in range(6)))
+        
+        assert peak == 2
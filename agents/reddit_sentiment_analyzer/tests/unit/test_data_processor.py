@@ -79,6 +79,23 @@ class TestDataProcessor:
         assert all(item['prospect_id'] == "test-prospect-123" for item in result)
         assert all(len(item['text']) <= 1200 for item in result)  # Text should be trimmed
     
+    @pytest.mark.asyncio
+    async def test_process_stream_matches_process_data(self, data_processor, sample_reddit_data):
+        """Test streaming batches gives the same result as one batch, deduplicating across batches"""
+        data = sample_reddit_data + sample_reddit_data[:1]
+        
+        async def batches():
+            for i in range(0, len(data), 2):
+                yield data[i:i + 2]
+        
+        streamed = []
+        async for batch in data_processor.process_stream(batches(), "Test Brand", "test-prospect-123"):
+            streamed.extend(batch)
+        streamed = data_processor.collapse_near_duplicates(streamed)
+        
+        expected = await data_processor.process_data(data, "Test Brand", "test-prospect-123")
+        assert streamed == expected
+    
     def test_filter_unwanted_content(self, data_processor, sample_reddit_data):
         """Test filtering of unwanted content"""
         # Execute
@@ -137,6 +154,24 @@ class TestDataProcessor:
         assert len(result) == 1
         assert 'legitimate discussion' in result[0]['body']
     
+    def test_match_category(self, data_processor):
+        """Test the matched category is reported, case-insensitively"""
+        assert data_processor.match_category("Beep boop, I AM A BOT") == 'bot'
+        assert data_processor.match_category("[Removed]") == 'deleted'
+        assert data_processor.match_category("Welcome to r/Supplements") == 'welcome'
+        assert data_processor.match_category("Ordinary comment about Test Brand") is None
+    
+    def test_filter_batch_reasons_across_chunks(self, data_processor, sample_reddit_data):
+        """Test drop reasons are counted, and chunking doesn't change the result"""
+        data = sample_reddit_data * 7 + [{'body': None}, {'body': 'Follow me on Insta for more Test Brand stuff'}]
+        
+        kept, dropped = data_processor.filter_batch(data)
+        kept_small, dropped_small = data_processor.filter_batch(data, chunk_size=3)
+        
+        assert [item['post_id'] for item in kept] == ['post-1', 'post-4'] * 7
+        assert dropped == {'bot': 7, 'too_short': 15, 'spam': 1}  # '[deleted]' is under min_length
+        assert kept_small == kept and dropped_small == dropped
+    
     def test_normalize_data_structure(self, data_processor):
         """Test data normalization"""
         input_data = [
@@ -185,6 +220,28 @@ class TestDataProcessor:
         assert result[0]['text'] == 'This is a duplicate post about Test Brand with the same content.'
         assert result[1]['text'] == 'This is a different post about Test Brand.'
     
+    def test_collapse_near_duplicates(self, data_processor):
+        """Test lightly edited copies collapse to the most upvoted one, with the cluster size"""
+        complaint = "The subscription renewed without warning and support took two weeks to refund me"
+        data = [
+            {'id': 'a', 'text': complaint, 'upVotes': 3},
+            {'id': 'b', 'text': complaint + "!!", 'upVotes': 40},
+            {'id': 'c', 'text': "Honestly " + complaint.lower(), 'upVotes': 7},
+            {'id': 'd', 'text': "Love the new flavour, mixes well with oat milk and tastes great", 'upVotes': 5},
+            {'id': 'e', 'text': "Same here", 'upVotes': 1}
+        ]
+        
+        result = data_processor.collapse_near_duplicates(data)
+        
+        assert [(item['id'], item['duplicateCount']) for item in result] == [('b', 3), ('d', 1), ('e', 1)]
+    
+    def test_collapse_near_duplicates_disabled(self):
+        """Test near_duplicate_distance=None leaves items untouched"""
+        processor = DataProcessor(near_duplicate_distance=None)
+        data = [{'text': 'one two three four five six'}] * 2
+        
+        assert processor.collapse_near_duplicates(data) == data
+    
     def test_trim_text_length(self, data_processor):
         """Test text trimming to max length"""
         long_text = "This is a very long text that exceeds the maximum length limit. " * 50
@@ -2,6 +2,7 @@
 Unit tests for database module
 """
 
+import threading
 import pytest
 from unittest.mock import Mock, patch
 from database.db import Database
@@ -219,3 +220,79 @@ class TestDatabase:
         mock_supabase_client.table.assert_called_with('reddit_brand_analysis_results')
         mock_supabase_client.table.return_value.insert.assert_called_with(result_data)
 
+    
+    @pytest.mark.asyncio
+    async def test_mark_urls_processed_bulk(self, database, mock_supabase_client):
+        """Test URLs are marked with one `in_` update per chunk, not one per URL"""
+        urls = [f"https://reddit.com/comments/{i}" for i in range(250)]
+        table = mock_supabase_client.schema.return_value.table.return_value
+        
+        await database.mark_urls_processed("123", urls + urls[:10])
+        
+        update = table.update.return_value
+        assert table.update.call_count == 3
+        table.update.assert_called_with({'processed': True})
+        update.eq.assert_called_with('prospect_id', "123")
+        chunks = [c[0][1] for c in update.eq.return_value.in_.call_args_list]
+        assert [len(c) for c in chunks] == [100, 100, 50]
+        assert sum(chunks, []) == urls
+    
+    @pytest.mark.asyncio
+    async def test_get_reddit_urls_for_prospects(self, database, mock_supabase_client):
+        """Test URLs for many prospects come back grouped from one request"""
+        mock_response = Mock()
+        mock_response.data = [
+            {'prospect_id': 'a', 'url': 'u1'},
+            {'prospect_id': 'b', 'url': 'u2'},
+            {'prospect_id': 'a', 'url': 'u3'}
+        ]
+        select = mock_supabase_client.schema.return_value.table.return_value.select.return_value
+        select.in_.return_value.execute.return_value = mock_response
+        
+        result = await database.get_reddit_urls_for_prospects(['a', 'b', 'c'])
+        
+        select.in_.assert_called_once_with('prospect_id', ['a', 'b', 'c'])
+        assert {k: [r['url'] for r in v] for k, v in result.items()} == {'a': ['u1', 'u3'], 'b': ['u2'], 'c': []}
+    
+    @pytest.mark.asyncio
+    async def test_get_posts_comments_pages(self, database, mock_supabase_client):
+        """Test stored rows are read a 1000-row page at a time until a short page"""
+        ranged = mock_supabase_client.schema.return_value.table.return_value.select.return_value \
+            .eq.return_value.in_.return_value.range
+        ranged.return_value.execute.side_effect = [Mock(data=[{'post_id': i} for i in range(1000)]), Mock(data=[{'post_id': 'x'}])]
+        
+        result = await database.get_posts_comments("123", ["u1", "u2"])
+        
+        assert len(result) == 1001
+        assert [c[0] for c in ranged.call_args_list] == [(0, 999), (1000, 1999)]
+    
+    @pytest.mark.asyncio
+    async def test_factory_schema_client_reused(self, database, mock_supabase_client):
+        """Test case_studies_factory queries share one schema client, closed once on close()"""
+        table = mock_supabase_client.schema.return_value.table.return_value
+        table.select.return_value.eq.return_value.execute.return_value = Mock(data=[])
+        
+        await database.get_reddit_urls("123")
+        await database.mark_urls_processed("123", ["u1"])
+        await database.insert_posts_comments([{'url': 'u1'}])
+        database.close()
+        database.close()
+        
+        mock_supabase_client.schema.assert_called_once_with('case_studies_factory')
+        mock_supabase_client.schema.return_value.aclose.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_queries_run_off_event_loop(self, database, mock_supabase_client):
+        """Test blocking supabase calls run on the DB thread pool, not the event loop thread"""
+        threads = []
+        
+        def execute():
+            threads.append(threading.current_thread())
+            return Mock(data=[])
+        
+        mock_supabase_client.schema.return_value.table.return_value.select.return_value.eq.return_value.execute = execute
+        
+        await database.get_reddit_urls("123")
+        
+        assert threads and threads[0] is not threading.current_thread()
+        assert threads[0].name.startswith("supabase")
@@ -2,17 +2,20 @@
 Unit tests for reddit_scraper module
 """
 
+import asyncio
+import time
 import pytest
 from unittest.mock import Mock, AsyncMock, patch
 import httpx
 from modules.reddit_scraper import RedditScraper
+from modules.scrape_cache import ScrapeCache
 
 
 class TestRedditScraper:
     """Test cases for RedditScraper class"""
     
     @pytest.fixture
-    def reddit_scraper(self, mock_database):
+    def reddit_scraper(self, mock_database, tmp_path):
         """Create RedditScraper instance with mocked dependencies"""
         with patch('modules.reddit_scraper.Database', return_value=mock_database), \
              patch('modules.reddit_scraper.get_settings') as mock_settings:
@@ -20,7 +23,7 @@ class TestRedditScraper:
             mock_settings.return_value.APIFY_ACTOR = "trudax/reddit-scraper-lite"
             mock_settings.return_value.MAX_POSTS_PER_URL = 20
             mock_settings.return_value.MAX_COMMENTS_PER_POST = 20
-            return RedditScraper()
+            return RedditScraper(cache=ScrapeCache(tmp_path / "scrape_cache"))
     
     @pytest.mark.asyncio
     async def test_scrape_all_urls_success(self, reddit_scraper, mock_reddit_data, mock_reddit_urls):
@@ -61,6 +64,221 @@ class TestRedditScraper:
         assert mock_scrape.call_count == len(mock_reddit_urls)
         reddit_scraper.db.insert_posts_comments.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_scrape_all_urls_concurrent(self, reddit_scraper, mock_reddit_data):
+        """Test URLs are scraped concurrently, bounded by MAX_CONCURRENT_SCRAPES, over one client"""
+        urls = [f"https://reddit.com/r/test/comments/{i}" for i in range(6)]
+        in_flight = 0
+        peak = 0
+        clients = set()
+        
+        async def slow_scrape(url, brand_name, prospect_id, client=None):
+            nonlocal in_flight, peak
+            clients.add(id(client))
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return mock_reddit_data
+        
+        with patch('modules.reddit_scraper.settings.MAX_CONCURRENT_SCRAPES', 3), \
+             patch.object(reddit_scraper, '_scrape_url', side_effect=slow_scrape):
+            start = time.perf_counter()
+            result = await reddit_scraper.scrape_all_urls(urls, "Test Brand", "test-prospect-123")
+            elapsed = time.perf_counter() - start
+        
+        assert len(result) == len(mock_reddit_data) * len(urls)
+        assert peak == 3
+        assert elapsed < 0.25  # Two waves of 0.05 s, not six
+        assert len(clients) == 1
+        reddit_scraper.db.mark_urls_processed.assert_called_once_with("test-prospect-123", urls)
+    
+    @pytest.mark.asyncio
+    async def test_scrape_all_urls_timeout(self, reddit_scraper, mock_reddit_data):
+        """Test a hung URL times out without failing the others"""
+        urls = ["https://reddit.com/r/test/comments/fast", "https://reddit.com/r/test/comments/hung"]
+        
+        async def scrape(url, brand_name, prospect_id, client=None):
+            if url.endswith("hung"):
+                await asyncio.sleep(10)
+            return mock_reddit_data
+        
+        with patch('modules.reddit_scraper.settings.SCRAPE_TIMEOUT_SECONDS', 0.05), \
+             patch.object(reddit_scraper, '_scrape_url', side_effect=scrape):
+            result = await reddit_scraper.scrape_all_urls(urls, "Test Brand", "test-prospect-123")
+        
+        assert len(result) == len(mock_reddit_data)
+        reddit_scraper.db.mark_urls_processed.assert_called_once_with("test-prospect-123", urls[:1])
+    
+    @pytest.mark.asyncio
+    async def test_scrape_all_urls_reuses_fresh_cache(self, reddit_scraper, mock_reddit_data):
+        """Test a freshly cached URL isn't scraped again, and isn't re-inserted once processed"""
+        url = "https://www.reddit.com/r/test/comments/abc123/some_title/?utm_source=share"
+        reddit_scraper.cache.put("https://old.reddit.com/r/test/comments/abc123/", mock_reddit_data)
+        reddit_scraper.db.get_reddit_urls.return_value = [{'url': url, 'processed': True}]
+        
+        with patch.object(reddit_scraper, '_scrape_url', new_callable=AsyncMock) as mock_scrape:
+            result = await reddit_scraper.scrape_all_urls([url], "Test Brand", "test-prospect-123")
+        
+        mock_scrape.assert_not_called()
+        assert len(result) == len(mock_reddit_data)
+        assert all(r['url'] == url and r['prospect_id'] == "test-prospect-123" for r in result)
+        reddit_scraper.db.insert_posts_comments.assert_not_called()
+        reddit_scraper.db.mark_urls_processed.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_scrape_all_urls_cache_for_new_prospect(self, reddit_scraper, mock_reddit_data):
+        """Test cached records are stored for a prospect that hasn't processed the URL yet"""
+        url = "https://reddit.com/r/test/comments/abc123"
+        reddit_scraper.cache.put(url, mock_reddit_data)
+        
+        with patch.object(reddit_scraper, '_scrape_url', new_callable=AsyncMock) as mock_scrape:
+            result = await reddit_scraper.scrape_all_urls([url], "Other Brand", "other-prospect")
+        
+        mock_scrape.assert_not_called()
+        assert all(r['brand_name'] == "Other Brand" for r in result)
+        reddit_scraper.db.insert_posts_comments.assert_called_once_with(result)
+        reddit_scraper.db.mark_urls_processed.assert_called_once_with("other-prospect", [url])
+    
+    @pytest.mark.asyncio
+    async def test_scrape_all_urls_refreshes_stale(self, reddit_scraper, mock_reddit_data):
+        """Test a stale processed URL is re-scraped and its old rows replaced"""
+        url = "https://reddit.com/r/test/comments/abc123"
+        reddit_scraper.cache.put(url, mock_reddit_data)
+        reddit_scraper.cache.ttl_seconds = 0
+        reddit_scraper.db.get_reddit_urls.return_value = [{'url': url, 'processed': True}]
+        
+        with patch('modules.reddit_scraper.settings.INCREMENTAL_REFRESH', False), \
+             patch.object(reddit_scraper, '_scrape_url', new_callable=AsyncMock) as mock_scrape:
+            mock_scrape.return_value = mock_reddit_data
+            await reddit_scraper.scrape_all_urls([url], "Test Brand", "test-prospect-123")
+        
+        mock_scrape.assert_called_once()
+        reddit_scraper.db.delete_posts_comments.assert_called_once_with("test-prospect-123", [url])
+        reddit_scraper.db.insert_posts_comments.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_scrape_all_urls_refreshes_incrementally(self, reddit_scraper):
+        """Test a stale processed URL keeps its stored rows and only new items are inserted"""
+        url = "https://reddit.com/r/test/comments/abc123"
+        stored = [
+            {'url': url, 'post_id': 'p1', 'created_at_reddit': '2024-01-15T10:30:00Z', 'body': 'post'},
+            {'url': url, 'post_id': 'c1', 'created_at_reddit': '2024-01-15T11:00:00Z', 'body': 'old comment'}
+        ]
+        scraped = [
+            {'url': url, 'post_id': 'p1', 'created_at_reddit': '2024-01-15T10:30:00Z', 'body': 'post'},
+            {'url': url, 'post_id': 'c1', 'created_at_reddit': '2024-01-15T11:00:00Z', 'body': 'old comment'},
+            {'url': url, 'post_id': 'c2', 'created_at_reddit': '2024-02-01T09:00:00Z', 'body': 'new comment'}
+        ]
+        reddit_scraper.db.get_reddit_urls.return_value = [{'url': url, 'processed': True}]
+        reddit_scraper.db.get_posts_comments.return_value = stored
+        
+        with patch.object(reddit_scraper, '_scrape_url', new_callable=AsyncMock) as mock_scrape:
+            mock_scrape.return_value = scraped
+            result = await reddit_scraper.scrape_all_urls([url], "Test Brand", "test-prospect-123")
+        
+        # A thread is fetched whole: no date limit
+        assert 'since' not in mock_scrape.call_args.kwargs
+        reddit_scraper.db.get_posts_comments.assert_called_once_with("test-prospect-123", [url])
+        reddit_scraper.db.delete_posts_comments.assert_not_called()
+        reddit_scraper.db.insert_posts_comments.assert_called_once_with([scraped[2]])
+        reddit_scraper.db.mark_urls_processed.assert_called_once_with("test-prospect-123", [url])
+        assert [record['post_id'] for record in result] == ['p1', 'c1', 'c2']
+    
+    @pytest.mark.asyncio
+    async def test_stream_batches_listing_since_watermark(self, reddit_scraper):
+        """Test a stale listing URL is scraped only from its newest stored post on"""
+        url = "https://reddit.com/r/test"
+        reddit_scraper.db.get_reddit_urls.return_value = [{'url': url, 'processed': True}]
+        reddit_scraper.db.get_posts_comments.return_value = [
+            {'url': url, 'post_id': 'p1', 'created_at_reddit': '2024-01-15T10:30:00Z'}
+        ]
+        
+        with patch.object(reddit_scraper, '_scrape_url', new_callable=AsyncMock) as mock_scrape:
+            mock_scrape.return_value = []
+            batches = [batch async for batch in reddit_scraper.stream_batches([url], "Test Brand", "test-prospect-123")]
+        
+        assert mock_scrape.call_args.kwargs['since'] == '2024-01-15T10:30:00Z'
+        assert batches[0]['new_records'] == []
+        assert reddit_scraper._payload(url, '2024-01-15T10:30:00Z')['postDateLimit'] == '2024-01-15T10:30:00Z'
+    
+    @pytest.mark.asyncio
+    async def test_incremental_listing_refresh_not_cached(self, reddit_scraper):
+        """Test a date-limited listing delta doesn't become the URL's cached content"""
+        url = "https://reddit.com/r/test"
+        full = [
+            {'url': url, 'post_id': 'p1', 'created_at_reddit': '2024-01-15T10:30:00Z', 'body': 'old post'},
+            {'url': url, 'post_id': 'p2', 'created_at_reddit': '2024-01-20T10:30:00Z', 'body': 'older post'}
+        ]
+        delta = [{'url': url, 'post_id': 'p3', 'created_at_reddit': '2024-02-01T10:30:00Z', 'body': 'new post'}]
+        reddit_scraper.db.get_reddit_urls.return_value = [{'url': url, 'processed': True}]
+        reddit_scraper.db.get_posts_comments.return_value = full
+        
+        with patch.object(reddit_scraper, '_scrape_url', new_callable=AsyncMock) as mock_scrape:
+            mock_scrape.return_value = delta
+            refreshed = await reddit_scraper.scrape_all_urls([url], "Test Brand", "test-prospect-123")
+            assert [record['post_id'] for record in refreshed] == ['p1', 'p2', 'p3']
+            
+            # Another prospect asking for the same URL must not get just the delta from cache
+            mock_scrape.return_value = full + delta
+            reddit_scraper.db.get_reddit_urls.return_value = []
+            other = await reddit_scraper.scrape_all_urls([url], "Other Brand", "other-prospect")
+        
+        assert mock_scrape.call_count == 2
+        assert 'since' not in mock_scrape.call_args.kwargs
+        assert [record['post_id'] for record in other] == ['p1', 'p2', 'p3']
+        assert [record['post_id'] for record in reddit_scraper.cache.records_for(reddit_scraper.cache.get(url), url, "Other Brand", "other-prospect")] == ['p1', 'p2', 'p3']
+    
+    @pytest.mark.asyncio
+    async def test_scrape_all_urls_dedupes_spellings(self, reddit_scraper, mock_reddit_data):
+        """Test several spellings of one thread are scraped once"""
+        urls = [
+            "https://www.reddit.com/r/test/comments/abc123/title/",
+            "https://old.reddit.com/r/test/comments/abc123",
+            "https://redd.it/abc123"
+        ]
+        with patch.object(reddit_scraper, '_scrape_url', new_callable=AsyncMock) as mock_scrape:
+            mock_scrape.return_value = mock_reddit_data
+            await reddit_scraper.scrape_all_urls(urls, "Test Brand", "test-prospect-123")
+        
+        mock_scrape.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_stream_batches_backpressure(self, reddit_scraper, mock_reddit_data):
+        """Test batches stream out as URLs finish, and scraping pauses while the consumer lags"""
+        urls = [f"https://reddit.com/r/test/comments/{i}" for i in range(6)]
+        started = []
+        
+        async def scrape(url, brand_name, prospect_id, client=None):
+            started.append(url)
+            return mock_reddit_data
+        
+        with patch('modules.reddit_scraper.settings.MAX_CONCURRENT_SCRAPES', 2), \
+             patch.object(reddit_scraper, '_scrape_url', side_effect=scrape):
+            stream = reddit_scraper.stream_batches(urls, "Test Brand", "test-prospect-123", queue_size=1)
+            first = await stream.__anext__()
+            await asyncio.sleep(0.05)
+            # One batch handed over, one queued, one per worker blocked on the full queue
+            assert len(started) == 4
+            rest = [batch async for batch in stream]
+        
+        assert first['stored'] is False and first['records'] == mock_reddit_data
+        assert sorted(b['url'] for b in [first] + rest) == sorted(urls)
+        reddit_scraper.db.insert_posts_comments.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_store_stream(self, reddit_scraper, mock_reddit_data):
+        """Test new batches are inserted and marked per URL; stored ones pass straight through"""
+        async def batches():
+            yield {'url': 'u1', 'records': mock_reddit_data, 'stored': False}
+            yield {'url': 'u2', 'records': mock_reddit_data, 'stored': True}
+        
+        out = [records async for records in reddit_scraper.store_stream(batches(), "Test Brand", "p1")]
+        
+        assert out == [mock_reddit_data, mock_reddit_data]
+        reddit_scraper.db.insert_posts_comments.assert_called_once_with(mock_reddit_data)
+        reddit_scraper.db.mark_urls_processed.assert_called_once_with("p1", ['u1'])
+    
     @pytest.mark.asyncio
     async def test_scrape_url_success(self, reddit_scraper, mock_apify_response):
         """Test successful scraping of a single URL"""
@@ -122,6 +340,29 @@ class TestRedditScraper:
         # Assert
         assert result == []
     
+    @pytest.mark.asyncio
+    async def test_scrape_url_async_run(self, reddit_scraper, mock_apify_response):
+        """Test async-run mode starts a run, waits and pages the dataset"""
+        def handler(request):
+            path = request.url.path
+            if path.endswith("/runs"):
+                return httpx.Response(201, json={"data": {"id": "run-1", "status": "READY", "defaultDatasetId": "ds-1"}})
+            if path.endswith("/actor-runs/run-1"):
+                return httpx.Response(200, json={"data": {"id": "run-1", "status": "SUCCEEDED", "defaultDatasetId": "ds-1"}})
+            if path.endswith("/datasets/ds-1/items"):
+                return httpx.Response(200, json=mock_apify_response)
+            return httpx.Response(404)
+        
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch('modules.reddit_scraper.settings.APIFY_ASYNC_RUNS', True):
+            result = await reddit_scraper._scrape_url(
+                "https://reddit.com/r/test/comments/123", "Test Brand", "test-prospect-123", client=client
+            )
+        
+        assert len(result) == 1
+        assert result[0]['body'] == "Great product!"
+        assert result[0]['prospect_id'] == "test-prospect-123"
+    
     def test_transform_post_data(self, reddit_scraper):
         """Test transformation of post data"""
         # Setup
@@ -0,0 +1,64 @@
+"""
+Unit tests for scrape_cache module
+"""
+
+import pytest
+from modules.scrape_cache import ScrapeCache, normalize_reddit_url
+
+
+class TestNormalizeRedditUrl:
+    """Test cases for normalize_reddit_url"""
+    
+    @pytest.mark.parametrize("url", [
+        "https://www.reddit.com/r/Supplements/comments/abc123/test_brand_review/",
+        "https://old.reddit.com/r/supplements/comments/ABC123",
+        "http://m.reddit.com/r/Supplements/comments/abc123/x/?utm_source=share#c1",
+        "https://reddit.com/comments/abc123",
+        "https://redd.it/abc123",
+    ])
+    def test_thread_spellings_collapse(self, url):
+        """Test every spelling of a thread maps to the same key"""
+        assert normalize_reddit_url(url) == "https://reddit.com/comments/abc123"
+    
+    def test_non_thread_urls(self):
+        """Test subreddit and non-Reddit URLs keep their path"""
+        assert normalize_reddit_url("https://www.reddit.com/r/Wellness/") == "https://reddit.com/r/wellness"
+        assert normalize_reddit_url("https://Example.com/Page?q=1") == "https://example.com/page"
+
+
+class TestScrapeCache:
+    """Test cases for ScrapeCache"""
+    
+    def test_put_get_round_trip(self, tmp_path):
+        """Test records stored under one spelling are found under another"""
+        cache = ScrapeCache(tmp_path, ttl_seconds=60)
+        cache.put("https://reddit.com/r/a/comments/xyz/title", [{'post_id': '1', 'url': 'old'}])
+        
+        entry = cache.get("https://old.reddit.com/r/a/comments/xyz/")
+        assert entry['key'] == "https://reddit.com/comments/xyz"
+        assert entry['records'] == [{'post_id': '1', 'url': 'old'}]
+        assert not list(tmp_path.glob("*.tmp"))
+    
+    def test_stale_and_missing(self, tmp_path):
+        """Test stale entries and unknown URLs miss"""
+        cache = ScrapeCache(tmp_path, ttl_seconds=0)
+        cache.put("https://reddit.com/comments/xyz", [])
+        
+        assert cache.get("https://reddit.com/comments/xyz") is None
+        assert cache.get("https://reddit.com/comments/other") is None
+    
+    def test_corrupt_entry_misses(self, tmp_path):
+        """Test an unreadable entry is treated as a miss"""
+        cache = ScrapeCache(tmp_path, ttl_seconds=60)
+        cache.put("https://reddit.com/comments/xyz", [])
+        cache._path("https://reddit.com/comments/xyz").write_text("{not json")
+        
+        assert cache.get("https://reddit.com/comments/xyz") is None
+    
+    def test_records_for_restamps(self, tmp_path):
+        """Test cached records take the caller's URL, brand and prospect"""
+        cache = ScrapeCache(tmp_path, ttl_seconds=60)
+        cache.put("https://reddit.com/comments/xyz", [{'post_id': '1', 'brand_name': 'A', 'prospect_id': 'p1'}])
+        
+        records = cache.records_for(cache.get("https://redd.it/xyz"), "https://redd.it/xyz", "B", "p2")
+        assert records == [{'post_id': '1', 'brand_name': 'B', 'prospect_id': 'p2', 'url': 'https://redd.it/xyz'}]
@@ -0,0 +1,58 @@
+"""
+Unit tests for stream helpers
+"""
+
+import asyncio
+import pytest
+from utils.streams import buffered, collect
+
+
+class TestStreams:
+    """Test cases for buffered and collect"""
+    
+    @pytest.mark.asyncio
+    async def test_buffered_overlaps_and_bounds(self):
+        """Test the source runs ahead of the consumer, but at most maxsize items"""
+        produced = []
+        
+        async def source():
+            for i in range(10):
+                produced.append(i)
+                yield [i]
+        
+        stream = buffered(source(), maxsize=2)
+        assert await stream.__anext__() == [0]
+        await asyncio.sleep(0.01)
+        # One handed over, two queued, one waiting on the full queue
+        assert len(produced) == 4
+        assert await collect(stream) == list(range(1, 10))
+    
+    @pytest.mark.asyncio
+    async def test_buffered_reraises(self):
+        """Test a failing source raises in the consumer after its earlier items"""
+        async def source():
+            yield 1
+            raise ValueError("boom")
+        
+        seen = []
+        with pytest.raises(ValueError, match="boom"):
+            async for item in buffered(source(), maxsize=1):
+                seen.append(item)
+        assert seen == [1]
+    
+    @pytest.mark.asyncio
+    async def test_buffered_close_stops_source(self):
+        """Test closing the consumer early closes the source"""
+        closed = asyncio.Event()
+        
+        async def source():
+            try:
+                for i in range(100):
+                    yield i
+            finally:
+                closed.set()
+        
+        stream = buffered(source(), maxsize=1)
+        assert await stream.__anext__() == 0
+        await stream.aclose()
+        assert closed.is_set()
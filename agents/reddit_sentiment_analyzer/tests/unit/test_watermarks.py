@@ -0,0 +1,46 @@
+"""
+Unit tests for watermarks module
+"""
+
+import pytest
+from modules.watermarks import build_watermarks, is_thread_url, new_since
+
+
+class TestWatermarks:
+    """Test cases for thread watermarks"""
+    
+    @pytest.fixture
+    def stored_rows(self):
+        return [
+            {'url': 'https://www.reddit.com/r/test/comments/abc123/title/', 'post_id': 'p1', 'created_at_reddit': '2024-01-15T10:30:00Z'},
+            {'url': 'https://reddit.com/r/test/comments/abc123', 'post_id': 'c1', 'created_at_reddit': '2024-03-01T08:00:00Z'},
+            {'url': 'https://reddit.com/r/test/comments/abc123', 'post_id': 'c2', 'created_at_reddit': '2024-02-01T08:00:00Z'},
+            {'url': 'https://reddit.com/r/other', 'post_id': 'p9', 'created_at_reddit': None}
+        ]
+    
+    def test_build_watermarks_per_thread(self, stored_rows):
+        """Test rows group by normalized URL with the newest timestamp and all ids"""
+        watermarks = build_watermarks(stored_rows)
+        
+        assert len(watermarks) == 2
+        thread = next(mark for key, mark in watermarks.items() if 'abc123' in key)
+        assert thread['last_created_at'] == '2024-03-01T08:00:00Z'
+        assert thread['seen_ids'] == {'p1', 'c1', 'c2'}
+        assert len(thread['rows']) == 3
+    
+    def test_new_since_filters_seen_ids(self, stored_rows):
+        """Test only unseen ids are new, even when older than the watermark"""
+        thread = next(iter(build_watermarks(stored_rows[:3]).values()))
+        records = [
+            {'post_id': 'c1', 'created_at_reddit': '2024-03-01T08:00:00Z'},
+            {'post_id': 'c3', 'created_at_reddit': '2024-01-20T08:00:00Z'},
+            {'post_id': 'c4', 'created_at_reddit': '2024-04-01T08:00:00Z'}
+        ]
+        
+        assert [record['post_id'] for record in new_since(records, thread)] == ['c3', 'c4']
+        assert new_since(records, None) == records
+    
+    def test_is_thread_url(self):
+        """Test threads and listings are told apart"""
+        assert is_thread_url('https://old.reddit.com/r/test/comments/abc123/x/')
+        assert not is_thread_url('https://www.reddit.com/r/test/')
@@ -0,0 +1,48 @@
+"""
+Per-prospect status checkpoint for batch runs
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class BatchCheckpoint:
+    """
+    Status of each prospect in a batch run, saved to JSON after every change.
+
+    Entries are keyed by prospect id: {'brand_name', 'status', 'updated_at', ...}
+    with status 'running', 'done', 'no_urls' or 'failed'. A restarted run skips
+    finished prospects; 'running' entries are from a run that died mid-way and
+    are retried.
+    """
+
+    FINISHED = {'done', 'no_urls'}
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            self.entries = json.loads(self.path.read_text(encoding='utf-8'))
+
+    def status(self, prospect_id: str) -> Optional[str]:
+        entry = self.entries.get(str(prospect_id))
+        return entry['status'] if entry else None
+
+    def should_skip(self, prospect_id: str, retry_failed: bool = False) -> bool:
+        status = self.status(prospect_id)
+        return status in self.FINISHED or (status == 'failed' and not retry_failed)
+
+    def update(self, prospect_id: str, brand_name: str, status: str, **details: Any) -> None:
+        """Record a prospect's status (written atomically)"""
+        self.entries[str(prospect_id)] = {
+            'brand_name': brand_name,
+            'status': status,
+            'updated_at': time.time(),
+            **details
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self.entries, indent=2, ensure_ascii=False), encoding='utf-8')
+        tmp.replace(self.path)
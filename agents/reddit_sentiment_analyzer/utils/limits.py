@@ -0,0 +1,33 @@
+"""
+Process-wide concurrency limits per external service
+"""
+
+import asyncio
+from typing import Dict
+from config.settings import get_settings
+
+settings = get_settings()
+
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def _size(service: str) -> int:
+    sizes = {
+        'apify': settings.APIFY_MAX_CONCURRENT_RUNS,
+        'openai': settings.OPENAI_MAX_CONCURRENT,
+    }
+    return sizes[service]
+
+
+def service_limit(service: str) -> asyncio.Semaphore:
+    """
+    Shared semaphore capping in-flight calls to a service ('apify' or 'openai').
+
+    Every prospect and module draws on the same semaphore, so running many
+    prospects at once can't exceed the account's limits. Supabase needs no
+    entry here: its queries already share the DB thread pool (DB_MAX_WORKERS).
+    """
+    semaphore = _semaphores.get(service)
+    if semaphore is None:
+        semaphore = _semaphores[service] = asyncio.Semaphore(_size(service))
+    return semaphore
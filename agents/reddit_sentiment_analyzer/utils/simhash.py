@@ -0,0 +1,150 @@
+"""
+SimHash fingerprints and an LSH index for near-duplicate text
+"""
+
+import hashlib
+import random
+import re
+import sys
+from array import array
+from typing import Dict, List, Set, Tuple
+
+_WORD = re.compile(r"\w+")
+# bytes.translate tables mapping a byte to 1 if the given bit is set, else 0
+_BIT_TABLES = [bytes((value >> bit) & 1 for value in range(256)) for bit in range(8)]
+_LITTLE_ENDIAN = sys.byteorder == "little"
+# Trigram hashes, memoized: the set of distinct trigrams is small, so after warm-up
+# a stable blake2b hash costs no more than a dict lookup
+_FEATURE_HASHES: Dict[str, int] = {}
+_MAX_MEMO = 1 << 20
+
+# Default max bit difference for two fingerprints to count as near-duplicates
+NEAR_DUPLICATE_DISTANCE = 6
+
+
+def _hash_feature(feature: str) -> int:
+    if len(_FEATURE_HASHES) >= _MAX_MEMO:
+        _FEATURE_HASHES.clear()
+    value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+    _FEATURE_HASHES[feature] = value
+    return value
+
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    """
+    Character n-grams of the lowercased words, single-spaced.
+
+    Character grams, rather than word grams, give a short comment enough
+    features that a small edit moves only a few fingerprint bits.
+    """
+    normalized = " ".join(_WORD.findall(text.lower()))
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def simhash(features: Set[str]) -> int:
+    """
+    64-bit SimHash of a feature set.
+
+    Each bit is set when most features' hashes have it set. The hashes are
+    packed into one bytes object and each bit's vote is counted per byte column
+    with bytes.translate + count, so the work per feature is a single
+    (memoized) hash lookup.
+    """
+    if not features:
+        return 0
+    known = _FEATURE_HASHES.get
+    raw = array("Q", [known(feature) or _hash_feature(feature) for feature in features]).tobytes()
+    half = len(features) / 2
+    fingerprint = 0
+    for byte in range(8):
+        column = raw[byte::8]
+        shift = 8 * byte if _LITTLE_ENDIAN else 8 * (7 - byte)
+        for bit in range(8):
+            if column.translate(_BIT_TABLES[bit]).count(1) > half:
+                fingerprint |= 1 << (shift + bit)
+    return fingerprint
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _band_masks(tables: int, bands: int, seed: int = 0) -> List[int]:
+    """Per table, a random partition of the 64 bits into `bands` masks"""
+    rng = random.Random(seed)
+    masks = []
+    for _ in range(tables):
+        positions = rng.sample(range(64), 64)
+        for band in range(bands):
+            mask = 0
+            for position in positions[band::bands]:
+                mask |= 1 << position
+            masks.append(mask)
+    return masks
+
+
+def _candidate_pairs(
+    fingerprints: List[int],
+    max_distance: int,
+    tables: int,
+    bands: int
+) -> List[Tuple[int, int]]:
+    """
+    Index pairs whose fingerprints differ in at most max_distance bits.
+
+    Each table splits the 64 bits into `bands` random disjoint masks, and only
+    fingerprints agreeing exactly on some mask are compared. With 16-bit masks
+    buckets stay small, so work grows with the number of fingerprints rather
+    than all pairs. Pairs within bands - 1 bits always share a mask
+    (pigeonhole); further apart, each extra table is another chance to meet.
+    """
+    pairs = set()
+    for mask in _band_masks(tables, bands):
+        buckets: Dict[int, List[int]] = {}
+        for index, fingerprint in enumerate(fingerprints):
+            buckets.setdefault(fingerprint & mask, []).append(index)
+        for members in buckets.values():
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    i, j = members[x], members[y]
+                    if (i, j) not in pairs and hamming(fingerprints[i], fingerprints[j]) <= max_distance:
+                        pairs.add((i, j))
+    return list(pairs)
+
+
+def near_duplicate_clusters(
+    fingerprints: List[int],
+    max_distance: int = NEAR_DUPLICATE_DISTANCE,
+    tables: int = 4,
+    bands: int = 4
+) -> List[List[int]]:
+    """
+    Group indexes of fingerprints within max_distance bits of each other.
+
+    Identical fingerprints are grouped first, so heavily copied text costs one
+    LSH entry rather than a quadratic bucket. Clusters are transitive
+    (union-find) and come back in order of their first member; singletons
+    included.
+    """
+    by_fingerprint: Dict[int, List[int]] = {}
+    for index, fingerprint in enumerate(fingerprints):
+        by_fingerprint.setdefault(fingerprint, []).append(index)
+    unique = list(by_fingerprint)
+
+    parent = list(range(len(unique)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in _candidate_pairs(unique, max_distance, tables, bands):
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    groups: Dict[int, List[int]] = {}
+    for u, fingerprint in enumerate(unique):
+        groups.setdefault(find(u), []).extend(by_fingerprint[fingerprint])
+    return sorted((sorted(members) for members in groups.values()), key=lambda members: members[0])
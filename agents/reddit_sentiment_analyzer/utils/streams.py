@@ -0,0 +1,55 @@
+"""
+Async stream helpers for the staged pipeline
+"""
+
+import asyncio
+from typing import AsyncIterator, List, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+async def buffered(source: AsyncIterator[T], maxsize: int) -> AsyncIterator[T]:
+    """
+    Run `source` in its own task, handing items over through a bounded queue.
+
+    The stage producing `source` keeps working while the consumer handles the
+    previous item, but never gets more than `maxsize` items ahead. Errors from
+    the source are re-raised to the consumer; closing the consumer early stops
+    the source.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    async def pump() -> None:
+        try:
+            async for item in source:
+                await queue.put((item, None))
+            await queue.put((_DONE, None))
+        except Exception as e:
+            await queue.put((_DONE, e))
+        finally:
+            aclose = getattr(source, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+async def collect(batches: AsyncIterator[List[T]]) -> List[T]:
+    """Flatten a stream of batches into one list"""
+    items: List[T] = []
+    async for batch in batches:
+        items.extend(batch)
+    return items
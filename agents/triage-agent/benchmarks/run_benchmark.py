@@ -0,0 +1,137 @@
+"""
+Offline Layer 1 triage benchmark against a stored baseline.
+
+Replays recorded LLM responses for the golden corpus (benchmarks/corpus/),
+so it runs without network or API keys. Reports per-stage wall time, parse
+time, tokens, cost and item-count stability, and exits non-zero on a
+regression versus benchmarks/baseline.json.
+
+Usage:
+    python benchmarks/run_benchmark.py                      # Compare to baseline
+    python benchmarks/run_benchmark.py --update-baseline    # Accept current numbers
+    python benchmarks/run_benchmark.py --prompt prompts/versions/triage_v2.txt --allow-stale
+    python benchmarks/run_benchmark.py --record --samples 3 # Live: add recordings (needs API key)
+"""
+import sys
+import argparse
+import json
+from pathlib import Path
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from notes_agent.benchmark import (
+    DEFAULT_BASELINE,
+    DEFAULT_CORPUS_DIR,
+    DEFAULT_RECORDINGS,
+    STAGES,
+    compare_to_baseline,
+    load_baseline,
+    load_corpus,
+    record_corpus,
+    run_benchmark,
+    save_baseline,
+)
+
+load_dotenv()
+
+
+def print_results(results: dict) -> None:
+    header = f"  {'note':28}" + "".join(f"{stage:>12}" for stage in STAGES) + f"{'tokens':>9}{'cost $':>10}  items"
+    print(header)
+    print(f"  {'─' * (len(header) - 2)}")
+
+    for name, r in results["notes"].items():
+        stages = "".join(f"{r['stages_ms'][stage]:>12.3f}" for stage in STAGES)
+        tokens = r["prompt_tokens"] + r["completion_tokens"]
+        cost = f"{r['cost_usd']:.5f}" if r["cost_usd"] is not None else "n/a"
+        counts = r["item_counts"]
+        stable = "" if len(set(counts)) <= 1 else "  ⚠️ unstable"
+        stale = "  (stale)" if r["stale"] else ""
+        print(f"  {name[:28]:28}{stages}{tokens:>9}{cost:>10}  {counts}{stable}{stale}")
+
+    totals = results["totals"]
+    stages = "".join(f"{totals['stages_ms'][stage]:>12.3f}" for stage in STAGES)
+    tokens = totals["prompt_tokens"] + totals["completion_tokens"]
+    cost = f"{totals['cost_usd']:.5f}" if totals["cost_usd"] is not None else "n/a"
+    print(f"  {'─' * (len(header) - 2)}")
+    print(f"  {'TOTAL':28}{stages}{tokens:>9}{cost:>10}")
+    print(f"\n  Stage times are medians in ms over {results['repeats']} runs (llm_call is replay overhead).")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline triage benchmark (record/replay)")
+    parser.add_argument('--corpus', default=str(DEFAULT_CORPUS_DIR), help='Golden corpus directory')
+    parser.add_argument('--recordings', default=str(DEFAULT_RECORDINGS), help='Recorded responses (JSONL)')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='Baseline results (JSON)')
+    parser.add_argument('--prompt', help='System prompt file under test (default: current Layer 1 prompt)')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed runs per note (default: 20)')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown fraction (default: 0.25)')
+    parser.add_argument('--allow-stale', action='store_true', help='Replay recordings made with another prompt')
+    parser.add_argument('--update-baseline', action='store_true', help='Store these results as the baseline')
+    parser.add_argument('--record', action='store_true', help='Record live responses first (calls the API)')
+    parser.add_argument('--samples', type=int, default=3, help='Recordings per note in --record mode (default: 3)')
+    parser.add_argument('--output', help='Also write full results JSON here')
+    args = parser.parse_args()
+
+    notes = load_corpus(Path(args.corpus))
+    system_prompt = Path(args.prompt).read_text(encoding='utf-8') if args.prompt else None
+
+    if args.record:
+        made = record_corpus(notes, Path(args.recordings), args.samples, system_prompt)
+        print(f"🎙️  Recorded {made} new responses\n")
+
+    print(f"\n{'='*80}")
+    print(f"TRIAGE BENCHMARK ({len(notes)} notes, replayed)")
+    print(f"{'='*80}\n")
+
+    try:
+        results = run_benchmark(
+            notes,
+            recordings_path=Path(args.recordings),
+            repeats=args.repeat,
+            system_prompt=system_prompt,
+            allow_stale=args.allow_stale
+        )
+    except ValueError as e:
+        print(f"❌ {e}")
+        print("   Prompt changed? Use --allow-stale, or --record to re-record (calls the API)\n")
+        sys.exit(1)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        save_baseline(results, baseline_path)
+        print(f"\n💾 Baseline updated: {baseline_path}\n")
+        return
+
+    baseline = load_baseline(baseline_path)
+    if baseline is None:
+        print(f"\n⚠️  No baseline at {baseline_path} (run with --update-baseline)\n")
+        return
+
+    report = compare_to_baseline(results, baseline, tolerance=args.tolerance)
+
+    print(f"\n{'='*80}")
+    print(f"VS BASELINE ({baseline.get('generated_at', '?')[:19]})")
+    print(f"{'='*80}\n")
+    for line in report["improvements"]:
+        print(f"  ✅ {line}")
+    for line in report["changes"]:
+        print(f"  ℹ️  {line}")
+    for line in report["regressions"]:
+        print(f"  ❌ {line}")
+    if not any(report.values()):
+        print("  No differences")
+    print()
+
+    if report["regressions"]:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -60,6 +60,102 @@ CREATE TABLE IF NOT EXISTS raw.insights (
 CREATE INDEX IF NOT EXISTS idx_insights_status ON raw.insights(status);
 CREATE INDEX IF NOT EXISTS idx_insights_created ON raw.insights(created_at);
 
+-- Full-text search: generated tsvector columns + GIN indexes
+-- Weighted so matches in the text itself rank above matches in tags/classification
+ALTER TABLE raw.triage_items ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(raw_context, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(tags, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(domain, '') || ' ' || coalesce(type, '')), 'C')
+    ) STORED;
+
+ALTER TABLE raw.insights ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(insight, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(tags, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(publishable_angle, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_triage_items_search ON raw.triage_items USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_insights_search ON raw.insights USING GIN (search_vector);
+
+-- Ranked search over triage items (called via client.schema('raw').rpc('search_triage_items', ...))
+-- NULL filters are ignored; search_query uses web search syntax ("quoted phrase", -exclude, or)
+CREATE OR REPLACE FUNCTION raw.search_triage_items(
+    search_query TEXT,
+    filter_type TEXT DEFAULT NULL,
+    filter_domain TEXT DEFAULT NULL,
+    filter_personal_or_work TEXT DEFAULT NULL,
+    filter_niche_signal BOOLEAN DEFAULT NULL,
+    filter_publishable BOOLEAN DEFAULT NULL,
+    filter_date_from DATE DEFAULT NULL,
+    filter_date_to DATE DEFAULT NULL,
+    match_limit INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+    id TEXT,
+    source_file TEXT,
+    date DATE,
+    raw_context TEXT,
+    personal_or_work TEXT,
+    domain TEXT,
+    type TEXT,
+    tags TEXT,
+    niche_signal BOOLEAN,
+    publishable BOOLEAN,
+    rank REAL
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        t.id, t.source_file, t.date, t.raw_context, t.personal_or_work,
+        t.domain, t.type, t.tags, t.niche_signal, t.publishable,
+        ts_rank(t.search_vector, q) AS rank
+    FROM raw.triage_items t, websearch_to_tsquery('english', search_query) q
+    WHERE t.search_vector @@ q
+      AND (filter_type IS NULL OR t.type = filter_type)
+      AND (filter_domain IS NULL OR t.domain = filter_domain)
+      AND (filter_personal_or_work IS NULL OR t.personal_or_work = filter_personal_or_work)
+      AND (filter_niche_signal IS NULL OR t.niche_signal = filter_niche_signal)
+      AND (filter_publishable IS NULL OR t.publishable = filter_publishable)
+      AND (filter_date_from IS NULL OR t.date >= filter_date_from)
+      AND (filter_date_to IS NULL OR t.date <= filter_date_to)
+    ORDER BY rank DESC, t.date DESC
+    LIMIT match_limit;
+$$;
+
+-- Ranked search over insights
+CREATE OR REPLACE FUNCTION raw.search_insights(
+    search_query TEXT,
+    filter_status TEXT DEFAULT NULL,
+    match_limit INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+    insight_id TEXT,
+    linked_triage_ids TEXT,
+    insight TEXT,
+    tags TEXT,
+    publishable_angle TEXT,
+    status TEXT,
+    created_at TIMESTAMP WITH TIME ZONE,
+    rank REAL
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        i.insight_id, i.linked_triage_ids, i.insight, i.tags,
+        i.publishable_angle, i.status, i.created_at,
+        ts_rank(i.search_vector, q) AS rank
+    FROM raw.insights i, websearch_to_tsquery('english', search_query) q
+    WHERE i.search_vector @@ q
+      AND (filter_status IS NULL OR i.status = filter_status)
+    ORDER BY rank DESC, i.created_at DESC
+    LIMIT match_limit;
+$$;
+
+GRANT EXECUTE ON FUNCTION raw.search_triage_items TO anon, authenticated, service_role;
+GRANT EXECUTE ON FUNCTION raw.search_insights TO anon, authenticated, service_role;
+
 -- Enable Row Level Security (optional, but recommended)
 ALTER TABLE raw.processed_files ENABLE ROW LEVEL SECURITY;
 ALTER TABLE raw.triage_items ENABLE ROW LEVEL SECURITY;
@@ -1,16 +1,24 @@
 """
 Process Obsidian files to Supabase with duplicate detection.
 Only processes files that haven't been processed or have changed.
+
+Usage:
+    python scripts/process_obsidian_to_supabase.py
+    python scripts/process_obsidian_to_supabase.py --run-budget 0.50 --daily-budget 2.00 --ledger data/cost_ledger.sqlite
 """
 import sys
 import json
+import argparse
 from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
 
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
-from notes_agent.layer1_triage import triage_braindump
+from agent_utils import BudgetExceeded, BudgetGuard, CostLedger
+from agent_utils.tokens import count_tokens
+
+from notes_agent.layer1_triage import build_user_prompt, load_prompt, triage_braindump
 from notes_agent.llm_clients import call_openrouter, parse_json_response
 from notes_agent.tools_supabase import (
     get_supabase_client,
@@ -19,7 +27,8 @@ from notes_agent.tools_supabase import (
     mark_file_processed,
     write_triage_items,
     write_insights,
-    get_processing_stats
+    get_processing_stats,
+    get_triage_items_by_ids
 )
 
 load_dotenv()
@@ -31,37 +40,49 @@ def load_layer2_prompt() -> str:
     return prompt_path.read_text(encoding="utf-8")
 
 
-def run_layer1(input_text: str, date: str, starting_id: int, source_file: str):
+LAYER1_MODEL = "openai/gpt-4o-mini"
+LAYER2_MODEL = "openai/gpt-4o-mini"
+MAX_OUTPUT_TOKENS = 8000
+DEFAULT_PENDING_PATH = Path(__file__).parent.parent / "data" / "layer2_pending.json"
+
+
+def run_layer1(input_text: str, date: str, starting_id: int, source_file: str, guard: BudgetGuard):
     """Run Layer 1 triage."""
+    # Raises BudgetExceeded if even the cheapest model won't fit
+    decision = guard.check(
+        "openai",
+        LAYER1_MODEL,
+        system_prompt=load_prompt(),
+        user_prompt=build_user_prompt(input_text, date, starting_id),
+        max_output_tokens=MAX_OUTPUT_TOKENS
+    )
+    if decision["action"] == "downgrade":
+        print(f"  💸 Budget: {decision['reason']}")
+
     print(f"  🤖 Running triage...")
 
     items = triage_braindump(
         raw_text=input_text,
         date=date,
-        starting_id=starting_id
+        starting_id=starting_id,
+        model=decision["model"]
     )
 
+    # Clients return text only, so completion tokens are estimated from the parsed items
+    output = json.dumps([item.model_dump() for item in items], ensure_ascii=False)
+    guard.commit(decision, tokens={
+        "prompt_tokens": decision["prompt_tokens"],
+        "completion_tokens": count_tokens(output, decision["model"], mode="approx")
+    }, stage="layer1")
+
     print(f"  ✓ Generated {len(items)} triage items")
     return items
 
 
-def run_layer2(triage_items: list, date: str, insight_counter: int):
-    """Run Layer 2 insight generation."""
-    # Filter items
-    skip_types = {"Task", "Technical", "Config"}
-    items_to_process = [item for item in triage_items if item.type not in skip_types]
-
-    if not items_to_process:
-        print(f"  ⏭️  No items to process for insights")
-        return [], insight_counter
-
-    print(f"  🤖 Generating insights from {len(items_to_process)} items...")
-
-    system_prompt = load_layer2_prompt()
-
-    # Build user prompt
+def build_layer2_prompt(items: list, date: str, insight_counter: int) -> str:
+    """Build the Layer 2 user prompt for a set of triage items."""
     triage_json = []
-    for item in items_to_process:
+    for item in items:
         triage_json.append({
             "id": item.id,
             "date": item.date,
@@ -74,7 +95,7 @@ def run_layer2(triage_items: list, date: str, insight_counter: int):
             "publishable": item.publishable
         })
 
-    user_prompt = f"""Date: {date}
+    return f"""Date: {date}
 Starting Insight ID: I{insight_counter:03d}
 
 TRIAGE ITEMS TO ANALYZE:
@@ -89,37 +110,129 @@ CRITICAL JSON FORMATTING RULES:
 
 Generate insights following the rules in the system prompt. Return the JSON object now:"""
 
-    # Call LLM
+
+def generate_insights(system_prompt: str, user_prompt: str, decision: dict, guard: BudgetGuard):
+    """One Layer 2 call; returns its insights, or None if the call failed."""
     try:
         response = call_openrouter(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
-            model="openai/gpt-4o-mini",
+            model=decision["model"],
             temperature=0.3,
-            max_tokens=8000,
+            max_tokens=MAX_OUTPUT_TOKENS,
             response_format={"type": "json_object"}
         )
+        guard.commit(decision, tokens={
+            "prompt_tokens": decision["prompt_tokens"],
+            "completion_tokens": count_tokens(response, decision["model"], mode="approx")
+        }, stage="layer2")
 
         data = parse_json_response(response)
 
         # Handle both array and object with "insights" key
         if isinstance(data, list):
-            insights = data
-        elif isinstance(data, dict) and "insights" in data:
-            insights = data["insights"]
-        else:
-            print(f"  ⚠️  Unexpected format, no insights generated")
-            return [], insight_counter
-
-        print(f"  ✓ Generated {len(insights)} insights")
-        return insights, insight_counter + len(insights)
+            return data
+        if isinstance(data, dict) and "insights" in data:
+            return data["insights"]
+        print(f"  ⚠️  Unexpected format, no insights generated")
+        return []
 
     except Exception as e:
         print(f"  ❌ Error generating insights: {e}")
-        return [], insight_counter
+        return None
+
+
+def run_layer2(triage_items: list, date: str, insight_counter: int, guard: BudgetGuard):
+    """
+    Run Layer 2 insight generation.
+
+    When the budget only covers part of the items (a "shrink"), the rest go
+    in further budget-checked calls rather than being dropped.
+
+    Returns:
+        (insights, next insight counter, items left without insights,
+         BudgetExceeded if the budget ran out before they were done, else None)
+    """
+    # Filter items
+    skip_types = {"Task", "Technical", "Config"}
+    remaining = [item for item in triage_items if item.type not in skip_types]
+
+    if not remaining:
+        print(f"  ⏭️  No items to process for insights")
+        return [], insight_counter, [], None
+
+    system_prompt = load_layer2_prompt()
+    insights = []
+    failed = []
+
+    while remaining:
+        user_prompt = build_layer2_prompt(remaining, date, insight_counter)
+
+        # Raises BudgetExceeded if even one item won't fit
+        try:
+            decision = guard.check(
+                "openai",
+                LAYER2_MODEL,
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                max_output_tokens=MAX_OUTPUT_TOKENS,
+                batch_size=len(remaining)
+            )
+        except BudgetExceeded as e:
+            return insights, insight_counter, failed + remaining, e
+
+        batch = remaining
+        if decision["action"] == "shrink":
+            print(f"  💸 Budget: {decision['reason']}")
+            batch = remaining[:decision["batch_size"]]
+            user_prompt = build_layer2_prompt(batch, date, insight_counter)
+        elif decision["action"] == "downgrade":
+            print(f"  💸 Budget: {decision['reason']}")
+        remaining = remaining[len(batch):]
+
+        print(f"  🤖 Generating insights from {len(batch)} items...")
+        batch_insights = generate_insights(system_prompt, user_prompt, decision, guard)
+        if batch_insights is None:
+            failed.extend(batch)
+            continue
+
+        print(f"  ✓ Generated {len(batch_insights)} insights")
+        insights.extend(batch_insights)
+        insight_counter += len(batch_insights)
+
+    return insights, insight_counter, failed, None
+
+
+def load_pending(path: Path) -> dict:
+    """Triage item IDs per source file still waiting for Layer 2 insights."""
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_pending(path: Path, pending: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(pending, indent=2), encoding="utf-8")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Process Obsidian notes to Supabase")
+    parser.add_argument('--run-budget', type=float, help='Max USD for this run')
+    parser.add_argument('--daily-budget', type=float, help='Max USD per UTC day (needs --ledger to count earlier runs)')
+    parser.add_argument('--ledger', help='Cost ledger (SQLite) to record calls in and seed daily spend from')
+    parser.add_argument('--pending', default=str(DEFAULT_PENDING_PATH),
+                        help='Items left without insights (budget or errors); retried at the start of the next run')
+    args = parser.parse_args()
+    pending_path = Path(args.pending)
+
+    ledger = CostLedger(args.ledger) if args.ledger else None
+    guard = BudgetGuard(
+        run_limit=args.run_budget,
+        daily_limit=args.daily_budget,
+        ledger=ledger,
+        agent="triage-agent"
+    )
+
     # Obsidian path
     obsidian_path = Path("/Users/snehamehrin/Desktop/obsidian_vaults/obsidian/Personal Context/journal_notes")
 
@@ -174,9 +287,37 @@ def main():
     skipped_count = 0
     total_items = 0
     total_insights = 0
+    halted = None
+    date = datetime.now().strftime("%Y-%m-%d")
+
+    # Items an earlier run triaged but couldn't afford (or failed) to generate insights for
+    pending = load_pending(pending_path)
+    for filename, item_ids in list(pending.items()):
+        print(f"📌 {filename}: retrying insights for {len(item_ids)} items left by an earlier run")
+        try:
+            items = get_triage_items_by_ids(client, item_ids)
+            insights, insight_id_counter, left, halted = run_layer2(items, date, insight_id_counter, guard)
+            if insights:
+                write_insights(client, insights)
+                print(f"  ✓ Saved {len(insights)} insights to Supabase")
+                total_insights += len(insights)
+        except Exception as e:
+            print(f"  ⚠️  Error in Layer 2: {e}\n")
+            continue
+
+        if left:
+            pending[filename] = [item.id for item in left]
+        else:
+            del pending[filename]
+        save_pending(pending_path, pending)
+        print()
+        if halted is not None:
+            break
 
     # Process each file
     for file_path in md_files:
+        if halted is not None:
+            break
         filename = file_path.name
 
         print(f"{'─'*80}")
@@ -199,11 +340,9 @@ def main():
             print(f"  ❌ Error reading file: {e}\n")
             continue
 
-        date = datetime.now().strftime("%Y-%m-%d")
-
         # Layer 1: Triage
         try:
-            items = run_layer1(input_text, date, triage_id_counter, filename)
+            items = run_layer1(input_text, date, triage_id_counter, filename, guard)
 
             # IMPORTANT: Mark file as processed FIRST (required for foreign key)
             mark_file_processed(client, filename, file_hash, len(items))
@@ -216,24 +355,39 @@ def main():
             total_items += len(items)
             triage_id_counter += len(items)
 
+            # Re-triaging replaced this file's items, so any pending ones are gone
+            if pending.pop(filename, None) is not None:
+                save_pending(pending_path, pending)
+
+        except BudgetExceeded as e:
+            halted = e
+            break
         except Exception as e:
             print(f"  ❌ Error in Layer 1: {e}\n")
             continue
 
         # Layer 2: Insights
         try:
-            insights, insight_id_counter = run_layer2(items, date, insight_id_counter)
+            insights, insight_id_counter, left, halted = run_layer2(items, date, insight_id_counter, guard)
 
             if insights:
                 write_insights(client, insights)
                 print(f"  ✓ Saved {len(insights)} insights to Supabase")
                 total_insights += len(insights)
 
+            # Layer 1 is saved and the file stays marked; its leftover items are retried next run
+            if left:
+                pending[filename] = [item.id for item in left]
+                save_pending(pending_path, pending)
+                print(f"  📌 {len(left)} items left without insights; recorded in {pending_path}")
+
         except Exception as e:
             print(f"  ⚠️  Error in Layer 2: {e}")
 
         processed_count += 1
         print()
+        if halted is not None:
+            break
 
     # Final stats
     print(f"\n{'='*80}")
@@ -244,6 +398,14 @@ def main():
     print(f"📊 Total triage items: {total_items}")
     print(f"💡 Total insights: {total_insights}")
 
+    if pending:
+        print(f"📌 Items waiting for insights: {sum(len(ids) for ids in pending.values())} (in {pending_path})")
+
+    if halted is not None:
+        print(f"\n🛑 Stopped early: {halted.decision['reason']}")
+    if guard.run_limit is not None or guard.daily_limit is not None:
+        print(f"\n{guard.report()}")
+
     # Get database stats
     try:
         stats = get_processing_stats(client)
@@ -258,6 +420,9 @@ def main():
 
     print(f"{'='*80}\n")
 
+    if ledger is not None:
+        ledger.close()
+
 
 if __name__ == '__main__':
     main()
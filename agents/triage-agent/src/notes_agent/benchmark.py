@@ -0,0 +1,302 @@
+"""
+Offline triage benchmark: golden corpus + recorded LLM responses.
+
+Each corpus note is run through the Layer 1 stages (prompt build, preflight,
+LLM call, JSON parse, validation) with the LLM call replayed from recordings,
+so stage timings measure our code, not the network. Every recorded sample is
+also parsed to check item-count stability, and token/cost figures come from
+the actual prompts. Results are compared against a stored baseline.
+"""
+import json
+import statistics
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from io import StringIO
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from agent_utils import calculate_cost
+from agent_utils.tokens import count_message_tokens, count_tokens, normalize_model, preflight
+
+from .layer1_triage import build_user_prompt, items_from_response_data, load_prompt, triage_braindump
+from .llm_clients import call_openrouter, parse_json_response
+from .recording import LLMRecorder, request_key, use_recorder
+
+
+BENCHMARK_DIR = Path(__file__).parent.parent.parent / "benchmarks"
+DEFAULT_CORPUS_DIR = BENCHMARK_DIR / "corpus"
+DEFAULT_RECORDINGS = BENCHMARK_DIR / "recordings.jsonl"
+DEFAULT_BASELINE = BENCHMARK_DIR / "baseline.json"
+
+# Fixed so recorded requests match on every run
+BENCHMARK_DATE = "2025-01-15"
+BENCHMARK_MODEL = "openai/gpt-4o-mini"
+
+# Must match triage_braindump's call so recordings replay for both
+TEMPERATURE = 0.2
+MAX_OUTPUT_TOKENS = 8000
+RESPONSE_FORMAT = {"type": "json_object"}
+
+STAGES = ["prompt_build", "preflight", "llm_call", "parse", "validate", "end_to_end"]
+
+
+def load_corpus(corpus_dir: Path = DEFAULT_CORPUS_DIR) -> Dict[str, str]:
+    """Load golden notes (*.txt / *.md), keyed by file name, in sorted order."""
+    paths = sorted(p for p in Path(corpus_dir).iterdir() if p.suffix in (".txt", ".md"))
+    return {p.name: p.read_text(encoding="utf-8").strip() for p in paths}
+
+
+def triage_request(note_text: str, system_prompt: str, model: str = BENCHMARK_MODEL) -> dict:
+    """The chat completion kwargs triage_braindump sends for a corpus note."""
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": build_user_prompt(note_text, BENCHMARK_DATE)}
+        ],
+        "temperature": TEMPERATURE,
+        "max_tokens": MAX_OUTPUT_TOKENS,
+        "response_format": RESPONSE_FORMAT
+    }
+
+
+def record_corpus(
+    notes: Dict[str, str],
+    recordings_path: Path = DEFAULT_RECORDINGS,
+    samples: int = 3,
+    system_prompt: Optional[str] = None,
+    model: str = BENCHMARK_MODEL
+) -> int:
+    """
+    Record live triage responses until every note has `samples` recordings.
+
+    Returns:
+        Number of new recordings made
+    """
+    system_prompt = system_prompt or load_prompt()
+    recorder = LLMRecorder(recordings_path, mode="record")
+    made = 0
+
+    with use_recorder(recorder):
+        for name, text in notes.items():
+            missing = samples - recorder.samples("openrouter", triage_request(text, system_prompt, model))
+            for _ in range(max(0, missing)):
+                print(f"🎙️  Recording {name}...")
+                triage_braindump(text, date=BENCHMARK_DATE, model=model, system_prompt=system_prompt)
+                made += 1
+    return made
+
+
+def _ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+def benchmark_note(
+    note_text: str,
+    system_prompt: str,
+    recorder: LLMRecorder,
+    repeats: int = 20,
+    model: str = BENCHMARK_MODEL
+) -> dict:
+    """
+    Benchmark one note against its recordings.
+
+    Returns:
+        Dict with median stage timings (ms), recorded LLM latency, token and
+        cost estimates, and item counts across recorded samples
+    """
+    timings: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        user_prompt = build_user_prompt(note_text, BENCHMARK_DATE)
+        timings["prompt_build"].append(_ms(start))
+
+        start = time.perf_counter()
+        preflight(system_prompt, user_prompt, model=model, max_output_tokens=MAX_OUTPUT_TOKENS)
+        timings["preflight"].append(_ms(start))
+
+        start = time.perf_counter()
+        response = call_openrouter(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            model=model,
+            temperature=TEMPERATURE,
+            max_tokens=MAX_OUTPUT_TOKENS,
+            response_format=RESPONSE_FORMAT
+        )
+        timings["llm_call"].append(_ms(start))
+
+        start = time.perf_counter()
+        data = parse_json_response(response)
+        timings["parse"].append(_ms(start))
+
+        start = time.perf_counter()
+        items_from_response_data(data, BENCHMARK_DATE)
+        timings["validate"].append(_ms(start))
+
+        # The real entry point, so changes to triage_braindump itself show up
+        start = time.perf_counter()
+        with redirect_stdout(StringIO()):
+            triage_braindump(note_text, date=BENCHMARK_DATE, model=model, system_prompt=system_prompt)
+        timings["end_to_end"].append(_ms(start))
+
+    request = triage_request(note_text, system_prompt, model)
+    samples = recorder.recordings("openrouter", request)
+
+    item_counts = []
+    for sample in samples:
+        try:
+            item_counts.append(len(items_from_response_data(parse_json_response(sample["content"]), BENCHMARK_DATE)))
+        except Exception:
+            item_counts.append(None)
+
+    # Approx mode keeps token figures identical with or without tiktoken installed
+    prompt_tokens = count_message_tokens(request["messages"], model, mode="approx")
+    completion_tokens = round(statistics.mean(
+        count_tokens(sample["content"], model, mode="approx") for sample in samples
+    )) if samples else 0
+
+    provider = model.split("/", 1)[0] if "/" in model else "openai"
+    try:
+        cost = calculate_cost(provider, normalize_model(model), {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        })["total_cost"]
+    except ValueError:
+        cost = None
+
+    latencies = [s["latency_seconds"] for s in samples if s.get("latency_seconds") is not None]
+    return {
+        "stages_ms": {stage: round(statistics.median(values), 4) for stage, values in timings.items()},
+        "recorded_llm_seconds": round(statistics.median(latencies), 3) if latencies else None,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "cost_usd": round(cost, 6) if cost is not None else None,
+        "samples": len(samples),
+        "item_counts": item_counts,
+        "parse_failures": item_counts.count(None),
+        "stale": any(s["key"] != request_key("openrouter", request) for s in samples)
+    }
+
+
+def run_benchmark(
+    notes: Dict[str, str],
+    recordings_path: Path = DEFAULT_RECORDINGS,
+    repeats: int = 20,
+    system_prompt: Optional[str] = None,
+    allow_stale: bool = False,
+    model: str = BENCHMARK_MODEL
+) -> dict:
+    """
+    Benchmark every corpus note offline.
+
+    Args:
+        notes: Corpus (note name -> text)
+        recordings_path: JSONL recordings made by record_corpus
+        repeats: Timed runs per note (medians are reported)
+        system_prompt: Prompt under test (default: prompts/layer1_triage_system.txt)
+        allow_stale: Replay recordings made with a different system prompt
+        model: Triage model the recordings were made with
+
+    Returns:
+        Results dict (per-note metrics plus totals), JSON-serializable
+
+    Raises:
+        ValueError: If a note has no recording (record it first)
+    """
+    system_prompt = system_prompt or load_prompt()
+    recorder = LLMRecorder(recordings_path, mode="replay", allow_stale=allow_stale)
+
+    results = {}
+    with use_recorder(recorder):
+        for name, text in notes.items():
+            results[name] = benchmark_note(text, system_prompt, recorder, repeats, model)
+
+    costs = [r["cost_usd"] for r in results.values()]
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "model": model,
+        "repeats": repeats,
+        "notes": results,
+        "totals": {
+            "stages_ms": {
+                stage: round(sum(r["stages_ms"][stage] for r in results.values()), 4)
+                for stage in STAGES
+            },
+            "prompt_tokens": sum(r["prompt_tokens"] for r in results.values()),
+            "completion_tokens": sum(r["completion_tokens"] for r in results.values()),
+            "cost_usd": round(sum(costs), 6) if None not in costs else None,
+            "parse_failures": sum(r["parse_failures"] for r in results.values())
+        }
+    }
+
+
+def compare_to_baseline(
+    results: dict,
+    baseline: dict,
+    tolerance: float = 0.25,
+    min_delta_ms: float = 0.5
+) -> Dict[str, List[str]]:
+    """
+    Compare benchmark results with a stored baseline.
+
+    Timings regress when slower by more than `tolerance` (fraction) AND by
+    more than `min_delta_ms`, so sub-millisecond noise is ignored. Item counts
+    that change and new parse failures are regressions; token and cost changes
+    are reported.
+
+    Returns:
+        {"regressions": [...], "improvements": [...], "changes": [...]}
+    """
+    report = {"regressions": [], "improvements": [], "changes": []}
+
+    for name, current in results["notes"].items():
+        previous = baseline.get("notes", {}).get(name)
+        if previous is None:
+            report["changes"].append(f"{name}: new note (no baseline)")
+            continue
+
+        for stage, ms in current["stages_ms"].items():
+            before = previous["stages_ms"].get(stage)
+            if before is None:
+                continue
+            delta = ms - before
+            if abs(delta) < min_delta_ms:
+                continue
+            if delta > before * tolerance:
+                report["regressions"].append(f"{name}: {stage} {before:.2f} → {ms:.2f} ms (+{delta / before * 100:.0f}%)")
+            elif -delta > before * tolerance:
+                report["improvements"].append(f"{name}: {stage} {before:.2f} → {ms:.2f} ms ({delta / before * 100:.0f}%)")
+
+        if current["item_counts"] != previous["item_counts"]:
+            report["regressions"].append(f"{name}: item counts {previous['item_counts']} → {current['item_counts']}")
+        if current["parse_failures"] > previous["parse_failures"]:
+            report["regressions"].append(f"{name}: parse failures {previous['parse_failures']} → {current['parse_failures']}")
+
+        for metric in ("prompt_tokens", "completion_tokens", "cost_usd"):
+            if current[metric] != previous.get(metric):
+                report["changes"].append(f"{name}: {metric} {previous.get(metric)} → {current[metric]}")
+
+    for name in baseline.get("notes", {}):
+        if name not in results["notes"]:
+            report["changes"].append(f"{name}: removed from corpus")
+
+    return report
+
+
+def load_baseline(path: Path = DEFAULT_BASELINE) -> Optional[dict]:
+    """Load the stored baseline, or None if there isn't one yet."""
+    if not Path(path).exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(results: dict, path: Path = DEFAULT_BASELINE) -> None:
+    """Store results as the new baseline."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+        f.write("\n")
@@ -0,0 +1,143 @@
+"""
+Persistent cache for LLM-as-judge evaluations.
+
+Entries are keyed by content hashes of the input text, the triage items and
+the evaluator system prompt, plus the judge model and temperature. Editing
+evaluator_system.txt or switching models changes the key, so stale scores
+are never served; prune() removes them from disk.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from .schemas import TriageItem
+
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent.parent / "data" / "cache" / "judge_cache.sqlite"
+
+
+def hash_text(text: str) -> str:
+    """SHA256 of a string."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def hash_items(items: List[TriageItem]) -> str:
+    """SHA256 of triage items in canonical JSON form (order-sensitive, key-sorted)."""
+    payload = json.dumps([item.model_dump() for item in items], sort_keys=True, ensure_ascii=False)
+    return hash_text(payload)
+
+
+class EvaluationCache:
+    """
+    SQLite-backed judge cache, safe to share across threads.
+
+    Usage:
+        cache = EvaluationCache()
+        evaluation = evaluate_triage_output(text, items, cache=cache)
+        print(cache.report())
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS judge_cache (
+                input_hash TEXT NOT NULL,
+                items_hash TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                temperature REAL NOT NULL,
+                response TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (input_hash, items_hash, prompt_hash, model, temperature)
+            )
+        """)
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        input_hash: str,
+        items_hash: str,
+        prompt_hash: str,
+        model: str,
+        temperature: float
+    ) -> Optional[str]:
+        """Return the cached raw judge response, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM judge_cache WHERE input_hash = ? AND items_hash = ? "
+                "AND prompt_hash = ? AND model = ? AND temperature = ?",
+                (input_hash, items_hash, prompt_hash, model, temperature)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return row[0]
+
+    def put(
+        self,
+        input_hash: str,
+        items_hash: str,
+        prompt_hash: str,
+        model: str,
+        temperature: float,
+        response: str
+    ) -> None:
+        """Store a raw judge response (replaces any existing entry for the key)."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO judge_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (input_hash, items_hash, prompt_hash, model, temperature, response,
+                 datetime.now().isoformat())
+            )
+            self._conn.commit()
+
+    def prune(self, keep_prompt_hash: str, keep_model: Optional[str] = None) -> int:
+        """
+        Delete entries made with a different evaluator prompt (and optionally model).
+
+        Returns:
+            Number of entries deleted
+        """
+        query = "DELETE FROM judge_cache WHERE prompt_hash != ?"
+        params = [keep_prompt_hash]
+        if keep_model is not None:
+            query += " OR model != ?"
+            params.append(keep_model)
+
+        with self._lock:
+            deleted = self._conn.execute(query, params).rowcount
+            self._conn.commit()
+        return deleted
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM judge_cache").fetchone()[0]
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self) -> str:
+        """One-line hit-rate summary."""
+        return (f"Judge cache: {self.hits} hits / {self.misses} misses "
+                f"({self.hit_rate * 100:.1f}% hit rate), {len(self)} entries")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
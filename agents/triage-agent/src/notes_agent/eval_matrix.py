@@ -0,0 +1,268 @@
+"""
+Evaluation matrix runner: K prompt versions x M notes, run concurrently.
+
+Each cell triages one note with one prompt version and scores it with the
+LLM judge. Cells run in a bounded thread pool (the LLM clients are
+synchronous and I/O-bound) and are appended to a JSONL results file as
+they finish, so an interrupted run resumes where it stopped. A recorded
+cell is only reused if it ran with the same prompt text, models and
+sample size.
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .eval_cache import EvaluationCache, hash_text
+from .evaluator import evaluate_triage_output
+from .layer1_triage import triage_braindump
+from .sampled_evaluator import evaluate_sampled
+from .schemas import EvalMatrixCell, PromptAggregate
+from .stats import mean_confidence_interval
+
+
+def load_results(results_path: Path) -> List[EvalMatrixCell]:
+    """Load previously recorded cells from a JSONL results file (missing file = no results)."""
+    if not results_path.exists():
+        return []
+
+    cells = []
+    with open(results_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                cells.append(EvalMatrixCell(**json.loads(line)))
+            except Exception:
+                # A line cut off by an interrupted run - that cell will simply be redone
+                continue
+    return cells
+
+
+def cell_key(
+    prompt_version: str,
+    note: str,
+    prompt_hash: Optional[str],
+    triage_model: Optional[str],
+    judge_model: Optional[str],
+    sample_size: Optional[int]
+) -> tuple:
+    """Identity of a cell: same key means a recorded score can stand in for a new run."""
+    return (prompt_version, note, prompt_hash, triage_model, judge_model, sample_size)
+
+
+def latest_cells(cells: List[EvalMatrixCell]) -> Dict[tuple, EvalMatrixCell]:
+    """Keep the most recent record per cell_key; later lines win."""
+    latest = {}
+    for cell in cells:
+        key = cell_key(cell.prompt_version, cell.note, cell.prompt_hash,
+                       cell.triage_model, cell.judge_model, cell.sample_size)
+        latest[key] = cell
+    return latest
+
+
+def run_cell(
+    prompt_version: str,
+    prompt_text: str,
+    note: str,
+    note_text: str,
+    date: Optional[str] = None,
+    triage_model: str = "openai/gpt-4o-mini",
+    judge_model: str = "gpt-4o",
+    cache: Optional[EvaluationCache] = None,
+    sample_size: Optional[int] = None
+) -> EvalMatrixCell:
+    """
+    Triage one note with one prompt version and evaluate the output.
+
+    With sample_size set, notes with more items than that are judged on a
+    stratified sample (see sampled_evaluator) instead of every item.
+    """
+    start = time.perf_counter()
+    config = {
+        "prompt_hash": hash_text(prompt_text),
+        "triage_model": triage_model,
+        "judge_model": judge_model,
+        "sample_size": sample_size
+    }
+    try:
+        items = triage_braindump(
+            raw_text=note_text,
+            date=date,
+            model=triage_model,
+            system_prompt=prompt_text
+        )
+        if sample_size is not None and len(items) > sample_size:
+            evaluation = evaluate_sampled(
+                input_text=note_text,
+                items=items,
+                prompt_version=prompt_version,
+                sample_size=sample_size,
+                model=judge_model,
+                cache=cache
+            )
+        else:
+            evaluation = evaluate_triage_output(
+                input_text=note_text,
+                items=items,
+                prompt_version=prompt_version,
+                model=judge_model,
+                cache=cache
+            )
+        return EvalMatrixCell(
+            prompt_version=prompt_version,
+            note=note,
+            status="ok",
+            overall_score=evaluation.overall_score,
+            num_items=len(items),
+            elapsed_seconds=time.perf_counter() - start,
+            evaluation=evaluation.model_dump(exclude={'input_text'}),
+            **config
+        )
+    except Exception as e:
+        return EvalMatrixCell(
+            prompt_version=prompt_version,
+            note=note,
+            status="error",
+            elapsed_seconds=time.perf_counter() - start,
+            error=str(e),
+            **config
+        )
+
+
+def run_eval_matrix(
+    prompts: Dict[str, str],
+    notes: Dict[str, str],
+    results_path: Path,
+    max_workers: int = 4,
+    date: Optional[str] = None,
+    triage_model: str = "openai/gpt-4o-mini",
+    judge_model: str = "gpt-4o",
+    retry_failed: bool = True,
+    cache: Optional[EvaluationCache] = None,
+    sample_size: Optional[int] = None
+) -> List[EvalMatrixCell]:
+    """
+    Triage and evaluate every (prompt version, note) pair concurrently.
+
+    Args:
+        prompts: Mapping of prompt version label -> system prompt text
+        notes: Mapping of note identifier -> note text
+        results_path: JSONL file; existing results are reused (resume) when
+                      they ran with the same prompt text, models and sample size
+        max_workers: Max cells in flight at once
+        date: Date passed to triage (defaults to today)
+        triage_model: Model used for Layer 1 triage
+        judge_model: Model used for evaluation
+        retry_failed: If True, cells that errored previously are run again
+        cache: Optional judge cache (re-triaged notes that produce identical
+               items are not re-judged)
+        sample_size: Judge at most this many items per note (stratified
+                     sample, extrapolated score); None judges every item
+
+    Returns:
+        One cell per (prompt version, note) pair, including resumed ones
+    """
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    done = latest_cells(load_results(results_path))
+    recorded = {(key[0], key[1]) for key in done}
+
+    keys = {
+        (prompt_version, note): cell_key(prompt_version, note, hash_text(prompt_text),
+                                         triage_model, judge_model, sample_size)
+        for prompt_version, prompt_text in prompts.items()
+        for note in notes
+    }
+
+    pending = []
+    stale = 0
+    for pair, key in keys.items():
+        previous = done.get(key)
+        if previous and (previous.status == "ok" or not retry_failed):
+            continue
+        if previous is None and pair in recorded:
+            stale += 1
+        pending.append(pair)
+
+    total = len(prompts) * len(notes)
+    print(f"📋 Matrix: {len(prompts)} prompts x {len(notes)} notes = {total} cells")
+    print(f"   Resumed: {total - len(pending)} | To run: {len(pending)} | Workers: {max_workers}")
+    if stale:
+        print(f"   Re-running {stale} recorded cells whose prompt text, models or sample size changed")
+    print()
+
+    write_lock = threading.Lock()
+    completed = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(
+                run_cell,
+                prompt_version,
+                prompts[prompt_version],
+                note,
+                notes[note],
+                date,
+                triage_model,
+                judge_model,
+                cache,
+                sample_size
+            ): (prompt_version, note)
+            for prompt_version, note in pending
+        }
+
+        for future in as_completed(futures):
+            cell = future.result()
+            done[keys[(cell.prompt_version, cell.note)]] = cell
+
+            # Append as each cell lands so an interrupted run can resume
+            with write_lock:
+                with open(results_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(cell.model_dump(), ensure_ascii=False) + "\n")
+
+            completed += 1
+            score = f"{cell.overall_score:.2f}" if cell.status == "ok" else f"ERROR: {cell.error}"
+            print(f"  [{completed}/{len(pending)}] {cell.prompt_version} × {cell.note}: {score} "
+                  f"({cell.elapsed_seconds:.1f}s)")
+
+    return [done[key] for key in keys.values() if key in done]
+
+
+def aggregate_by_prompt(
+    cells: List[EvalMatrixCell],
+    confidence: float = 0.95
+) -> List[PromptAggregate]:
+    """
+    Aggregate cell scores per prompt version, best mean score first.
+
+    Args:
+        cells: Matrix cells (any mix of ok/error)
+        confidence: Confidence level for the interval on the mean score
+
+    Returns:
+        List of PromptAggregate sorted by mean_score descending
+    """
+    by_prompt: Dict[str, List[EvalMatrixCell]] = {}
+    for cell in cells:
+        by_prompt.setdefault(cell.prompt_version, []).append(cell)
+
+    aggregates = []
+    for prompt_version, prompt_cells in by_prompt.items():
+        ok = [c for c in prompt_cells if c.status == "ok"]
+        scores = [c.overall_score for c in ok]
+        mean, low, high = mean_confidence_interval(scores, confidence)
+
+        aggregates.append(PromptAggregate(
+            prompt_version=prompt_version,
+            notes_scored=len(ok),
+            notes_failed=len(prompt_cells) - len(ok),
+            mean_score=mean,
+            ci_low=max(0.0, low),
+            ci_high=min(5.0, high),
+            mean_items=sum(c.num_items for c in ok) / len(ok) if ok else 0.0
+        ))
+
+    return sorted(aggregates, key=lambda a: a.mean_score, reverse=True)
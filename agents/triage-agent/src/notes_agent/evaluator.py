@@ -2,37 +2,14 @@
 LLM-based evaluator for triage quality assessment.
 Uses a stronger model (GPT-4) to evaluate triage outputs.
 """
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 from .schemas import TriageItem, TriageEvaluation, ItemEvaluation
 from .llm_clients import call_openai, parse_json_response
+from .eval_cache import EvaluationCache, hash_items, hash_text
 from pathlib import Path
 
 
-def count_tokens(text: str, model: str = "gpt-4o") -> int:
-    """
-    Count tokens in text using tiktoken.
-
-    Args:
-        text: Text to count tokens for
-        model: Model name to determine encoding (default: gpt-4o)
-
-    Returns:
-        Number of tokens
-    """
-    try:
-        import tiktoken
-        if model.startswith("gpt-4"):
-            encoding = tiktoken.encoding_for_model("gpt-4")
-        elif model.startswith("gpt-3.5"):
-            encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
-        else:
-            encoding = tiktoken.get_encoding("cl100k_base")
-        return len(encoding.encode(text))
-    except Exception as e:
-        print(f"⚠️  Token counting failed: {e}")
-        return 0
-
-
 def load_evaluator_prompt() -> str:
     """Load the evaluation system prompt."""
     prompt_path = Path(__file__).parent.parent.parent / "prompts" / "evaluator_system.txt"
@@ -44,7 +21,8 @@ def evaluate_triage_output(
     items: List[TriageItem],
     prompt_version: str = "unknown",
     model: str = "gpt-4o",
-    temperature: float = 0.1
+    temperature: float = 0.1,
+    cache: Optional[EvaluationCache] = None
 ) -> TriageEvaluation:
     """
     Evaluate the quality of triage output using LLM-as-judge.
@@ -55,6 +33,8 @@ def evaluate_triage_output(
         prompt_version: Identifier for the prompt being evaluated
         model: Model to use for evaluation (default: gpt-4o)
         temperature: Sampling temperature
+        cache: Optional judge cache; a hit (same input, items, evaluator
+               prompt, model and temperature) skips the LLM call
 
     Returns:
         TriageEvaluation object with scores and feedback
@@ -96,15 +76,24 @@ Return a JSON evaluation with:
 
 Return ONLY valid JSON matching the schema. No commentary."""
 
-    print(f"🤖 Calling {model} for evaluation...")
-
-    response = call_openai(
-        system_prompt=system_prompt,
-        user_prompt=user_prompt,
-        model=model,
-        temperature=temperature,
-        max_tokens=3000
-    )
+    response = None
+    if cache is not None:
+        cache_key = (hash_text(input_text), hash_items(items), hash_text(system_prompt), model, temperature)
+        response = cache.get(*cache_key)
+        if response is not None:
+            print(f"♻️  Judge cache hit ({model})")
+
+    cache_hit = response is not None
+    if not cache_hit:
+        print(f"🤖 Calling {model} for evaluation...")
+
+        response = call_openai(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            model=model,
+            temperature=temperature,
+            max_tokens=3000
+        )
 
     try:
         data = parse_json_response(response)
@@ -133,6 +122,10 @@ Return ONLY valid JSON matching the schema. No commentary."""
         # Validate with Pydantic
         evaluation = TriageEvaluation(**data)
 
+        # Only cache responses that parsed and validated
+        if cache is not None and not cache_hit:
+            cache.put(*cache_key, response)
+
         print(f"✓ Evaluation complete: {evaluation.overall_score:.2f}/5.0\n")
         return evaluation
 
@@ -147,7 +140,8 @@ def compare_prompts(
     prompt1_items: List[TriageItem],
     prompt2_items: List[TriageItem],
     prompt1_version: str = "prompt1",
-    prompt2_version: str = "prompt2"
+    prompt2_version: str = "prompt2",
+    cache: Optional[EvaluationCache] = None
 ) -> tuple:
     """
     Compare two prompt outputs side-by-side.
@@ -158,6 +152,7 @@ def compare_prompts(
         prompt2_items: Items from second prompt
         prompt1_version: Label for first prompt
         prompt2_version: Label for second prompt
+        cache: Optional judge cache shared by both evaluations
 
     Returns:
         Tuple of (eval1, eval2)
@@ -166,11 +161,12 @@ def compare_prompts(
     print(f"COMPARING PROMPTS: {prompt1_version} vs {prompt2_version}")
     print(f"{'='*80}\n")
 
-    print(f"Evaluating {prompt1_version}...")
-    eval1 = evaluate_triage_output(input_text, prompt1_items, prompt1_version)
-
-    print(f"\nEvaluating {prompt2_version}...")
-    eval2 = evaluate_triage_output(input_text, prompt2_items, prompt2_version)
+    # Both judge calls are independent - run them side by side
+    print(f"Evaluating {prompt1_version} and {prompt2_version}...")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        future1 = pool.submit(evaluate_triage_output, input_text, prompt1_items, prompt1_version, cache=cache)
+        future2 = pool.submit(evaluate_triage_output, input_text, prompt2_items, prompt2_version, cache=cache)
+        eval1, eval2 = future1.result(), future2.result()
 
     # Print comparison
     print(f"\n{'='*80}")
@@ -3,10 +3,15 @@ Layer 1: Triage Agent
 Classifies raw brain dumps into atomic triage items.
 """
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 from .schemas import TriageItem
 from .llm_clients import call_openrouter, parse_json_response
 from datetime import datetime
+from agent_utils.tokens import preflight
+
+MAX_OUTPUT_TOKENS = 8000
+# Smallest output worth calling with when a small context window can't spare MAX_OUTPUT_TOKENS
+MIN_OUTPUT_TOKENS = 2000
 
 
 def load_prompt() -> str:
@@ -15,37 +20,9 @@ def load_prompt() -> str:
     return prompt_path.read_text(encoding="utf-8")
 
 
-def triage_braindump(
-    raw_text: str,
-    date: str = None,
-    starting_id: int = 1,
-    model: str = "openai/gpt-4o-mini",
-    temperature: float = 0.2
-) -> List[TriageItem]:
-    """
-    Triage a raw brain dump into classified atomic items.
-
-    Args:
-        raw_text: Raw stream-of-consciousness text
-        date: Date in YYYY-MM-DD format (defaults to today)
-        starting_id: Starting ID number for items (e.g., 1 for T001)
-        model: Model to use (default: deepseek-chat)
-        temperature: Sampling temperature
-
-    Returns:
-        List of TriageItem objects
-
-    Raises:
-        ValueError: If LLM response is invalid
-    """
-    if date is None:
-        date = datetime.now().strftime("%Y-%m-%d")
-
-    # Load system prompt
-    system_prompt = load_prompt()
-
-    # Create user prompt with strict JSON rules
-    user_prompt = f"""Date: {date}
+def build_user_prompt(raw_text: str, date: str, starting_id: int = 1) -> str:
+    """Build the Layer 1 user prompt (note text plus strict JSON output rules)."""
+    return f"""Date: {date}
 Starting ID: T{starting_id:03d}
 
 Input text:
@@ -73,6 +50,136 @@ Rules:
 
 Return the JSON object now:"""
 
+
+def items_from_response_data(data, date: str, starting_id: int = 1) -> List[TriageItem]:
+    """
+    Map parsed LLM output to validated TriageItems.
+
+    Args:
+        data: Parsed JSON (list of items, or object with an "items" key)
+        date: Date to stamp on items that lack one
+        starting_id: First sequential ID (LLM-generated IDs are overridden)
+
+    Returns:
+        List of TriageItem objects
+
+    Raises:
+        ValueError: If the data has an unexpected shape
+        pydantic.ValidationError: If an item fails validation
+    """
+    # Handle both array and object with "items" key
+    if isinstance(data, list):
+        items_data = data
+    elif isinstance(data, dict) and "items" in data:
+        items_data = data["items"]
+    else:
+        raise ValueError(f"Unexpected response format: {type(data)}")
+
+    # Map LLM table column names to schema field names
+    field_mapping = {
+        "Triage ID": "id",
+        "Raw Text": "raw_context",
+        "Type": "type",
+        "Domain": "domain",
+        "Niche Signal": "niche_signal",
+        "Publishable": "publishable"
+    }
+
+    mapped_items = []
+    for idx, item in enumerate(items_data):
+        mapped_item = {}
+        for llm_key, value in item.items():
+            # Map to schema field name
+            schema_key = field_mapping.get(llm_key, llm_key.lower().replace(" ", "_"))
+
+            # Convert "Yes"/"No"/"Weak" to boolean for niche_signal
+            if schema_key == "niche_signal":
+                mapped_item[schema_key] = value.lower() in ["yes", "true", "weak"]
+            # Convert "Yes"/"Possible"/"No" to boolean for publishable
+            elif schema_key == "publishable":
+                mapped_item[schema_key] = value.lower() in ["yes", "possible", "true"]
+            else:
+                mapped_item[schema_key] = value
+
+        # CRITICAL: Override LLM-generated ID with correct sequential ID
+        mapped_item["id"] = f"T{starting_id + idx:03d}"
+
+        # Add date if not present
+        if "date" not in mapped_item:
+            mapped_item["date"] = date
+
+        # Add personal_or_work if not present (default to "Personal")
+        if "personal_or_work" not in mapped_item:
+            mapped_item["personal_or_work"] = "Personal"
+
+        # Add tags if not present (extract from domain as fallback)
+        if "tags" not in mapped_item or not mapped_item["tags"]:
+            # Use domain as tags if tags are missing
+            if "domain" in mapped_item:
+                mapped_item["tags"] = mapped_item["domain"].lower().replace(", ", ",")
+            else:
+                mapped_item["tags"] = "uncategorized"
+
+        # Convert tags to comma-separated string if it's a list
+        if "tags" in mapped_item and isinstance(mapped_item["tags"], list):
+            mapped_item["tags"] = ", ".join(mapped_item["tags"])
+
+        mapped_items.append(mapped_item)
+
+    # Validate with Pydantic
+    return [TriageItem(**item) for item in mapped_items]
+
+
+def triage_braindump(
+    raw_text: str,
+    date: str = None,
+    starting_id: int = 1,
+    model: str = "openai/gpt-4o-mini",
+    temperature: float = 0.2,
+    system_prompt: Optional[str] = None
+) -> List[TriageItem]:
+    """
+    Triage a raw brain dump into classified atomic items.
+
+    Args:
+        raw_text: Raw stream-of-consciousness text
+        date: Date in YYYY-MM-DD format (defaults to today)
+        starting_id: Starting ID number for items (e.g., 1 for T001)
+        model: Model to use (default: deepseek-chat)
+        temperature: Sampling temperature
+        system_prompt: Override the system prompt (e.g., a prompt version under test);
+                       defaults to prompts/layer1_triage_system.txt
+
+    Returns:
+        List of TriageItem objects
+
+    Raises:
+        ValueError: If the prompt won't fit the model's context window, or
+                    the LLM response is invalid
+    """
+    if date is None:
+        date = datetime.now().strftime("%Y-%m-%d")
+
+    # Load system prompt
+    if system_prompt is None:
+        system_prompt = load_prompt()
+
+    user_prompt = build_user_prompt(raw_text, date, starting_id)
+
+    # Cheap size check before paying for a call that would be truncated or rejected.
+    # Models with an unknown window pass with a warning; small windows (e.g. plain
+    # gpt-4) get the output room that's left, down to MIN_OUTPUT_TOKENS.
+    check = preflight(system_prompt, user_prompt, model=model, max_output_tokens=MAX_OUTPUT_TOKENS)
+    max_tokens = MAX_OUTPUT_TOKENS
+    if not check["fits"]:
+        room = check["context_window"] - check["prompt_tokens"]
+        if room < MIN_OUTPUT_TOKENS:
+            raise ValueError(
+                f"Prompt too large for {model}: ~{check['prompt_tokens']} prompt tokens leave "
+                f"{max(room, 0)} of {check['context_window']} context tokens for output (need {MIN_OUTPUT_TOKENS})"
+            )
+        max_tokens = room
+
     # Call LLM via OpenRouter with guaranteed JSON output
     print(f"🤖 Calling {model} (via OpenRouter) for Layer 1 triage...")
     response = call_openrouter(
@@ -80,75 +187,14 @@ Return the JSON object now:"""
         user_prompt=user_prompt,
         model=model,
         temperature=temperature,
-        max_tokens=8000,
+        max_tokens=max_tokens,
         response_format={"type": "json_object"}  # Guarantees valid JSON
     )
 
     # Parse response
     try:
         data = parse_json_response(response)
-
-        # Handle both array and object with "items" key
-        if isinstance(data, list):
-            items_data = data
-        elif isinstance(data, dict) and "items" in data:
-            items_data = data["items"]
-        else:
-            raise ValueError(f"Unexpected response format: {type(data)}")
-
-        # Map LLM table column names to schema field names
-        field_mapping = {
-            "Triage ID": "id",
-            "Raw Text": "raw_context",
-            "Type": "type",
-            "Domain": "domain",
-            "Niche Signal": "niche_signal",
-            "Publishable": "publishable"
-        }
-
-        mapped_items = []
-        for idx, item in enumerate(items_data):
-            mapped_item = {}
-            for llm_key, value in item.items():
-                # Map to schema field name
-                schema_key = field_mapping.get(llm_key, llm_key.lower().replace(" ", "_"))
-
-                # Convert "Yes"/"No"/"Weak" to boolean for niche_signal
-                if schema_key == "niche_signal":
-                    mapped_item[schema_key] = value.lower() in ["yes", "true", "weak"]
-                # Convert "Yes"/"Possible"/"No" to boolean for publishable
-                elif schema_key == "publishable":
-                    mapped_item[schema_key] = value.lower() in ["yes", "possible", "true"]
-                else:
-                    mapped_item[schema_key] = value
-
-            # CRITICAL: Override LLM-generated ID with correct sequential ID
-            mapped_item["id"] = f"T{starting_id + idx:03d}"
-
-            # Add date if not present
-            if "date" not in mapped_item:
-                mapped_item["date"] = date
-
-            # Add personal_or_work if not present (default to "Personal")
-            if "personal_or_work" not in mapped_item:
-                mapped_item["personal_or_work"] = "Personal"
-
-            # Add tags if not present (extract from domain as fallback)
-            if "tags" not in mapped_item or not mapped_item["tags"]:
-                # Use domain as tags if tags are missing
-                if "domain" in mapped_item:
-                    mapped_item["tags"] = mapped_item["domain"].lower().replace(", ", ",")
-                else:
-                    mapped_item["tags"] = "uncategorized"
-
-            # Convert tags to comma-separated string if it's a list
-            if "tags" in mapped_item and isinstance(mapped_item["tags"], list):
-                mapped_item["tags"] = ", ".join(mapped_item["tags"])
-
-            mapped_items.append(mapped_item)
-
-        # Validate with Pydantic
-        items = [TriageItem(**item) for item in mapped_items]
+        items = items_from_response_data(data, date, starting_id)
 
         print(f"✓ Parsed {len(items)} triage items\n")
         return items
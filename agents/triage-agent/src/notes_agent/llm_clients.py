@@ -3,10 +3,12 @@ LLM client wrappers for different providers.
 """
 import os
 import json
-from typing import Optional
+from typing import Callable, Optional
 from openai import OpenAI
 from dotenv import load_dotenv
 
+from .recording import active_recorder
+
 load_dotenv()
 
 
@@ -51,6 +53,23 @@ def get_openrouter_client() -> OpenAI:
     )
 
 
+def _chat_completion(provider: str, get_client: Callable[[], OpenAI], kwargs: dict) -> str:
+    """
+    Run a chat completion, through the active recorder if there is one.
+
+    The client is only created for live calls, so replayed runs need no API keys.
+    """
+    def live():
+        response = get_client().chat.completions.create(**kwargs)
+        usage = response.usage.model_dump() if getattr(response, "usage", None) else None
+        return response.choices[0].message.content, usage
+
+    recorder = active_recorder()
+    if recorder is not None:
+        return recorder.complete(provider, kwargs, live)
+    return live()[0]
+
+
 def call_deepseek(
     system_prompt: str,
     user_prompt: str,
@@ -73,8 +92,6 @@ def call_deepseek(
     Returns:
         Response content as string
     """
-    client = get_deepseek_client()
-
     messages = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_prompt}
@@ -90,8 +107,7 @@ def call_deepseek(
     if response_format:
         kwargs["response_format"] = response_format
 
-    response = client.chat.completions.create(**kwargs)
-    return response.choices[0].message.content
+    return _chat_completion("deepseek", get_deepseek_client, kwargs)
 
 
 def call_openai(
@@ -116,8 +132,6 @@ def call_openai(
     Returns:
         Response content as string
     """
-    client = get_openai_client()
-
     messages = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_prompt}
@@ -133,8 +147,7 @@ def call_openai(
     if response_format:
         kwargs["response_format"] = response_format
 
-    response = client.chat.completions.create(**kwargs)
-    return response.choices[0].message.content
+    return _chat_completion("openai", get_openai_client, kwargs)
 
 
 def call_openrouter(
@@ -166,8 +179,6 @@ def call_openrouter(
     Returns:
         Response content as string
     """
-    client = get_openrouter_client()
-
     messages = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_prompt}
@@ -188,8 +199,7 @@ def call_openrouter(
     if response_format:
         kwargs["response_format"] = response_format
 
-    response = client.chat.completions.create(**kwargs)
-    return response.choices[0].message.content
+    return _chat_completion("openrouter", get_openrouter_client, kwargs)
 
 
 def fix_common_json_issues(response: str) -> str:
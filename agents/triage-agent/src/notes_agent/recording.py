@@ -0,0 +1,176 @@
+"""
+Record/replay for LLM calls.
+
+In record mode every chat completion goes to the live API and the response
+is appended to a JSONL fixture file. In replay mode responses come from the
+fixture file, so pipelines run fully offline and deterministically (e.g. for
+benchmarks). Several samples can be recorded for the same request; replay
+cycles through them in order.
+
+Usage:
+    recorder = LLMRecorder(Path("benchmarks/recordings.jsonl"), mode="replay")
+    with use_recorder(recorder):
+        items = triage_braindump(text, date="2025-01-15")
+"""
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Request fields that don't change the model's output
+IGNORED_KWARGS = {"extra_headers"}
+
+RECORDER_MODES = ("record", "replay")
+
+
+def request_key(provider: str, kwargs: dict) -> str:
+    """SHA256 of a chat completion request in canonical JSON form."""
+    request = {k: v for k, v in kwargs.items() if k not in IGNORED_KWARGS}
+    payload = json.dumps({"provider": provider, **request}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def input_key(provider: str, kwargs: dict) -> str:
+    """SHA256 of the request minus the system prompt (matches across prompt edits)."""
+    messages = [m for m in kwargs.get("messages", []) if m.get("role") != "system"]
+    return request_key(provider, {**kwargs, "messages": messages})
+
+
+class LLMRecorder:
+    """
+    Records LLM responses to, or replays them from, a JSONL fixture file.
+
+    Args:
+        path: Fixture file
+        mode: "record" (call the API, append responses) or "replay" (offline)
+        allow_stale: In replay mode, fall back to a recording of the same
+                     request made with a different system prompt. Lets a
+                     prompt edit be benchmarked before it is re-recorded.
+    """
+
+    def __init__(self, path: Path, mode: str = "replay", allow_stale: bool = False):
+        if mode not in RECORDER_MODES:
+            raise ValueError(f"Unknown recorder mode: {mode} (expected one of {RECORDER_MODES})")
+
+        self.path = Path(path)
+        self.mode = mode
+        self.allow_stale = allow_stale
+
+        self._lock = threading.Lock()
+        self._by_key: Dict[str, List[dict]] = {}
+        self._by_input: Dict[str, List[dict]] = {}
+        self._cursor: Dict[str, int] = {}
+
+        # Log of every call made through the recorder (for reporting)
+        self.calls: List[dict] = []
+
+        for record in self._load():
+            self._index(record)
+
+    def _load(self) -> List[dict]:
+        if not self.path.exists():
+            return []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _index(self, record: dict) -> None:
+        self._by_key.setdefault(record["key"], []).append(record)
+        self._by_input.setdefault(record["input_key"], []).append(record)
+
+    def samples(self, provider: str, kwargs: dict) -> int:
+        """Number of recorded samples for a request."""
+        with self._lock:
+            return len(self._by_key.get(request_key(provider, kwargs), []))
+
+    def recordings(self, provider: str, kwargs: dict) -> List[dict]:
+        """Recorded samples for a request (stale ones too, if allow_stale is set)."""
+        with self._lock:
+            records = self._by_key.get(request_key(provider, kwargs), [])
+            if not records and self.allow_stale:
+                records = self._by_input.get(input_key(provider, kwargs), [])
+            return list(records)
+
+    def complete(
+        self,
+        provider: str,
+        kwargs: dict,
+        live: Callable[[], Tuple[str, Optional[dict]]]
+    ) -> str:
+        """
+        Return the response for a chat completion request.
+
+        Args:
+            provider: Provider name (openai, openrouter, deepseek)
+            kwargs: chat.completions.create kwargs
+            live: Makes the real API call; returns (content, usage)
+
+        Returns:
+            Response content
+
+        Raises:
+            ValueError: In replay mode, if the request was never recorded
+        """
+        key = request_key(provider, kwargs)
+
+        if self.mode == "record":
+            start = time.perf_counter()
+            content, usage = live()
+            record = {
+                "key": key,
+                "input_key": input_key(provider, kwargs),
+                "provider": provider,
+                "model": kwargs.get("model"),
+                "content": content,
+                "usage": usage,
+                "latency_seconds": round(time.perf_counter() - start, 3),
+                "recorded_at": datetime.now().isoformat(),
+            }
+            with self._lock:
+                self._index(record)
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                self.calls.append({**record, "replayed": False, "stale": False})
+            return content
+
+        with self._lock:
+            records, cursor_key, stale = self._by_key.get(key), key, False
+            if not records and self.allow_stale:
+                cursor_key = input_key(provider, kwargs)
+                records, stale = self._by_input.get(cursor_key), True
+            if not records:
+                raise ValueError(
+                    f"No recording for {provider} request with model {kwargs.get('model')} "
+                    f"(key {key[:12]}); run in record mode first"
+                )
+
+            # Cycle through samples so repeated runs see every recorded variant
+            index = self._cursor.get(cursor_key, 0)
+            self._cursor[cursor_key] = index + 1
+            record = records[index % len(records)]
+
+            self.calls.append({**record, "replayed": True, "stale": stale})
+            return record["content"]
+
+
+_active_recorder: Optional[LLMRecorder] = None
+
+
+def active_recorder() -> Optional[LLMRecorder]:
+    """The recorder LLM calls currently go through, if any."""
+    return _active_recorder
+
+
+@contextmanager
+def use_recorder(recorder: LLMRecorder) -> Iterator[LLMRecorder]:
+    """Route all llm_clients calls through a recorder for the duration of the block."""
+    global _active_recorder
+    previous, _active_recorder = _active_recorder, recorder
+    try:
+        yield recorder
+    finally:
+        _active_recorder = previous
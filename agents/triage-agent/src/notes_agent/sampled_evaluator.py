@@ -0,0 +1,305 @@
+"""
+Stratified sampling mode for the LLM judge.
+
+Instead of sending every triage item to the judge in one call, items are
+stratified by (type, primary domain), a proportional sample is drawn from
+each stratum, and the sample is judged in parallel sub-batches. The
+all-items overall_score is estimated with the stratified mean and a
+t-based confidence interval, so judging cost grows with the sample size,
+not the note size, and no single judge call overflows its context.
+"""
+import math
+import random
+import warnings
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .eval_cache import EvaluationCache
+from .evaluator import evaluate_triage_output
+from .schemas import ItemEvaluation, SampledEvaluation, StratumScore, TriageItem
+from .stats import t_critical
+
+
+SCORE_DIMENSIONS = [
+    "completeness",
+    "classification_accuracy",
+    "granularity",
+    "tag_quality",
+    "niche_signal_accuracy",
+    "publishability_accuracy"
+]
+
+
+def item_score(evaluation: ItemEvaluation) -> float:
+    """Mean of an item's six dimension scores (overall_score averages these)."""
+    return sum(getattr(evaluation, dim) for dim in SCORE_DIMENSIONS) / len(SCORE_DIMENSIONS)
+
+
+def stratum_key(item: TriageItem, by: Sequence[str] = ("type", "domain")) -> str:
+    """Stratum label for an item; multi-valued domains use the first domain."""
+    parts = []
+    for field in by:
+        value = getattr(item, field)
+        if field == "domain":
+            value = value.split(",")[0]
+        parts.append(value.strip())
+    return " | ".join(parts)
+
+
+def stratify(items: List[TriageItem], by: Sequence[str] = ("type", "domain")) -> Dict[str, List[TriageItem]]:
+    """Group items into strata, preserving item order within each stratum."""
+    strata: Dict[str, List[TriageItem]] = {}
+    for item in items:
+        strata.setdefault(stratum_key(item, by), []).append(item)
+    return strata
+
+
+def allocate_sample(sizes: Dict[str, int], sample_size: int) -> Dict[str, int]:
+    """
+    Proportionally allocate a sample across strata (largest remainder).
+
+    Every stratum gets at least one item when the sample allows it; when
+    there are more strata than sample slots, the largest strata win.
+
+    Args:
+        sizes: Stratum -> population size
+        sample_size: Total items to sample
+
+    Returns:
+        Stratum -> number of items to sample (strata with 0 are omitted)
+    """
+    population = sum(sizes.values())
+    sample_size = min(sample_size, population)
+    if sample_size <= 0:
+        return {}
+
+    by_size = sorted(sizes, key=lambda h: sizes[h], reverse=True)
+    if sample_size < len(sizes):
+        return {h: 1 for h in by_size[:sample_size]}
+
+    quotas = {h: sample_size * sizes[h] / population for h in sizes}
+    alloc = {h: min(sizes[h], max(1, math.floor(quotas[h]))) for h in sizes}
+
+    # Hand out what's left by largest remainder, then trim any excess from the minimums
+    while sum(alloc.values()) < sample_size:
+        open_strata = [h for h in sizes if alloc[h] < sizes[h]]
+        best = max(open_strata, key=lambda h: (quotas[h] - alloc[h], sizes[h]))
+        alloc[best] += 1
+    while sum(alloc.values()) > sample_size:
+        best = max((h for h in alloc if alloc[h] > 1), key=lambda h: (alloc[h] - quotas[h], sizes[h]))
+        alloc[best] -= 1
+
+    return alloc
+
+
+def judge_context(input_text: str, items: List[TriageItem], max_chars: int = 12000) -> str:
+    """
+    Input text to show the judge for a sub-batch.
+
+    Short notes are passed whole. Long notes are cut down to the passages
+    around each item's raw_context, so the judge prompt stays bounded.
+    """
+    if len(input_text) <= max_chars:
+        return input_text
+
+    lowered = input_text.lower()
+    radius = max(200, min(1500, max_chars // (2 * max(1, len(items)))))
+    windows = []
+    for item in items:
+        start = lowered.find(item.raw_context[:60].lower())
+        if start != -1:
+            windows.append((max(0, start - radius), min(len(input_text), start + len(item.raw_context) + radius)))
+
+    if not windows:
+        return input_text[:max_chars]
+
+    # Merge overlapping windows, in document order
+    windows.sort()
+    merged = [windows[0]]
+    for start, end in windows[1:]:
+        if start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+
+    return "\n[...]\n".join(input_text[start:end] for start, end in merged)[:max_chars]
+
+
+def stratified_estimate(
+    strata: Dict[str, List[TriageItem]],
+    scores: Dict[str, List[float]],
+    confidence: float = 0.95
+) -> Tuple[float, Optional[float], Optional[float]]:
+    """
+    Stratified mean of item scores with a t-based confidence interval.
+
+    Uses the finite population correction, so judging every item gives a
+    zero-width interval. Strata with a single judged item borrow the pooled
+    within-stratum variance; if no stratum has two judged items there is
+    nothing to borrow, and a partial sample gets no interval (None, None).
+    Strata with no judged items are left out, with a warning, and the
+    remaining weights renormalized.
+
+    Returns:
+        Tuple of (estimate, ci_low, ci_high)
+    """
+    judged = {h: scores[h] for h in strata if scores.get(h)}
+    if not judged:
+        raise ValueError("No judged items to estimate from")
+
+    unsampled = [h for h in strata if h not in judged]
+    if unsampled:
+        warnings.warn(
+            f"{len(unsampled)} strata ({sum(len(strata[h]) for h in unsampled)} items) have no judged "
+            f"items and are left out of the estimate: {', '.join(unsampled)}"
+        )
+
+    population = sum(len(strata[h]) for h in judged)
+    n = sum(len(values) for values in judged.values())
+
+    means = {h: sum(values) / len(values) for h, values in judged.items()}
+    estimate = sum(len(strata[h]) / population * means[h] for h in judged)
+
+    squares = sum((v - means[h]) ** 2 for h, values in judged.items() for v in values)
+    pooled_df = n - len(judged)
+    partial = [h for h, values in judged.items() if len(values) < len(strata[h])]
+    if not partial:
+        return estimate, estimate, estimate
+    if pooled_df == 0:
+        # One judged item per stratum: no within-stratum spread to measure
+        return estimate, None, None
+    pooled_var = squares / pooled_df
+
+    variance = 0.0
+    for h in partial:
+        values = judged[h]
+        n_h, size = len(values), len(strata[h])
+        var_h = (sum((v - means[h]) ** 2 for v in values) / (n_h - 1)) if n_h > 1 else pooled_var
+        weight = size / population
+        variance += weight ** 2 * (1 - n_h / size) * var_h / n_h
+
+    margin = t_critical(confidence, pooled_df) * math.sqrt(variance)
+    return estimate, estimate - margin, estimate + margin
+
+
+def evaluate_sampled(
+    input_text: str,
+    items: List[TriageItem],
+    prompt_version: str = "unknown",
+    sample_size: int = 40,
+    batch_size: int = 15,
+    max_workers: int = 4,
+    model: str = "gpt-4o",
+    temperature: float = 0.1,
+    confidence: float = 0.95,
+    seed: int = 0,
+    max_context_chars: int = 12000,
+    cache: Optional[EvaluationCache] = None
+) -> SampledEvaluation:
+    """
+    Judge a stratified sample of triage items and extrapolate the overall score.
+
+    Args:
+        input_text: Original raw input text
+        items: All TriageItems produced for the note
+        prompt_version: Identifier for the prompt being evaluated
+        sample_size: Items to judge (all items if the note is smaller)
+        batch_size: Items per judge call
+        max_workers: Judge calls in flight at once
+        model: Judge model
+        temperature: Judge sampling temperature
+        confidence: Confidence level for the interval
+        seed: Sampling seed (same seed + items = same sample, so cache hits)
+        max_context_chars: Above this, the judge sees excerpts of the input
+        cache: Optional judge cache (keyed per sub-batch)
+
+    Returns:
+        SampledEvaluation with the estimate, interval and per-stratum scores
+
+    Raises:
+        ValueError: If there are no items or every sub-batch failed
+    """
+    if not items:
+        raise ValueError("No items to evaluate")
+
+    strata = stratify(items)
+    if len(strata) > sample_size:
+        # Too fine-grained for the sample - fall back to type-only strata
+        strata = stratify(items, by=("type",))
+
+    allocation = allocate_sample({h: len(members) for h, members in strata.items()}, sample_size)
+
+    rng = random.Random(seed)
+    sampled_ids = set()
+    for h, k in allocation.items():
+        sampled_ids.update(item.id for item in rng.sample(strata[h], k))
+
+    # Keep document order so each batch's input excerpts stay coherent
+    sample = [item for item in items if item.id in sampled_ids]
+    batches = [sample[i:i + batch_size] for i in range(0, len(sample), batch_size)]
+
+    print(f"🎯 Judging {len(sample)}/{len(items)} items from {len(allocation)} strata "
+          f"in {len(batches)} batches ({max_workers} workers)")
+
+    def judge(batch: List[TriageItem]):
+        try:
+            return evaluate_triage_output(
+                input_text=judge_context(input_text, batch, max_context_chars),
+                items=batch,
+                prompt_version=prompt_version,
+                model=model,
+                temperature=temperature,
+                cache=cache
+            )
+        except Exception as e:
+            print(f"⚠️  Judge batch failed: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(judge, batches))
+
+    evaluations = [r for r in results if r is not None]
+    if not evaluations:
+        raise ValueError("All judge batches failed")
+
+    # Judges occasionally drop or invent IDs; only score items we asked about
+    item_stratum = {item.id: h for h, members in strata.items() for item in members}
+    judged: Dict[str, ItemEvaluation] = {}
+    for evaluation in evaluations:
+        for item_eval in evaluation.item_evaluations:
+            if item_eval.item_id in sampled_ids:
+                judged[item_eval.item_id] = item_eval
+
+    scores: Dict[str, List[float]] = {}
+    for item_id, item_eval in judged.items():
+        scores.setdefault(item_stratum[item_id], []).append(item_score(item_eval))
+
+    estimate, low, high = stratified_estimate(strata, scores, confidence)
+
+    recommendations = Counter(e.recommendation.strip().lower() for e in evaluations)
+
+    return SampledEvaluation(
+        prompt_version=prompt_version,
+        num_items=len(items),
+        sample_size=len(judged),
+        num_batches=len(batches),
+        failed_batches=len(batches) - len(evaluations),
+        overall_score=min(5.0, max(0.0, estimate)),
+        ci_low=max(0.0, low) if low is not None else None,
+        ci_high=min(5.0, high) if high is not None else None,
+        confidence=confidence,
+        strata=[
+            StratumScore(
+                stratum=h,
+                population=len(members),
+                sampled=len(scores.get(h, [])),
+                mean_score=sum(scores[h]) / len(scores[h]) if scores.get(h) else None
+            )
+            for h, members in sorted(strata.items(), key=lambda kv: len(kv[1]), reverse=True)
+        ],
+        item_evaluations=[judged[item.id] for item in sample if item.id in judged],
+        strengths=[e.strengths for e in evaluations],
+        weaknesses=[e.weaknesses for e in evaluations],
+        recommendation=recommendations.most_common(1)[0][0]
+    )
@@ -128,3 +128,60 @@ class TriageEvaluation(BaseModel):
     strengths: str = Field(..., description="What this prompt does well")
     weaknesses: str = Field(..., description="What this prompt struggles with")
     recommendation: str = Field(..., description="Keep, revise, or discard")
+
+
+class StratumScore(BaseModel):
+    """Sampled judge scores for one (type, domain) stratum of triage items."""
+
+    stratum: str = Field(..., description="Stratum key ('<type> | <primary domain>')")
+    population: int = Field(..., description="Number of items in the stratum")
+    sampled: int = Field(..., description="Number of items judged")
+    mean_score: Optional[float] = Field(None, description="Mean item score over judged items")
+
+
+class SampledEvaluation(BaseModel):
+    """Judge evaluation of a stratified sample, extrapolated to all items."""
+
+    prompt_version: str = Field(..., description="Identifier for the prompt")
+    num_items: int = Field(..., description="Number of items extracted (population)")
+    sample_size: int = Field(..., description="Number of items judged")
+    num_batches: int = Field(..., description="Number of judge calls (sub-batches)")
+    failed_batches: int = Field(default=0, description="Sub-batches whose judge call failed")
+    overall_score: float = Field(..., ge=0.0, le=5.0, description="Stratified estimate of the all-items score")
+    ci_low: Optional[float] = Field(None, description="Lower bound of the confidence interval (None if the sample can't support one)")
+    ci_high: Optional[float] = Field(None, description="Upper bound of the confidence interval (None if the sample can't support one)")
+    confidence: float = Field(..., description="Confidence level of the interval")
+    strata: List[StratumScore] = Field(default_factory=list, description="Per-stratum breakdown")
+    item_evaluations: List[ItemEvaluation] = Field(default_factory=list, description="Judged sample items")
+    strengths: List[str] = Field(default_factory=list, description="Strengths noted per sub-batch")
+    weaknesses: List[str] = Field(default_factory=list, description="Weaknesses noted per sub-batch")
+    recommendation: str = Field(..., description="Majority recommendation across sub-batches")
+
+
+class EvalMatrixCell(BaseModel):
+    """Result of triaging + evaluating one note with one prompt version."""
+
+    prompt_version: str = Field(..., description="Prompt version label (e.g., file stem)")
+    note: str = Field(..., description="Input note identifier (e.g., file name)")
+    status: str = Field(..., description="ok | error")
+    overall_score: Optional[float] = Field(None, ge=0.0, le=5.0, description="Judge overall score")
+    num_items: int = Field(default=0, description="Number of triage items produced")
+    elapsed_seconds: float = Field(default=0.0, description="Wall time for triage + evaluation")
+    error: Optional[str] = Field(None, description="Error message if status is error")
+    evaluation: Optional[dict] = Field(None, description="TriageEvaluation dump (without input_text)")
+    prompt_hash: Optional[str] = Field(None, description="SHA256 of the prompt text the cell ran with")
+    triage_model: Optional[str] = Field(None, description="Model used for Layer 1 triage")
+    judge_model: Optional[str] = Field(None, description="Model used for evaluation")
+    sample_size: Optional[int] = Field(None, description="Judge sample size (None = every item judged)")
+
+
+class PromptAggregate(BaseModel):
+    """Aggregate scores for one prompt version across all notes."""
+
+    prompt_version: str = Field(..., description="Prompt version label")
+    notes_scored: int = Field(..., description="Number of notes with a successful evaluation")
+    notes_failed: int = Field(default=0, description="Number of notes that errored")
+    mean_score: float = Field(..., description="Mean overall_score")
+    ci_low: float = Field(..., description="Lower bound of the confidence interval")
+    ci_high: float = Field(..., description="Upper bound of the confidence interval")
+    mean_items: float = Field(..., description="Mean number of triage items per note")
@@ -0,0 +1,92 @@
+"""
+Small statistics helpers for evaluation reporting (no scipy dependency).
+"""
+import math
+from statistics import NormalDist
+from typing import List, Tuple
+
+
+# Above this df the Cornish-Fisher expansion is within 1e-5 of the exact value
+_EXACT_DF_LIMIT = 100
+
+
+def t_central_probability(t: float, df: int) -> float:
+    """
+    P(|T| < t) for a Student-t with integer df, exactly.
+
+    Finite cosine series in theta = atan(t / sqrt(df)) (Abramowitz & Stegun 26.7.3-4).
+    """
+    theta = math.atan(t / math.sqrt(df))
+    cos2 = math.cos(theta) ** 2
+    if df % 2 == 1:
+        series, term = 0.0, math.cos(theta)
+        for k in range(1, (df - 1) // 2 + 1):
+            if k > 1:
+                term *= cos2 * (2 * k - 2) / (2 * k - 1)
+            series += term
+        return 2 / math.pi * (theta + math.sin(theta) * series)
+    series, term = 1.0, 1.0
+    for k in range(1, df // 2):
+        term *= cos2 * (2 * k - 1) / (2 * k)
+        series += term
+    return math.sin(theta) * series
+
+
+def t_critical(confidence: float, df: int) -> float:
+    """
+    Two-sided Student-t critical value.
+
+    Exact for df <= 100 (the t distribution function inverted by bisection);
+    above that a Cornish-Fisher expansion around the normal quantile, within
+    1e-5 of exact. Returns inf for df <= 0.
+    """
+    p = 0.5 + confidence / 2
+    if df <= 0:
+        return float('inf')
+
+    if df <= _EXACT_DF_LIMIT:
+        low, high = 0.0, 1.0
+        while t_central_probability(high, df) < confidence:
+            high *= 2
+        for _ in range(100):
+            mid = (low + high) / 2
+            if t_central_probability(mid, df) < confidence:
+                low = mid
+            else:
+                high = mid
+        return (low + high) / 2
+
+    z = NormalDist().inv_cdf(p)
+
+    g1 = (z**3 + z) / 4
+    g2 = (5 * z**5 + 16 * z**3 + 3 * z) / 96
+    g3 = (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / 384
+    return z + g1 / df + g2 / df**2 + g3 / df**3
+
+
+def mean_confidence_interval(
+    values: List[float],
+    confidence: float = 0.95
+) -> Tuple[float, float, float]:
+    """
+    Mean with a t-based confidence interval.
+
+    Args:
+        values: Sample values
+        confidence: Confidence level (default: 0.95)
+
+    Returns:
+        Tuple of (mean, ci_low, ci_high). With fewer than 2 values the
+        interval collapses to the mean.
+    """
+    n = len(values)
+    if n == 0:
+        return 0.0, 0.0, 0.0
+
+    mean = sum(values) / n
+    if n < 2:
+        return mean, mean, mean
+
+    variance = sum((v - mean) ** 2 for v in values) / (n - 1)
+    margin = t_critical(confidence, n - 1) * math.sqrt(variance / n)
+    return mean, mean - margin, mean + margin
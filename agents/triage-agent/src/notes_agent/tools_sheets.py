@@ -2,9 +2,14 @@
 Google Sheets integration for triage output.
 Used for intermediate testing and validation.
 """
+from collections import deque
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional
+import random
+import time
 import gspread
+from gspread.utils import a1_range_to_grid_range, rowcol_to_a1
 from google.oauth2.service_account import Credentials
 from .schemas import TriageItem, TriageEvaluation
 import os
@@ -16,11 +21,37 @@ SCOPES = [
     'https://www.googleapis.com/auth/drive'
 ]
 
+# Cell formats shared by all writers
+HEADER_FORMAT = {
+    'textFormat': {'bold': True},
+    'backgroundColor': {'red': 0.9, 'green': 0.9, 'blue': 0.9}
+}
+PROMPT_VERSION_FORMAT = {
+    'textFormat': {'bold': True, 'fontSize': 11},
+    'backgroundColor': {'red': 1.0, 'green': 0.9, 'blue': 0.6}
+}
+
+TRIAGE_HEADERS = [
+    'ID',
+    'Date',
+    'Personal/Work',
+    'Domain',
+    'Type',
+    'Tags',
+    'Niche Signal',
+    'Publishable',
+    'Raw Context'
+]
+
 
+@lru_cache(maxsize=1)
 def get_sheets_client() -> gspread.Client:
     """
     Authenticate and return Google Sheets client.
 
+    The client is cached for the life of the process (google-auth refreshes
+    the access token on its own), so repeated writes don't re-authorize.
+
     Returns:
         Authenticated gspread client
 
@@ -48,6 +79,445 @@ def get_sheets_client() -> gspread.Client:
         raise ValueError(f"Failed to authenticate with Google Sheets: {e}")
 
 
+def triage_item_to_row(item: TriageItem) -> list:
+    """Convert a TriageItem to a sheet row (column order matches TRIAGE_HEADERS)."""
+    return [
+        item.id,
+        item.date,
+        item.personal_or_work,
+        item.domain,
+        item.type,
+        item.tags,
+        'TRUE' if item.niche_signal else 'FALSE',
+        'TRUE' if item.publishable else 'FALSE',
+        item.raw_context
+    ]
+
+
+def _to_cell(value: Any) -> dict:
+    """Convert a Python value to a Sheets CellData with a raw (not parsed) value."""
+    if value is None or value == '':
+        return {}
+    if isinstance(value, bool):
+        return {'userEnteredValue': {'stringValue': 'TRUE' if value else 'FALSE'}}
+    if isinstance(value, (int, float)):
+        return {'userEnteredValue': {'numberValue': value}}
+    return {'userEnteredValue': {'stringValue': str(value)}}
+
+
+class SheetsWriter:
+    """
+    Batched Google Sheets writer.
+
+    Caches the authorized client and opened spreadsheets (with their worksheet
+    metadata), and writes values, formatting and column resizing as a single
+    spreadsheets.batchUpdate call. Sheets quotas are per request, so a write
+    costs one API call instead of one per operation.
+
+    Request counts are kept in self.stats:
+        api_calls: HTTP calls made to the Sheets API
+        batch_requests: sub-requests sent inside batchUpdate calls
+        retries: calls retried after a 429/5xx response
+
+    Calls are throttled to at most max_calls_per_minute in any 60s window
+    (the default Sheets quota is 60 requests/minute/user), so short bursts go
+    out immediately, and retried with exponential backoff when the API still
+    reports a quota or server error.
+    """
+
+    RETRYABLE_CODES = {429, 500, 502, 503}
+
+    def __init__(
+        self,
+        client: Optional[gspread.Client] = None,
+        max_calls_per_minute: int = 55,
+        max_retries: int = 5
+    ):
+        self._client = client
+        self._spreadsheets: Dict[str, gspread.Spreadsheet] = {}
+        self._worksheets: Dict[str, Dict[str, dict]] = {}  # sheet_id -> title -> properties
+        self.max_calls_per_minute = max_calls_per_minute
+        self.max_retries = max_retries
+        self._call_times: deque = deque()
+        self.stats = {'api_calls': 0, 'batch_requests': 0, 'retries': 0}
+
+    @property
+    def client(self) -> gspread.Client:
+        if self._client is None:
+            self._client = get_sheets_client()
+        return self._client
+
+    def _execute(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run one Sheets API call, throttled and retried on quota/server errors."""
+        for attempt in range(self.max_retries + 1):
+            now = time.monotonic()
+            while self._call_times and now - self._call_times[0] >= 60:
+                self._call_times.popleft()
+            if len(self._call_times) >= self.max_calls_per_minute:
+                time.sleep(60 - (now - self._call_times[0]))
+                self._call_times.popleft()
+
+            self._call_times.append(time.monotonic())
+            self.stats['api_calls'] += 1
+
+            try:
+                return fn(*args, **kwargs)
+            except gspread.exceptions.APIError as e:
+                if e.code not in self.RETRYABLE_CODES or attempt == self.max_retries:
+                    raise
+                self.stats['retries'] += 1
+                backoff = min(2 ** attempt, 64) + random.random()
+                print(f"  ⏳ Sheets API returned {e.code}, retrying in {backoff:.1f}s...")
+                time.sleep(backoff)
+
+    def open(self, sheet_id: str) -> gspread.Spreadsheet:
+        """Open a spreadsheet by ID (cached) and load its worksheet metadata once."""
+        if sheet_id not in self._spreadsheets:
+            spreadsheet = self._execute(self.client.open_by_key, sheet_id)
+            metadata = self._execute(spreadsheet.fetch_sheet_metadata)
+
+            self._spreadsheets[sheet_id] = spreadsheet
+            self._worksheets[sheet_id] = {
+                ws['properties']['title']: ws['properties']
+                for ws in metadata.get('sheets', [])
+            }
+
+        return self._spreadsheets[sheet_id]
+
+    def worksheet_properties(self, sheet_id: str, worksheet_name: str) -> Optional[dict]:
+        """Return cached properties (sheetId, gridProperties, ...) for a worksheet, or None."""
+        self.open(sheet_id)
+        return self._worksheets[sheet_id].get(worksheet_name)
+
+    def first_worksheet_title(self, sheet_id: str) -> Optional[str]:
+        """Return the title of the first tab by position (what gspread's .sheet1 opens), or None."""
+        self.open(sheet_id)
+        # Metadata lists tabs in position order; tabs we add later are appended after them
+        return next(iter(self._worksheets[sheet_id]), None)
+
+    def refresh(self, sheet_id: str) -> None:
+        """Drop cached metadata for a spreadsheet (e.g. after it was edited elsewhere)."""
+        self._spreadsheets.pop(sheet_id, None)
+        self._worksheets.pop(sheet_id, None)
+
+    def batch_update(self, sheet_id: str, requests: List[dict]) -> dict:
+        """Send a list of Sheets API requests in one batchUpdate call."""
+        if not requests:
+            return {}
+
+        spreadsheet = self.open(sheet_id)
+        response = self._execute(spreadsheet.batch_update, {'requests': requests})
+        self.stats['batch_requests'] += len(requests)
+        return response
+
+    def _prepare_worksheet(
+        self,
+        sheet_id: str,
+        worksheet_name: str,
+        min_rows: int,
+        min_cols: int
+    ) -> tuple:
+        """
+        Build requests that make sure the worksheet exists and is large enough.
+
+        The cache is not touched here; the caller stores the returned properties
+        once the batch has been applied.
+
+        Returns:
+            Tuple of (worksheet sheetId, list of requests, updated properties or None)
+        """
+        props = self.worksheet_properties(sheet_id, worksheet_name)
+
+        if props is None:
+            # Choose the new sheetId ourselves so later requests in the same batch can reference it
+            existing_ids = {p['sheetId'] for p in self._worksheets[sheet_id].values()}
+            ws_id = random.randint(1, 2**31 - 1)
+            while ws_id in existing_ids:
+                ws_id = random.randint(1, 2**31 - 1)
+
+            props = {
+                'sheetId': ws_id,
+                'title': worksheet_name,
+                'gridProperties': {'rowCount': max(100, min_rows), 'columnCount': max(10, min_cols)}
+            }
+            return ws_id, [{'addSheet': {'properties': props}}], props
+
+        grid = props.get('gridProperties', {})
+        rows = max(grid.get('rowCount', 0), min_rows)
+        cols = max(grid.get('columnCount', 0), min_cols)
+        if rows == grid.get('rowCount') and cols == grid.get('columnCount'):
+            return props['sheetId'], [], None
+
+        resized = {**props, 'gridProperties': {**grid, 'rowCount': rows, 'columnCount': cols}}
+        return props['sheetId'], [{
+            'updateSheetProperties': {
+                'properties': {
+                    'sheetId': props['sheetId'],
+                    'gridProperties': {'rowCount': rows, 'columnCount': cols}
+                },
+                'fields': 'gridProperties(rowCount,columnCount)'
+            }
+        }], resized
+
+    def write_rows(
+        self,
+        sheet_id: str,
+        worksheet_name: str,
+        rows: List[list],
+        formats: Optional[List[tuple]] = None,
+        clear_existing: bool = False,
+        auto_resize_columns: Optional[int] = None
+    ) -> gspread.Spreadsheet:
+        """
+        Write rows starting at A1 with formatting, in one batchUpdate call.
+
+        Args:
+            sheet_id: Google Sheet ID (from URL)
+            worksheet_name: Worksheet/tab name (created if missing)
+            rows: Rows of cell values
+            formats: Optional list of (a1_range, cell_format) tuples
+            clear_existing: If True, clear existing values first
+            auto_resize_columns: If set, auto-resize the first N columns
+
+        Returns:
+            The (cached) gspread Spreadsheet
+        """
+        num_cols = max((len(row) for row in rows), default=0)
+        ws_id, requests, pending_props = self._prepare_worksheet(
+            sheet_id, worksheet_name, len(rows), num_cols
+        )
+
+        if clear_existing:
+            requests.append({
+                'updateCells': {'range': {'sheetId': ws_id}, 'fields': 'userEnteredValue'}
+            })
+
+        requests.append({
+            'updateCells': {
+                'start': {'sheetId': ws_id, 'rowIndex': 0, 'columnIndex': 0},
+                'rows': [{'values': [_to_cell(value) for value in row]} for row in rows],
+                'fields': 'userEnteredValue'
+            }
+        })
+
+        for a1_range, cell_format in formats or []:
+            requests.append({
+                'repeatCell': {
+                    'range': a1_range_to_grid_range(a1_range, ws_id),
+                    'cell': {'userEnteredFormat': cell_format},
+                    'fields': 'userEnteredFormat(' + ','.join(cell_format.keys()) + ')'
+                }
+            })
+
+        if auto_resize_columns:
+            requests.append({
+                'autoResizeDimensions': {
+                    'dimensions': {
+                        'sheetId': ws_id,
+                        'dimension': 'COLUMNS',
+                        'startIndex': 0,
+                        'endIndex': auto_resize_columns
+                    }
+                }
+            })
+
+        self.batch_update(sheet_id, requests)
+        # Only cache the new/resized worksheet once the API has accepted it
+        if pending_props is not None:
+            self._worksheets[sheet_id][worksheet_name] = pending_props
+        return self._spreadsheets[sheet_id]
+
+    def write_triage_items(
+        self,
+        items: List[TriageItem],
+        sheet_id: str,
+        worksheet_name: str = "Sheet1",
+        clear_existing: bool = False,
+        prompt_version: Optional[str] = None
+    ) -> gspread.Spreadsheet:
+        """Write triage items (with optional prompt version banner) in one batchUpdate call."""
+        rows = []
+        formats = []
+        if prompt_version:
+            rows.append(['Prompt Version:', prompt_version])
+            rows.append([])  # Empty row
+            formats.append(('A1:B1', PROMPT_VERSION_FORMAT))
+
+        header_row = len(rows) + 1
+        formats.append((f'A{header_row}:I{header_row}', HEADER_FORMAT))
+
+        rows.append(TRIAGE_HEADERS)
+        rows.extend(triage_item_to_row(item) for item in items)
+
+        return self.write_rows(
+            sheet_id,
+            worksheet_name,
+            rows,
+            formats=formats,
+            clear_existing=clear_existing,
+            auto_resize_columns=len(TRIAGE_HEADERS)
+        )
+
+    def sync_rows(
+        self,
+        sheet_id: str,
+        worksheet_name: str,
+        header: List[str],
+        rows: List[list],
+        key_column: int = 0,
+        metadata_rows: Optional[List[list]] = None,
+        chunk_size: int = 500
+    ) -> dict:
+        """
+        Incrementally sync rows to a worksheet, keyed by one column (e.g. triage ID).
+
+        Reads the current worksheet once, diffs it against `rows` and applies only
+        the changes: changed rows as range updates, deleted rows as row deletions
+        and new rows as appends. Each kind is sent in chunks of `chunk_size` per
+        API call. If the worksheet doesn't have the expected layout (metadata
+        rows followed by `header`), it is rewritten in full instead.
+
+        Args:
+            sheet_id: Google Sheet ID (from URL)
+            worksheet_name: Worksheet/tab name
+            header: Header row; data rows follow it
+            rows: Desired data rows (keys must be unique)
+            key_column: Index of the key column within each row
+            metadata_rows: Optional rows above the header (always rewritten)
+            chunk_size: Max rows/ranges per API call
+
+        Returns:
+            Dict with counts: inserted, updated, deleted, unchanged, api_calls, full_rewrite
+        """
+        metadata_rows = metadata_rows or []
+        calls_before = self.stats['api_calls']
+        spreadsheet = self.open(sheet_id)
+        props = self.worksheet_properties(sheet_id, worksheet_name)
+
+        quoted = "'" + worksheet_name.replace("'", "''") + "'"
+        width = len(header)
+
+        def normalize(row: list) -> List[str]:
+            cells = ['' if value is None else str(value) for value in row]
+            return (cells + [''] * width)[:width]
+
+        desired = [normalize(row) for row in rows]
+        header_index = len(metadata_rows)
+
+        current = []
+        if props is not None:
+            response = self._execute(spreadsheet.values_get, quoted)
+            current = response.get('values', [])
+
+        # Layout mismatch (new sheet, header moved, metadata block changed) -> full rewrite
+        if len(current) <= header_index or normalize(current[header_index]) != normalize(header):
+            self.write_rows(
+                sheet_id,
+                worksheet_name,
+                metadata_rows + [header] + desired,
+                formats=[(
+                    f'{rowcol_to_a1(header_index + 1, 1)}:{rowcol_to_a1(header_index + 1, width)}',
+                    HEADER_FORMAT
+                )],
+                clear_existing=True
+            )
+            return {
+                'inserted': len(desired), 'updated': 0, 'deleted': 0, 'unchanged': 0,
+                'api_calls': self.stats['api_calls'] - calls_before, 'full_rewrite': True
+            }
+
+        # Index existing data rows by key (1-based sheet row numbers)
+        existing: Dict[str, tuple] = {}
+        to_delete: List[int] = []
+        for offset, row in enumerate(current[header_index + 1:]):
+            row_number = header_index + 2 + offset
+            cells = normalize(row)
+            key = cells[key_column]
+            if not key or key in existing:
+                to_delete.append(row_number)  # Blank or duplicate key rows
+            else:
+                existing[key] = (row_number, cells)
+
+        updates = []
+        inserts = []
+        seen = set()
+        for cells in desired:
+            key = cells[key_column]
+            seen.add(key)
+            if key not in existing:
+                inserts.append(cells)
+            elif existing[key][1] != cells:
+                updates.append((existing[key][0], cells))
+
+        to_delete.extend(row_number for key, (row_number, _) in existing.items() if key not in seen)
+        unchanged = len(desired) - len(inserts) - len(updates)
+
+        # 1. Range updates (metadata + changed rows) - row numbers are still valid here
+        data = [
+            {'range': f'{quoted}!A{i + 1}', 'values': [row]}
+            for i, row in enumerate(metadata_rows)
+            if i >= len(current) or normalize(current[i]) != normalize(row)
+        ]
+        data += [{'range': f'{quoted}!A{row_number}', 'values': [cells]} for row_number, cells in updates]
+        for i in range(0, len(data), chunk_size):
+            self._execute(spreadsheet.values_batch_update, {
+                'valueInputOption': 'RAW',
+                'data': data[i:i + chunk_size]
+            })
+
+        # 2. Deletions, bottom-up so earlier row numbers stay valid; contiguous rows merged
+        spans = []
+        for row_number in sorted(set(to_delete), reverse=True):
+            if spans and spans[-1][0] == row_number + 1:
+                spans[-1][0] = row_number
+            else:
+                spans.append([row_number, row_number])
+        delete_requests = [
+            {
+                'deleteDimension': {
+                    'range': {
+                        'sheetId': props['sheetId'],
+                        'dimension': 'ROWS',
+                        'startIndex': start - 1,
+                        'endIndex': end
+                    }
+                }
+            }
+            for start, end in spans
+        ]
+        for i in range(0, len(delete_requests), chunk_size):
+            self.batch_update(sheet_id, delete_requests[i:i + chunk_size])
+
+        # 3. Appends after the last data row
+        for i in range(0, len(inserts), chunk_size):
+            self._execute(
+                spreadsheet.values_append,
+                f'{quoted}!A{header_index + 1}',
+                params={'valueInputOption': 'RAW', 'insertDataOption': 'INSERT_ROWS'},
+                body={'values': inserts[i:i + chunk_size]}
+            )
+
+        # Keep cached grid size in step with deleted/appended rows
+        grid = props.get('gridProperties', {})
+        if 'rowCount' in grid:
+            grid['rowCount'] += len(inserts) - sum(end - start + 1 for start, end in spans)
+
+        return {
+            'inserted': len(inserts),
+            'updated': len(updates),
+            'deleted': len(set(to_delete)),
+            'unchanged': unchanged,
+            'api_calls': self.stats['api_calls'] - calls_before,
+            'full_rewrite': False
+        }
+
+
+@lru_cache(maxsize=1)
+def get_sheets_writer() -> SheetsWriter:
+    """Return the process-wide SheetsWriter (shares the cached client and spreadsheets)."""
+    return SheetsWriter()
+
+
 def write_triage_items_to_sheet(
     items: List[TriageItem],
     sheet_id: str,
@@ -58,6 +528,9 @@ def write_triage_items_to_sheet(
     """
     Write triage items to a Google Sheet.
 
+    Values, header formatting and column resizing go out in a single
+    batchUpdate call via the shared SheetsWriter.
+
     Args:
         items: List of TriageItem objects to write
         sheet_id: Google Sheet ID (from URL)
@@ -75,83 +548,20 @@ def write_triage_items_to_sheet(
         print("⚠️  No items to write to sheet")
         return ""
 
-    client = get_sheets_client()
+    writer = get_sheets_writer()
+    calls_before = writer.stats['api_calls']
 
     try:
-        # Open the spreadsheet by ID
-        sheet = client.open_by_key(sheet_id)
-        print(f"✓ Opened sheet: {sheet.title}")
-
-        # Get or create worksheet
-        try:
-            worksheet = sheet.worksheet(worksheet_name)
-        except gspread.WorksheetNotFound:
-            worksheet = sheet.add_worksheet(title=worksheet_name, rows=100, cols=10)
-
-        # Clear existing data if requested
-        if clear_existing:
-            worksheet.clear()
-
-        # Add metadata row if prompt version specified
-        rows = []
-        if prompt_version:
-            rows.append(['Prompt Version:', prompt_version])
-            rows.append([])  # Empty row
-
-        # Prepare header row
-        headers = [
-            'ID',
-            'Date',
-            'Personal/Work',
-            'Domain',
-            'Type',
-            'Tags',
-            'Niche Signal',
-            'Publishable',
-            'Raw Context'
-        ]
-
-        # Prepare data rows
-        rows.append(headers)
-        for item in items:
-            rows.append([
-                item.id,
-                item.date,
-                item.personal_or_work,
-                item.domain,
-                item.type,
-                item.tags,
-                'TRUE' if item.niche_signal else 'FALSE',
-                'TRUE' if item.publishable else 'FALSE',
-                item.raw_context
-            ])
-
-        # Write to sheet
-        worksheet.update('A1', rows)
-
-        # Format headers and metadata
-        if prompt_version:
-            # Format prompt version row (bold, highlighted)
-            worksheet.format('A1:B1', {
-                'textFormat': {'bold': True, 'fontSize': 11},
-                'backgroundColor': {'red': 1.0, 'green': 0.9, 'blue': 0.6}
-            })
-            # Format header row (bold)
-            worksheet.format('A3:I3', {
-                'textFormat': {'bold': True},
-                'backgroundColor': {'red': 0.9, 'green': 0.9, 'blue': 0.9}
-            })
-        else:
-            # Format header row (bold)
-            worksheet.format('A1:I1', {
-                'textFormat': {'bold': True},
-                'backgroundColor': {'red': 0.9, 'green': 0.9, 'blue': 0.9}
-            })
-
-        # Auto-resize columns
-        worksheet.columns_auto_resize(0, len(headers) - 1)
+        sheet = writer.write_triage_items(
+            items,
+            sheet_id,
+            worksheet_name=worksheet_name,
+            clear_existing=clear_existing,
+            prompt_version=prompt_version
+        )
 
         print(f"✓ Wrote {len(items)} items to '{sheet.title}' → '{worksheet_name}'")
+        print(f"  API calls: {writer.stats['api_calls'] - calls_before}")
         print(f"  URL: {sheet.url}")
 
         return sheet.url
@@ -216,19 +626,7 @@ def append_to_sheet(
         worksheet = sheet.worksheet(worksheet_name)
 
         # Prepare data rows (no headers)
-        rows = []
-        for item in items:
-            rows.append([
-                item.id,
-                item.date,
-                item.personal_or_work,
-                item.domain,
-                item.type,
-                item.tags,
-                'TRUE' if item.niche_signal else 'FALSE',
-                'TRUE' if item.publishable else 'FALSE',
-                item.raw_context
-            ])
+        rows = [triage_item_to_row(item) for item in items]
 
         # Append to sheet
         worksheet.append_rows(rows)
@@ -257,18 +655,10 @@ def write_evaluation_to_sheet(
     Returns:
         URL of the Google Sheet
     """
-    client = get_sheets_client()
+    writer = get_sheets_writer()
+    calls_before = writer.stats['api_calls']
 
     try:
-        sheet = client.open_by_key(sheet_id)
-
-        # Get or create worksheet
-        try:
-            worksheet = sheet.worksheet(worksheet_name)
-            worksheet.clear()  # Clear existing evaluation
-        except gspread.WorksheetNotFound:
-            worksheet = sheet.add_worksheet(title=worksheet_name, rows=100, cols=10)
-
         # Header
         headers = [
             'Prompt Version',
@@ -323,31 +713,29 @@ def write_evaluation_to_sheet(
             item_headers
         ] + item_rows
 
-        # Write to sheet
-        worksheet.update('A1', all_rows)
-
-        # Format headers (bold)
-        worksheet.format('A1:F1', {
-            'textFormat': {'bold': True},
-            'backgroundColor': {'red': 0.9, 'green': 0.9, 'blue': 0.9}
-        })
-        worksheet.format('A4:H4', {
-            'textFormat': {'bold': True},
-            'backgroundColor': {'red': 0.9, 'green': 0.9, 'blue': 0.9}
-        })
-
         # Highlight overall score
         score_color = {
             'red': 0.8 if evaluation.overall_score < 3 else 0.6 if evaluation.overall_score < 4 else 0.8,
             'green': 0.8 if evaluation.overall_score >= 4 else 0.6,
             'blue': 0.6
         }
-        worksheet.format('B2', {'backgroundColor': score_color, 'textFormat': {'bold': True}})
 
-        # Auto-resize columns
-        worksheet.columns_auto_resize(0, len(headers) - 1)
+        # Values, formatting and resize in one batchUpdate call
+        sheet = writer.write_rows(
+            sheet_id,
+            worksheet_name,
+            all_rows,
+            formats=[
+                ('A1:F1', HEADER_FORMAT),
+                ('A4:H4', HEADER_FORMAT),
+                ('B2', {'backgroundColor': score_color, 'textFormat': {'bold': True}}),
+            ],
+            clear_existing=True,
+            auto_resize_columns=len(headers)
+        )
 
         print(f"✓ Wrote evaluation to '{sheet.title}' → '{worksheet_name}'")
+        print(f"  API calls: {writer.stats['api_calls'] - calls_before}")
         print(f"  URL: {sheet.url}")
 
         return sheet.url
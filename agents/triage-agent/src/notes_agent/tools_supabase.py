@@ -193,6 +193,114 @@ def get_all_triage_items(client: Client, limit: Optional[int] = None) -> List[di
         raise Exception(f"Failed to fetch triage items: {e}")
 
 
+def get_triage_items_by_ids(client: Client, ids: List[str]) -> List[TriageItem]:
+    """
+    Fetch triage items by ID (IDs no longer in the table are skipped).
+
+    Args:
+        client: Supabase client
+        ids: Triage item IDs (e.g. 'T012')
+
+    Returns:
+        List of TriageItem objects
+    """
+    if not ids:
+        return []
+
+    try:
+        result = client.schema('raw').table('triage_items').select('*').in_('id', ids).order('id').execute()
+        return [TriageItem(**{field: row[field] for field in TriageItem.model_fields}) for row in result.data]
+
+    except Exception as e:
+        raise Exception(f"Failed to fetch triage items: {e}")
+
+
+# Filter keys accepted by search_triage -> raw.search_triage_items RPC parameter names
+TRIAGE_SEARCH_FILTERS = {
+    'type': 'filter_type',
+    'domain': 'filter_domain',
+    'personal_or_work': 'filter_personal_or_work',
+    'niche_signal': 'filter_niche_signal',
+    'publishable': 'filter_publishable',
+    'date_from': 'filter_date_from',
+    'date_to': 'filter_date_to',
+}
+
+
+def search_triage(
+    client: Client,
+    query: str,
+    filters: Optional[dict] = None,
+    limit: int = 20
+) -> List[dict]:
+    """
+    Full-text search over triage items, ranked by relevance.
+
+    Uses the GIN-indexed search_vector column via the raw.search_triage_items RPC,
+    so it stays fast as the table grows (no ILIKE scans).
+
+    Args:
+        client: Supabase client
+        query: Search text (web search syntax: "exact phrase", -exclude, or)
+        filters: Optional exact-match filters: type, domain, personal_or_work,
+                 niche_signal, publishable, date_from, date_to (YYYY-MM-DD)
+        limit: Max number of results
+
+    Returns:
+        List of triage items as dicts, best match first, each with a 'rank' score
+
+    Raises:
+        ValueError: If an unknown filter key is passed
+    """
+    if not query or not query.strip():
+        return []
+
+    params = {'search_query': query, 'match_limit': limit}
+    for key, value in (filters or {}).items():
+        if key not in TRIAGE_SEARCH_FILTERS:
+            available = ", ".join(TRIAGE_SEARCH_FILTERS)
+            raise ValueError(f"Unknown search filter: {key}. Available filters: {available}")
+        params[TRIAGE_SEARCH_FILTERS[key]] = value
+
+    try:
+        result = client.schema('raw').rpc('search_triage_items', params).execute()
+        return result.data
+
+    except Exception as e:
+        raise Exception(f"Failed to search triage items: {e}")
+
+
+def search_insights(
+    client: Client,
+    query: str,
+    status: Optional[str] = None,
+    limit: int = 20
+) -> List[dict]:
+    """
+    Full-text search over insights, ranked by relevance.
+
+    Args:
+        client: Supabase client
+        query: Search text (web search syntax)
+        status: Optional status filter (e.g., 'Draft')
+        limit: Max number of results
+
+    Returns:
+        List of insights as dicts, best match first, each with a 'rank' score
+    """
+    if not query or not query.strip():
+        return []
+
+    params = {'search_query': query, 'filter_status': status, 'match_limit': limit}
+
+    try:
+        result = client.schema('raw').rpc('search_insights', params).execute()
+        return result.data
+
+    except Exception as e:
+        raise Exception(f"Failed to search insights: {e}")
+
+
 def get_processing_stats(client: Client) -> dict:
     """
     Get statistics about processed files and items.
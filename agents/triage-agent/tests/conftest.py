@@ -0,0 +1,7 @@
+"""
+Test configuration: make the notes_agent package importable like the utils scripts do.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
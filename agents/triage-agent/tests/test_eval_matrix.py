@@ -0,0 +1,61 @@
+"""
+Tests for eval matrix resume (LLM calls mocked).
+"""
+from unittest.mock import Mock, patch
+
+import pytest
+from notes_agent.eval_matrix import run_eval_matrix
+
+
+@pytest.fixture
+def llm():
+    """Triage and judge stand-ins; returns the triage mock to count cell runs"""
+    evaluation = Mock(overall_score=4.0)
+    evaluation.model_dump.return_value = {}
+    with patch("notes_agent.eval_matrix.triage_braindump", return_value=[]) as triage, \
+            patch("notes_agent.eval_matrix.evaluate_triage_output", return_value=evaluation):
+        yield triage
+
+
+def test_resume_reuses_matching_cells(tmp_path, llm):
+    """Test a rerun with the same prompts and models runs nothing"""
+    results = tmp_path / "results.jsonl"
+    prompts = {"v1": "prompt one", "v2": "prompt two"}
+    notes = {"a.md": "note a", "b.md": "note b"}
+
+    first = run_eval_matrix(prompts, notes, results)
+    second = run_eval_matrix(prompts, notes, results)
+
+    assert llm.call_count == 4
+    assert [c.model_dump() for c in second] == [c.model_dump() for c in first]
+
+
+def test_resume_reruns_edited_prompt(tmp_path, llm):
+    """Test editing a prompt file's text reruns only that prompt's cells"""
+    results = tmp_path / "results.jsonl"
+    notes = {"a.md": "note a", "b.md": "note b"}
+
+    run_eval_matrix({"v1": "prompt one", "v2": "prompt two"}, notes, results)
+    cells = run_eval_matrix({"v1": "prompt one, edited", "v2": "prompt two"}, notes, results)
+
+    assert llm.call_count == 6
+    assert len(cells) == 4
+
+
+@pytest.mark.parametrize("change", [
+    {"triage_model": "google/gemini-2.0-flash-001"},
+    {"judge_model": "gpt-4o-mini"},
+    {"sample_size": 5},
+])
+def test_resume_reruns_changed_models(tmp_path, llm, change):
+    """Test a different triage model, judge model or sample size doesn't reuse old scores"""
+    results = tmp_path / "results.jsonl"
+    prompts = {"v1": "prompt one"}
+    notes = {"a.md": "note a"}
+
+    run_eval_matrix(prompts, notes, results)
+    cells = run_eval_matrix(prompts, notes, results, **change)
+
+    assert llm.call_count == 2
+    for field, value in change.items():
+        assert getattr(cells[0], field) == value
@@ -0,0 +1,50 @@
+"""
+Tests for Layer 1 triage preflight sizing (LLM calls mocked).
+"""
+import json
+from unittest.mock import patch
+
+import pytest
+from notes_agent.layer1_triage import MAX_OUTPUT_TOKENS, triage_braindump
+
+RESPONSE = json.dumps({"items": [{
+    "Triage ID": "T001",
+    "Raw Text": "Call the bank about the card",
+    "Type": "Task",
+    "Domain": "Finance",
+    "Niche Signal": "No",
+    "Publishable": "N/A"
+}]})
+
+
+@pytest.mark.parametrize("model", [
+    "google/gemini-2.0-flash-001",
+    "meta-llama/llama-3.1-70b-instruct",
+    "mistralai/mistral-large",
+    "qwen/qwen-2.5-72b-instruct",
+])
+def test_triage_unknown_model(model):
+    """Test models outside the token table triage instead of failing the preflight"""
+    with patch("notes_agent.layer1_triage.call_openrouter", return_value=RESPONSE) as call, \
+            pytest.warns(UserWarning, match="Unknown context window"):
+        items = triage_braindump("Call the bank about the card", date="2026-01-05", model=model)
+
+    assert [item.id for item in items] == ["T001"]
+    assert call.call_args.kwargs["max_tokens"] == MAX_OUTPUT_TOKENS
+
+
+def test_triage_small_window_shrinks_output():
+    """Test a known 8k-window model gets the output room left after the prompt"""
+    with patch("notes_agent.layer1_triage.call_openrouter", return_value=RESPONSE) as call:
+        triage_braindump("Call the bank about the card", date="2026-01-05", model="openai/gpt-4")
+
+    assert 2000 <= call.call_args.kwargs["max_tokens"] < MAX_OUTPUT_TOKENS
+
+
+def test_triage_prompt_too_large():
+    """Test a prompt that leaves no room for output is refused before the call"""
+    with patch("notes_agent.layer1_triage.call_openrouter", return_value=RESPONSE) as call, \
+            pytest.raises(ValueError, match="Prompt too large"):
+        triage_braindump("word " * 30_000, date="2026-01-05", model="openai/gpt-4")
+
+    call.assert_not_called()
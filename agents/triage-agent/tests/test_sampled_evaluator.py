@@ -0,0 +1,61 @@
+"""
+Tests for the stratified estimate behind sampled judging.
+"""
+import warnings
+
+import pytest
+from notes_agent.sampled_evaluator import stratified_estimate
+from notes_agent.schemas import TriageItem
+
+
+def make_items(prefix, count):
+    return [
+        TriageItem(id=f"{prefix}{i}", date="2026-01-05", raw_context="text", personal_or_work="Personal",
+                   domain="Health", type="Observation", tags="health", niche_signal=False, publishable=False)
+        for i in range(count)
+    ]
+
+
+def test_one_item_per_stratum_has_no_interval():
+    """Test a partial sample with one judged item per stratum reports no interval, not a zero-width one"""
+    strata = {"a": make_items("a", 10), "b": make_items("b", 10)}
+    scores = {"a": [4.0], "b": [2.0]}
+
+    estimate, low, high = stratified_estimate(strata, scores)
+
+    assert estimate == 3.0
+    assert low is None and high is None
+
+
+def test_fully_judged_is_exact():
+    """Test judging every item gives a zero-width interval"""
+    strata = {"a": make_items("a", 2), "b": make_items("b", 1)}
+    scores = {"a": [4.0, 5.0], "b": [2.0]}
+
+    estimate, low, high = stratified_estimate(strata, scores)
+
+    assert low == high == estimate == pytest.approx(11 / 3)
+
+
+def test_partial_sample_interval():
+    """Test a partial sample gets an interval around the estimate"""
+    strata = {"a": make_items("a", 20), "b": make_items("b", 20)}
+    scores = {"a": [4.0, 3.0, 5.0], "b": [2.0]}
+
+    estimate, low, high = stratified_estimate(strata, scores)
+
+    assert low < estimate < high
+
+
+def test_unsampled_strata_warn():
+    """Test strata left without judged items are flagged rather than silently dropped"""
+    strata = {"a": make_items("a", 4), "b": make_items("b", 4), "c": make_items("c", 2)}
+    scores = {"a": [4.0, 4.0, 4.0, 4.0], "b": [3.0, 3.0, 3.0, 3.0]}
+
+    with pytest.warns(UserWarning, match="1 strata \\(2 items\\).*: c"):
+        estimate, _, _ = stratified_estimate(strata, scores)
+    assert estimate == 3.5
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        stratified_estimate({"a": strata["a"]}, {"a": scores["a"]})
@@ -0,0 +1,35 @@
+"""
+Tests for evaluation statistics helpers.
+"""
+import pytest
+from notes_agent.stats import mean_confidence_interval, t_critical
+
+
+@pytest.mark.parametrize("confidence, df, expected", [
+    (0.95, 1, 12.7062),
+    (0.95, 2, 4.3027),
+    (0.95, 3, 3.1824),
+    (0.99, 3, 5.8409),
+    (0.90, 5, 2.0150),
+    (0.95, 10, 2.2281),
+    (0.99, 30, 2.7500),
+    (0.95, 100, 1.9840),
+    (0.95, 120, 1.9799),
+    (0.99, 1000, 2.5808),
+])
+def test_t_critical_matches_tables(confidence, df, expected):
+    """Test critical values against published t tables (4 decimals)"""
+    assert t_critical(confidence, df) == pytest.approx(expected, abs=1e-4)
+
+
+def test_t_critical_no_df():
+    """Test df 0 gives an infinite critical value"""
+    assert t_critical(0.95, 0) == float('inf')
+
+
+def test_mean_confidence_interval():
+    """Test a small sample's interval uses the exact t value"""
+    mean, low, high = mean_confidence_interval([3.0, 4.0, 5.0, 4.0], confidence=0.99)
+
+    assert mean == 4.0
+    assert high - mean == pytest.approx(5.8409 * (2 / 3) ** 0.5 / 2, abs=1e-3)
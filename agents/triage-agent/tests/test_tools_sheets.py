@@ -0,0 +1,84 @@
+"""
+Tests for SheetsWriter's worksheet metadata cache.
+"""
+import pytest
+
+from notes_agent.tools_sheets import SheetsWriter
+
+
+class FakeSpreadsheet:
+    def __init__(self, fail_times=0):
+        self.fail_times = fail_times
+        self.batches = []
+
+    def fetch_sheet_metadata(self):
+        return {'sheets': [{'properties': {
+            'sheetId': 0, 'title': 'Sheet1',
+            'gridProperties': {'rowCount': 10, 'columnCount': 5}
+        }}]}
+
+    def batch_update(self, body):
+        self.batches.append(body['requests'])
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("batch rejected")
+        return {}
+
+
+class FakeClient:
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+
+    def open_by_key(self, key):
+        return self.spreadsheet
+
+
+def _writer(spreadsheet):
+    return SheetsWriter(client=FakeClient(spreadsheet))
+
+
+def _kinds(requests):
+    return [next(iter(r)) for r in requests]
+
+
+def test_failed_add_sheet_not_cached():
+    spreadsheet = FakeSpreadsheet(fail_times=1)
+    writer = _writer(spreadsheet)
+
+    with pytest.raises(RuntimeError):
+        writer.write_rows('sid', 'Items', [['a', 'b']])
+    assert writer.worksheet_properties('sid', 'Items') is None
+
+    writer.write_rows('sid', 'Items', [['a', 'b']])
+    assert _kinds(spreadsheet.batches[1])[0] == 'addSheet'
+    assert writer.worksheet_properties('sid', 'Items')['title'] == 'Items'
+
+
+def test_failed_resize_keeps_old_grid():
+    spreadsheet = FakeSpreadsheet(fail_times=1)
+    writer = _writer(spreadsheet)
+    rows = [['x']] * 50
+
+    with pytest.raises(RuntimeError):
+        writer.write_rows('sid', 'Sheet1', rows)
+    assert writer.worksheet_properties('sid', 'Sheet1')['gridProperties']['rowCount'] == 10
+
+    writer.write_rows('sid', 'Sheet1', rows)
+    assert _kinds(spreadsheet.batches[1])[0] == 'updateSheetProperties'
+    assert writer.worksheet_properties('sid', 'Sheet1')['gridProperties']['rowCount'] == 50
+
+    # Grid is now large enough: no further resize
+    writer.write_rows('sid', 'Sheet1', rows)
+    assert 'updateSheetProperties' not in _kinds(spreadsheet.batches[2])
+
+
+def test_first_worksheet_title_matches_sheet1():
+    spreadsheet = FakeSpreadsheet()
+    spreadsheet.fetch_sheet_metadata = lambda: {'sheets': [
+        {'properties': {'sheetId': 7, 'title': 'Tabelle1', 'index': 0}},
+        {'properties': {'sheetId': 8, 'title': 'Sheet1', 'index': 1}},
+    ]}
+    writer = _writer(spreadsheet)
+
+    writer.write_rows('sid', 'Extra', [['a']])
+    assert writer.first_worksheet_title('sid') == 'Tabelle1'
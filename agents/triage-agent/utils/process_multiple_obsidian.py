@@ -1,11 +1,17 @@
 """
 Process multiple Obsidian files and consolidate results in Google Sheets.
 Accumulates all triage items and insights across files.
+
+Usage:
+    python utils/process_multiple_obsidian.py          # Clear and rewrite both sheets
+    python utils/process_multiple_obsidian.py --sync   # Only write new/changed/deleted rows
 """
 import sys
 import json
+import argparse
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
 import os
 from dotenv import load_dotenv
 
@@ -13,6 +19,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 from notes_agent.layer1_triage import triage_braindump
 from notes_agent.llm_clients import call_openrouter, parse_json_response
+from notes_agent.tools_sheets import get_sheets_writer
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 
@@ -22,6 +29,9 @@ load_dotenv()
 TRIAGE_SHEET_ID = "1rPG6lOnKNKUPhyzjJYwBI-AgpIUWcmhSAd6TOLZNOIw"
 INSIGHT_SHEET_ID = "1Y_CSqhjYUcd09LKqKzyqvzisr9g_DIuW52mxyhOxLc8"
 
+TRIAGE_HEADERS = ["ID", "Source File", "Date", "Personal/Work", "Domain", "Type", "Tags", "Niche Signal", "Publishable", "Raw Context"]
+INSIGHT_HEADERS = ["Insight ID", "Linked Triage IDs", "Insight Text", "Tags", "Publishable Angle", "Status"]
+
 
 def load_layer2_prompt() -> str:
     """Load Layer 2 insight generation prompt."""
@@ -29,11 +39,6 @@ def load_layer2_prompt() -> str:
     return prompt_path.read_text(encoding="utf-8")
 
 
-def count_tokens(text: str) -> int:
-    """Rough token count (4 chars ≈ 1 token)."""
-    return len(text) // 4
-
-
 def run_layer1(input_text: str, date: str, starting_id: int, source_file: str):
     """Run Layer 1 triage."""
     print(f"\n{'─'*80}")
@@ -123,6 +128,40 @@ Generate insights following the rules in the system prompt. Return the JSON obje
         return [], insight_counter
 
 
+def build_triage_rows(all_triage_items) -> list:
+    """Convert (item, source_file) tuples to sheet rows."""
+    rows = []
+    for item, source in all_triage_items:
+        rows.append([
+            item.id,
+            source,
+            item.date,
+            item.personal_or_work,
+            item.domain,
+            item.type,
+            item.tags,
+            "TRUE" if item.niche_signal else "FALSE",
+            "TRUE" if item.publishable else "FALSE",
+            item.raw_context
+        ])
+    return rows
+
+
+def build_insight_rows(all_insights) -> list:
+    """Convert insight dicts to sheet rows."""
+    rows = []
+    for ins in all_insights:
+        rows.append([
+            ins.get("insight_id", ""),
+            ins.get("linked_triage_ids", ""),
+            ins.get("insight", ""),
+            ins.get("tags", ""),
+            ins.get("publishable_angle", ""),
+            ins.get("status", "Draft")
+        ])
+    return rows
+
+
 def write_to_sheets(all_triage_items, all_insights):
     """Write all accumulated data to Google Sheets."""
     # Auth
@@ -142,23 +181,10 @@ def write_to_sheets(all_triage_items, all_insights):
         [f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"],
         [f"Total Items: {len(all_triage_items)}"],
         [""],
-        ["ID", "Source File", "Date", "Personal/Work", "Domain", "Type", "Tags", "Niche Signal", "Publishable", "Raw Context"]
+        TRIAGE_HEADERS
     ]
 
-    rows = []
-    for item, source in all_triage_items:
-        rows.append([
-            item.id,
-            source,
-            item.date,
-            item.personal_or_work,
-            item.domain,
-            item.type,
-            item.tags,
-            "TRUE" if item.niche_signal else "FALSE",
-            "TRUE" if item.publishable else "FALSE",
-            item.raw_context
-        ])
+    rows = build_triage_rows(all_triage_items)
 
     triage_sheet.update(range_name='A1', values=metadata + rows)
     print(f"✓ Triage: https://docs.google.com/spreadsheets/d/{TRIAGE_SHEET_ID}")
@@ -173,25 +199,63 @@ def write_to_sheets(all_triage_items, all_insights):
         [f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"],
         [f"Total Insights: {len(all_insights)}"],
         [""],
-        ["Insight ID", "Linked Triage IDs", "Insight Text", "Tags", "Publishable Angle", "Status"]
+        INSIGHT_HEADERS
     ]
 
-    rows = []
-    for ins in all_insights:
-        rows.append([
-            ins.get("insight_id", ""),
-            ins.get("linked_triage_ids", ""),
-            ins.get("insight", ""),
-            ins.get("tags", ""),
-            ins.get("publishable_angle", ""),
-            ins.get("status", "Draft")
-        ])
+    rows = build_insight_rows(all_insights)
 
     insight_sheet.update(range_name='A1', values=metadata + rows)
     print(f"✓ Insights: https://docs.google.com/spreadsheets/d/{INSIGHT_SHEET_ID}")
 
 
+def sync_to_sheets(all_triage_items, all_insights, worksheet_name: Optional[str] = None):
+    """
+    Incrementally sync accumulated data to Google Sheets, keyed by triage/insight ID.
+
+    Reads each sheet once and only writes inserted, changed and deleted rows,
+    so cost scales with what changed rather than with total history.
+    Defaults to each spreadsheet's first tab, the same one write_to_sheets uses.
+    """
+    writer = get_sheets_writer()
+    generated = f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+
+    targets = [
+        ("triage items", TRIAGE_SHEET_ID, "TRIAGE ITEMS - Multiple Files", "Total Items",
+         TRIAGE_HEADERS, build_triage_rows(all_triage_items)),
+        ("insights", INSIGHT_SHEET_ID, "INSIGHTS - Multiple Files", "Total Insights",
+         INSIGHT_HEADERS, build_insight_rows(all_insights)),
+    ]
+
+    for label, sheet_id, title, total_label, headers, rows in targets:
+        print(f"\n📊 Syncing {len(rows)} {label} to sheet...")
+        metadata = [
+            [title],
+            [generated],
+            [f"{total_label}: {len(rows)}"],
+            [""]
+        ]
+
+        result = writer.sync_rows(
+            sheet_id,
+            worksheet_name or writer.first_worksheet_title(sheet_id),
+            header=headers,
+            rows=rows,
+            key_column=0,
+            metadata_rows=metadata
+        )
+
+        mode = "full rewrite" if result['full_rewrite'] else "incremental"
+        print(f"  {mode}: +{result['inserted']} ~{result['updated']} -{result['deleted']} "
+              f"(unchanged: {result['unchanged']}, API calls: {result['api_calls']})")
+        print(f"✓ {label.title()}: https://docs.google.com/spreadsheets/d/{sheet_id}")
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Process multiple Obsidian files into Google Sheets")
+    parser.add_argument('--sync', action='store_true',
+                        help='Incremental sync: only write new/changed/deleted rows instead of clearing the sheets')
+    args = parser.parse_args()
+
     # Obsidian files to process
     obsidian_path = Path("/Users/snehamehrin/Desktop/obsidian_vaults/obsidian/Personal Context/journal_notes")
     files = [
@@ -236,7 +300,10 @@ def main():
         triage_id_counter += len(items)
 
     # Write everything to sheets
-    write_to_sheets(all_triage_items, all_insights)
+    if args.sync:
+        sync_to_sheets(all_triage_items, all_insights)
+    else:
+        write_to_sheets(all_triage_items, all_insights)
 
     # Summary
     print(f"\n{'='*80}")
@@ -0,0 +1,107 @@
+"""
+Compare K prompt versions over M notes in one concurrent run.
+
+Every (prompt, note) cell is triaged and judged in a bounded thread pool.
+Results are appended to a JSONL file as they finish, so re-running the same
+command resumes from where it stopped.
+
+Usage:
+    python utils/run_eval_matrix.py \
+        --prompts prompts/layer1_triage_system.txt prompts/versions/triage_v2.txt \
+        --inputs tests/inputs/sample_*.txt \
+        --workers 6
+"""
+import sys
+import argparse
+import json
+from pathlib import Path
+from datetime import datetime
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from notes_agent.eval_matrix import run_eval_matrix, aggregate_by_prompt
+from notes_agent.eval_cache import EvaluationCache, DEFAULT_CACHE_PATH, hash_text
+from notes_agent.evaluator import load_evaluator_prompt
+
+load_dotenv()
+
+DEFAULT_RESULTS = Path(__file__).parent.parent / "tests" / "outputs" / "eval_matrix.jsonl"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent prompt x note evaluation matrix")
+    parser.add_argument('--prompts', nargs='+', required=True, help='Prompt files (label = file stem)')
+    parser.add_argument('--inputs', nargs='+', required=True, help='Note files to triage')
+    parser.add_argument('--results', default=str(DEFAULT_RESULTS), help='JSONL results file (resumed if present)')
+    parser.add_argument('--workers', type=int, default=4, help='Max concurrent cells (default: 4)')
+    parser.add_argument('--judge-model', default='gpt-4o', help='Evaluator model (default: gpt-4o)')
+    parser.add_argument('--triage-model', default='openai/gpt-4o-mini', help='Triage model')
+    parser.add_argument('--no-retry-failed', action='store_true', help='Do not re-run cells that errored before')
+    parser.add_argument('--no-cache', action='store_true', help='Always call the judge (skip the judge cache)')
+    parser.add_argument('--sample-size', type=int, help='Judge a stratified sample of at most N items per note')
+    parser.add_argument('--cache-path', default=str(DEFAULT_CACHE_PATH), help='Judge cache SQLite file')
+    args = parser.parse_args()
+
+    prompts = {Path(p).stem: Path(p).read_text(encoding='utf-8') for p in args.prompts}
+    notes = {}
+    for path in map(Path, args.inputs):
+        if not path.exists():
+            print(f"⏭️  Skipping {path} (not found)")
+            continue
+        notes[path.name] = path.read_text(encoding='utf-8').strip()
+
+    if not prompts or not notes:
+        print("❌ Need at least one prompt and one input file")
+        return
+
+    print(f"\n{'='*80}")
+    print("EVALUATION MATRIX")
+    print(f"{'='*80}\n")
+
+    cache = None
+    if not args.no_cache:
+        cache = EvaluationCache(Path(args.cache_path))
+        # Scores from an older evaluator prompt or judge model can never be hit again
+        pruned = cache.prune(hash_text(load_evaluator_prompt()), keep_model=args.judge_model)
+        if pruned:
+            print(f"🧹 Pruned {pruned} stale judge cache entries\n")
+
+    results_path = Path(args.results)
+    cells = run_eval_matrix(
+        prompts=prompts,
+        notes=notes,
+        results_path=results_path,
+        max_workers=args.workers,
+        date=datetime.now().strftime("%Y-%m-%d"),
+        triage_model=args.triage_model,
+        judge_model=args.judge_model,
+        retry_failed=not args.no_retry_failed,
+        cache=cache,
+        sample_size=args.sample_size
+    )
+
+    aggregates = aggregate_by_prompt(cells)
+
+    print(f"\n{'='*80}")
+    print("RESULTS (mean overall score, 95% CI)")
+    print(f"{'='*80}\n")
+    for agg in aggregates:
+        print(f"  {agg.prompt_version:30} {agg.mean_score:.2f}  [{agg.ci_low:.2f}, {agg.ci_high:.2f}]  "
+              f"notes: {agg.notes_scored} (failed: {agg.notes_failed})  avg items: {agg.mean_items:.1f}")
+
+    if aggregates:
+        print(f"\n🏆 Best: {aggregates[0].prompt_version}")
+
+    if cache is not None:
+        print(f"\n{cache.report()}")
+
+    summary_path = results_path.with_suffix('.summary.json')
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump([agg.model_dump() for agg in aggregates], f, indent=2)
+    print(f"\n💾 Results: {results_path}")
+    print(f"💾 Summary: {summary_path}\n")
+
+
+if __name__ == '__main__':
+    main()
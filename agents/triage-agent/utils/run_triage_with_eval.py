@@ -24,7 +24,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 from notes_agent.layer1_triage import triage_braindump
 from notes_agent.tools_sheets import write_triage_items_to_sheet, write_evaluation_to_sheet
-from notes_agent.evaluator import evaluate_triage_output, count_tokens
+from notes_agent.evaluator import evaluate_triage_output
+from agent_utils.tokens import count_tokens
 
 load_dotenv()
 
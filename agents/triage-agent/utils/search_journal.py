@@ -0,0 +1,56 @@
+"""
+Search triage items and insights in Supabase (full-text, ranked).
+
+Usage:
+    python utils/search_journal.py "burnout" --type Observation --limit 10
+    python utils/search_journal.py "pricing -discount" --insights
+"""
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from notes_agent.tools_supabase import get_supabase_client, search_triage, search_insights
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search over the journal")
+    parser.add_argument('query', help='Search text (supports "phrases" and -exclusions)')
+    parser.add_argument('--insights', action='store_true', help='Search insights instead of triage items')
+    parser.add_argument('--type', help='Filter triage items by type')
+    parser.add_argument('--domain', help='Filter triage items by domain')
+    parser.add_argument('--date-from', help='Only items on/after this date (YYYY-MM-DD)')
+    parser.add_argument('--date-to', help='Only items on/before this date (YYYY-MM-DD)')
+    parser.add_argument('--limit', type=int, default=20, help='Max results (default: 20)')
+    args = parser.parse_args()
+
+    client = get_supabase_client()
+
+    print(f"\n{'='*80}")
+    print(f"SEARCH: {args.query}")
+    print(f"{'='*80}\n")
+
+    if args.insights:
+        results = search_insights(client, args.query, limit=args.limit)
+        for row in results:
+            print(f"  {row['insight_id']:6} | {row['rank']:.3f} | {row['insight'][:100]}")
+    else:
+        filters = {
+            key: value for key, value in {
+                'type': args.type,
+                'domain': args.domain,
+                'date_from': args.date_from,
+                'date_to': args.date_to,
+            }.items() if value
+        }
+        results = search_triage(client, args.query, filters=filters, limit=args.limit)
+        for row in results:
+            print(f"  {row['id']:6} | {row['rank']:.3f} | {row['type']:15} | {row['raw_context'][:80]}")
+
+    print(f"\n{len(results)} result(s)")
+    print("="*80 + "\n")
+
+
+if __name__ == '__main__':
+    main()
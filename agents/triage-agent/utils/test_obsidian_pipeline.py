@@ -16,6 +16,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 from notes_agent.layer1_triage import triage_braindump
 from notes_agent.llm_clients import call_openrouter, parse_json_response
+from agent_utils.tokens import count_tokens
 from notes_agent.tools_sheets import write_triage_items_to_sheet
 
 load_dotenv()
@@ -37,11 +38,6 @@ def load_layer2_prompt() -> str:
     return prompt_path.read_text(encoding="utf-8")
 
 
-def count_tokens(text: str) -> int:
-    """Rough token count (4 chars ≈ 1 token)."""
-    return len(text) // 4
-
-
 def run_layer1(input_text: str, date: str) -> tuple:
     """
     Run Layer 1 triage.
@@ -0,0 +1,89 @@
+"""Benchmark bulk cost computation against the per-call loop.
+
+Prices synthetic columnar usage (mixed providers, aliases and an unpriced
+model) with calculate_costs_bulk, and a sample with calculate_cost in a
+loop for comparison.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_costs.py --rows 2000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from agent_utils import calculate_cost, calculate_costs_bulk
+
+CALLS = [
+    ("openai", "gpt-4o"), ("openrouter", "openai/gpt-4o-mini"), ("anthropic", "claude-3-5-sonnet-20241022"),
+    ("openrouter", "anthropic/claude-3.5-sonnet"), ("anthropic", "claude-sonnet-4-20250514"),
+    ("deepseek", "deepseek-chat"), ("perplexity", "sonar-pro"), ("openai", "unpriced-model"),
+]
+DAYS = [f"2025-01-{day:02d}" for day in range(1, 32)]
+
+
+def synthetic_columns(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(CALLS), n)
+    return {
+        "provider": [CALLS[i][0] for i in picks],
+        "model": [CALLS[i][1] for i in picks],
+        "prompt_tokens": rng.integers(200, 8000, n),
+        "completion_tokens": rng.integers(50, 3000, n),
+        "day": [DAYS[i] for i in rng.integers(0, len(DAYS), n)],
+    }
+
+
+def timed(label: str, fn, rows: int):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:44} {elapsed * 1000:9.1f} ms  ({rows / elapsed:,.0f} rows/s)")
+    return result, elapsed
+
+
+def loop_costs(columns: dict, n: int) -> float:
+    total = 0.0
+    for i in range(n):
+        try:
+            total += calculate_cost(columns["provider"][i], columns["model"][i], {
+                "prompt_tokens": int(columns["prompt_tokens"][i]),
+                "completion_tokens": int(columns["completion_tokens"][i]),
+                "total_tokens": 0,
+            })["total_cost"]
+        except ValueError:
+            pass
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk cost computation")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Records to price (default: 2,000,000)")
+    parser.add_argument("--loop-rows", type=int, default=100_000, help="Records for the loop baseline (default: 100,000)")
+    args = parser.parse_args()
+
+    columns = synthetic_columns(args.rows)
+    cols = (columns["provider"], columns["model"], columns["prompt_tokens"], columns["completion_tokens"])
+    print(f"\n{args.rows:,} records, {len(CALLS)} provider/model names\n")
+
+    costs, _ = timed("calculate_costs_bulk (by model)", lambda: calculate_costs_bulk(*cols), args.rows)
+    timed("calculate_costs_bulk (by day)", lambda: calculate_costs_bulk(*cols, group_by=columns["day"]), args.rows)
+    timed("calculate_costs_bulk (single model)", lambda: calculate_costs_bulk(
+        "openai", "gpt-4o", columns["prompt_tokens"], columns["completion_tokens"]), args.rows)
+
+    loop_n = min(args.loop_rows, args.rows)
+    loop_total, elapsed = timed(f"calculate_cost loop ({loop_n:,} records)", lambda: loop_costs(columns, loop_n), loop_n)
+    print(f"  {'  -> extrapolated to ' + format(args.rows, ',') + ' records':44} {elapsed * args.rows / loop_n * 1000:9.1f} ms")
+
+    sample = calculate_costs_bulk(*(c[:loop_n] for c in cols))
+    assert abs(sample["total"] - loop_total) < 1e-6 * max(1.0, loop_total), "bulk and loop totals differ"
+
+    print(f"\n  {'group':42} {'calls':>9} {'cost $':>12} {'unpriced':>9}")
+    for name, row in sorted(costs["totals"].items(), key=lambda kv: -kv[1]["cost"]):
+        print(f"  {name:42} {row['calls']:>9,} {row['cost']:>12,.2f} {row['unpriced_calls']:>9,}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark cost ledger inserts and aggregate queries.
+
+Fills a ledger with synthetic calls across agents, stages, models and days,
+then times the dashboard queries, which read the rollup tables.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_ledger.py --rows 1000000
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from agent_utils.ledger import CostLedger
+
+AGENTS = ["triage-agent", "reddit-sentiment", "eval-matrix", "prospect-research"]
+STAGES = ["layer1", "layer2", "judge", "analysis"]
+MODELS = [
+    ("openai", "gpt-4o"), ("openai", "gpt-4o-mini"), ("anthropic", "claude-3-5-sonnet-20241022"),
+    ("deepseek", "deepseek-chat"), ("openai", "unpriced-model"),
+]
+DAY = 86400
+
+
+def synthetic_calls(n: int, days: int, seed: int = 0):
+    rng = random.Random(seed)
+    start = time.time() - days * DAY
+    for _ in range(n):
+        provider, model = rng.choice(MODELS)
+        yield {
+            "agent": rng.choice(AGENTS),
+            "stage": rng.choice(STAGES),
+            "provider": provider,
+            "model": model,
+            "prompt_tokens": rng.randint(200, 8000),
+            "completion_tokens": rng.randint(50, 3000),
+            "latency_ms": rng.lognormvariate(7.5, 0.6),
+            "ts": start + rng.random() * days * DAY,
+        }
+
+
+def timed(label: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"  {label:40} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the cost ledger")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Calls to insert (default: 1,000,000)")
+    parser.add_argument("--days", type=int, default=90, help="Days the calls span (default: 90)")
+    parser.add_argument("--path", help="Ledger file (default: temporary)")
+    args = parser.parse_args()
+
+    path = Path(args.path) if args.path else Path(tempfile.mkdtemp()) / "bench_ledger.sqlite"
+    ledger = CostLedger(path)
+
+    print(f"\nLedger: {path}\n")
+    start = time.perf_counter()
+    ledger.record_many(synthetic_calls(args.rows, args.days))
+    elapsed = time.perf_counter() - start
+    print(f"  {'insert ' + format(args.rows, ',') + ' calls':40} {elapsed * 1000:9.1f} ms  "
+          f"({args.rows / elapsed:,.0f} calls/s)\n")
+
+    timed("total_cost()", ledger.total_cost)
+    timed("spend(by='day')", lambda: ledger.spend(by="day"))
+    timed("spend(by=['agent', 'model'])", lambda: ledger.spend(by=["agent", "model"]))
+    timed("spend(by='stage', agent=..., since=...)", lambda: ledger.spend(
+        by="stage", agent="triage-agent", since="2000-01-01"))
+    timed("latency_percentiles(by='model')", lambda: ledger.latency_percentiles(by="model"))
+    timed("latency_percentiles(by=['day', 'agent'])", lambda: ledger.latency_percentiles(by=["day", "agent"]))
+    print()
+
+
+if __name__ == "__main__":
+    main()
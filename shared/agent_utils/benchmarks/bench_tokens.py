@@ -0,0 +1,76 @@
+"""Benchmark token counting modes.
+
+Compares the old per-call pattern (import tiktoken + look up the encoding on
+every call) with memoized exact counting, batched exact counting and approx
+mode, and reports approx-mode error against the exact counts.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_tokens.py --texts 2000
+"""
+
+import argparse
+import random
+import time
+import warnings
+
+from agent_utils.tokens import FAMILIES, count_tokens, count_tokens_many, get_encoder, model_family
+
+WORDS = (
+    "triage insight product customer churn onboarding pricing retention the a of to and "
+    "is in that it for on with as was {\"type\": \"Idea\", \"domain\": \"Work\"} 2024-11-05"
+).split()
+
+
+def make_texts(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(20, 400))) for _ in range(n)]
+
+
+def timed(label: str, fn, n: int):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:32} {elapsed * 1000:9.1f} ms  ({elapsed / n * 1e6:8.1f} µs/text)")
+    return result
+
+
+def per_call_lookup(texts, model):
+    """The pattern tokens.py replaces: resolve the encoding on every call."""
+    counts = []
+    for text in texts:
+        import tiktoken
+        counts.append(len(tiktoken.encoding_for_model(model).encode(text)))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark token counting")
+    parser.add_argument("--texts", type=int, default=2000, help="Number of texts (default: 2000)")
+    parser.add_argument("--model", default="gpt-4o", help="Model (default: gpt-4o)")
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts)
+    n = len(texts)
+    print(f"\n{n} texts, {sum(map(len, texts)):,} chars, model {args.model}\n")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        encoder = get_encoder(FAMILIES[model_family(args.model)]["encoding"])
+
+    approx = timed("approx (count_tokens_many)", lambda: count_tokens_many(texts, args.model, mode="approx"), n)
+
+    if encoder is None:
+        print("\n  tiktoken encoding unavailable - exact modes skipped")
+        return
+
+    timed("exact, per-call lookup", lambda: per_call_lookup(texts, args.model), n)
+    timed("exact, memoized count_tokens", lambda: [count_tokens(t, args.model) for t in texts], n)
+    exact = timed("exact, count_tokens_many", lambda: count_tokens_many(texts, args.model), n)
+
+    errors = [abs(a - e) / e for a, e in zip(approx, exact) if e]
+    print(f"\n  approx error: mean {sum(errors) / len(errors) * 100:.1f}%, max {max(errors) * 100:.1f}%")
+    print(f"  approx total: {sum(approx):,} vs exact {sum(exact):,}\n")
+
+
+if __name__ == "__main__":
+    main()
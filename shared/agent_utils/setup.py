@@ -9,12 +9,19 @@ setup(
     author="AI Product Intelligence Team",
     package_dir={"": "src"},
     packages=find_packages(where="src"),
+    package_data={"agent_utils": ["data/*.json"]},
     python_requires=">=3.8",
     install_requires=[
         "pydantic>=2.0.0",
         "python-dotenv>=1.0.0",
     ],
     extras_require={
+        "tiktoken": [
+            "tiktoken>=0.7.0",
+        ],
+        "numpy": [
+            "numpy>=1.24.0",
+        ],
         "dev": [
             "pytest>=7.0.0",
             "pytest-cov>=4.0.0",
@@ -5,6 +5,10 @@ Shared utilities for building AI agents faster and better.
 
 __version__ = "0.1.0"
 
-from .token_calculator import calculate_cost, get_pricing
+from .token_calculator import calculate_cost, calculate_costs_bulk, get_pricing
+from .tokens import count_tokens, count_tokens_many, preflight
+from .ledger import CostLedger
+from .budget import BudgetExceeded, BudgetGuard
 
-__all__ = ["calculate_cost", "get_pricing"]
+__all__ = ["calculate_cost", "calculate_costs_bulk", "get_pricing", "count_tokens", "count_tokens_many", "preflight",
+           "CostLedger", "BudgetGuard", "BudgetExceeded"]
@@ -0,0 +1,304 @@
+"""Pre-call budget enforcement.
+
+A BudgetGuard estimates each call's worst-case cost (prompt tokens plus the
+max_tokens requested, at PRICING rates) before it is made, and compares it
+with what is left of the per-run and per-day ceilings. When a call doesn't
+fit, the guard degrades instead of overspending. It first tries a cheaper
+model, then a smaller batch, and finally halts by raising BudgetExceeded
+with a report.
+
+Example:
+    >>> guard = BudgetGuard(run_limit=2.00, daily_limit=10.00, agent="triage-agent")
+    >>> decision = guard.check("openai", "gpt-4o", system_prompt, user_prompt, max_output_tokens=8000)
+    >>> response = call_llm(model=decision["model"], ...)
+    >>> guard.commit(decision, tokens=usage)
+"""
+
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Literal, Optional, TypedDict
+
+from .ledger import CostLedger
+from .pricing import default_registry
+from .token_calculator import PRICING, get_pricing
+from .tokens import count_message_tokens, normalize_model
+
+
+BudgetAction = Literal["proceed", "downgrade", "shrink", "halt"]
+
+# Cheaper same-provider substitutes, tried in order until the call fits
+DEFAULT_FALLBACKS: Dict[str, str] = {
+    "gpt-4": "gpt-4o",
+    "gpt-4-turbo": "gpt-4o",
+    "gpt-4o": "gpt-4o-mini",
+    "claude-3-opus-20240229": "claude-3-5-sonnet-20241022",
+    "claude-sonnet-4-20250514": "claude-3-5-sonnet-20241022",
+    "claude-3-5-sonnet-20241022": "claude-3-haiku-20240307",
+    "claude-3-sonnet-20240229": "claude-3-haiku-20240307",
+}
+
+
+class BudgetDecision(TypedDict):
+    """What the guard allows for one call."""
+    action: BudgetAction
+    provider: str
+    model: str  # Model to call (a cheaper one if downgraded)
+    batch_size: Optional[int]  # Batch size to use (smaller if shrunk)
+    prompt_tokens: int  # Estimated prompt tokens (scaled down if shrunk)
+    max_output_tokens: int
+    estimated_cost: float  # Worst-case cost of the allowed call
+    remaining: float  # Budget left before the call
+    reason: str
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised when no degraded version of a call fits the remaining budget."""
+
+    def __init__(self, decision: BudgetDecision, report: str):
+        super().__init__(f"{decision['reason']}\n{report}")
+        self.decision = decision
+        self.report = report
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+def price_per_token(provider: str, model: str) -> Dict[str, float]:
+    """
+    Input/output USD per token for a model.
+
+    Aliases and provider-prefixed names ("openai/gpt-4o") are accepted. Models
+    missing from PRICING are priced at their provider's most expensive model, so
+    estimates for them err on the safe side.
+
+    Raises:
+        ValueError: If the provider is unknown
+    """
+    try:
+        pricing = get_pricing(provider, model)
+    except ValueError:
+        if "/" in model and model.split("/", 1)[0] in PRICING:
+            provider = model.split("/", 1)[0]
+        if provider not in PRICING:
+            raise
+        pricing = max(PRICING[provider].values(), key=lambda p: p["input"] + p["output"])
+
+    return {"input": pricing["input"] / 1_000_000, "output": pricing["output"] / 1_000_000}
+
+
+def estimate_cost(provider: str, model: str, prompt_tokens: int, max_output_tokens: int) -> float:
+    """Worst-case cost of a call (the full max_output_tokens is assumed)."""
+    price = price_per_token(provider, model)
+    return prompt_tokens * price["input"] + max_output_tokens * price["output"]
+
+
+class BudgetGuard:
+    """
+    Tracks spend against per-run and per-day ceilings and gates each call.
+
+    Args:
+        run_limit: Max USD for this run (None = unlimited)
+        daily_limit: Max USD per UTC day (None = unlimited). With a ledger,
+                     today's earlier spend counts too.
+        ledger: Optional CostLedger; committed calls are recorded to it
+        agent: Agent name for ledger records
+        fallbacks: Model -> cheaper model map (default: DEFAULT_FALLBACKS)
+    """
+
+    def __init__(
+        self,
+        run_limit: Optional[float] = None,
+        daily_limit: Optional[float] = None,
+        ledger: Optional[CostLedger] = None,
+        agent: str = "agent",
+        fallbacks: Optional[Dict[str, str]] = None
+    ):
+        self.run_limit = run_limit
+        self.daily_limit = daily_limit
+        self.ledger = ledger
+        self.agent = agent
+        self.fallbacks = DEFAULT_FALLBACKS if fallbacks is None else fallbacks
+
+        self._lock = threading.Lock()
+        self.run_spent = 0.0
+        self.day = _today()
+        self.day_spent_before = ledger.total_cost(since=self.day, until=self.day) if ledger else 0.0
+
+        self.calls = 0
+        self.estimated_total = 0.0
+        self.events: List[str] = []
+        self.counts: Dict[str, int] = {"proceed": 0, "downgrade": 0, "shrink": 0, "halt": 0}
+
+    def remaining(self) -> float:
+        """USD left under the tighter of the run and daily ceilings."""
+        with self._lock:
+            return self._remaining()
+
+    def _remaining(self) -> float:
+        if _today() != self.day:
+            # New UTC day - earlier days no longer count toward the daily limit
+            self.day, self.day_spent_before = _today(), 0.0
+        left = float("inf")
+        if self.run_limit is not None:
+            left = min(left, self.run_limit - self.run_spent)
+        if self.daily_limit is not None:
+            left = min(left, self.daily_limit - self.day_spent_before - self.run_spent)
+        return left
+
+    def _fallback_chain(self, provider: str, model: str) -> List[str]:
+        prefix = model.split("/", 1)[0] + "/" if "/" in model else ""
+        try:
+            current = default_registry().resolve(provider, model)[1]
+        except ValueError:
+            current = normalize_model(model)
+        chain = []
+        while current in self.fallbacks and len(chain) < 10:
+            current = self.fallbacks[current]
+            chain.append(prefix + current)
+        return chain
+
+    def check(
+        self,
+        provider: str,
+        model: str,
+        system_prompt: str = "",
+        user_prompt: str = "",
+        max_output_tokens: int = 4000,
+        prompt_tokens: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        min_batch_size: int = 1,
+        allow_downgrade: bool = True
+    ) -> BudgetDecision:
+        """
+        Decide whether (and how) the next call may run.
+
+        Tries, in order: the call as asked; cheaper fallback models; a smaller
+        batch (prompt tokens are assumed to scale with batch size). If nothing
+        fits, the run halts.
+
+        Args:
+            provider: Provider for pricing (openai, anthropic, deepseek)
+            model: Requested model (provider prefix allowed)
+            system_prompt: System prompt (for the token estimate)
+            user_prompt: User prompt (for the token estimate)
+            max_output_tokens: max_tokens that will be requested
+            prompt_tokens: Known prompt size; skips counting the prompts
+            batch_size: Units (items, posts...) in this call, if it can shrink
+            min_batch_size: Smallest useful batch
+            allow_downgrade: Set False where a cheaper model would skew results (evals)
+
+        Returns:
+            BudgetDecision with the model and batch size to use
+
+        Raises:
+            BudgetExceeded: If no degraded call fits the remaining budget
+        """
+        if prompt_tokens is None:
+            prompt_tokens = count_message_tokens(
+                [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
+                model,
+                mode="approx",
+            )
+
+        with self._lock:
+            remaining = self._remaining()
+
+            def decide(action: BudgetAction, use_model: str, use_batch: Optional[int], cost: float, reason: str,
+                       tokens: int = prompt_tokens):
+                self.counts[action] += 1
+                if action != "proceed":
+                    self.events.append(f"{action}: {reason}")
+                return BudgetDecision(
+                    action=action, provider=provider, model=use_model, batch_size=use_batch,
+                    prompt_tokens=tokens, max_output_tokens=max_output_tokens, estimated_cost=cost, remaining=remaining, reason=reason,
+                )
+
+            cost = estimate_cost(provider, model, prompt_tokens, max_output_tokens)
+            if cost <= remaining:
+                return decide("proceed", model, batch_size, cost, f"${cost:.4f} fits ${remaining:.4f} remaining")
+
+            candidates = self._fallback_chain(provider, model) if allow_downgrade else []
+            for cheaper in candidates:
+                cheaper_cost = estimate_cost(provider, cheaper, prompt_tokens, max_output_tokens)
+                if cheaper_cost <= remaining:
+                    return decide("downgrade", cheaper, batch_size, cheaper_cost,
+                                  f"{model} (${cost:.4f}) → {cheaper} (${cheaper_cost:.4f}), ${remaining:.4f} remaining")
+
+            if batch_size and batch_size > min_batch_size:
+                # Cheapest model we're allowed to use, then the largest batch it can afford
+                use_model = candidates[-1] if candidates else model
+                price = price_per_token(provider, use_model)
+                per_unit = prompt_tokens / batch_size * price["input"]
+                fixed = max_output_tokens * price["output"]
+                affordable = int((remaining - fixed) / per_unit) if per_unit > 0 and remaining > fixed else 0
+                if affordable >= min_batch_size:
+                    shrunk = min(affordable, batch_size - 1)
+                    shrunk_cost = fixed + per_unit * shrunk
+                    return decide("shrink", use_model, shrunk, shrunk_cost,
+                                  f"batch {batch_size} → {shrunk} on {use_model} (${shrunk_cost:.4f}), "
+                                  f"${remaining:.4f} remaining", tokens=round(prompt_tokens / batch_size * shrunk))
+
+            decision = decide("halt", model, batch_size, cost,
+                              f"Budget exhausted: {model} needs ~${cost:.4f}, ${max(remaining, 0):.4f} remaining")
+            report = self._report()
+
+        raise BudgetExceeded(decision, report)
+
+    def commit(
+        self,
+        decision: BudgetDecision,
+        tokens: Optional[Dict[str, int]] = None,
+        latency_ms: Optional[float] = None,
+        stage: str = ""
+    ) -> float:
+        """
+        Record a call made under a decision.
+
+        Args:
+            decision: The decision the call was made under
+            tokens: Actual usage (prompt_tokens/completion_tokens). Without
+                    it the worst-case estimate is charged (and recorded).
+            latency_ms: Call latency (for the ledger)
+            stage: Pipeline stage (for the ledger)
+
+        Returns:
+            Cost charged in USD
+        """
+        if tokens is not None:
+            price = price_per_token(decision["provider"], decision["model"])
+            cost = tokens.get("prompt_tokens", 0) * price["input"] + tokens.get("completion_tokens", 0) * price["output"]
+        else:
+            tokens = {"prompt_tokens": decision["prompt_tokens"], "completion_tokens": decision["max_output_tokens"]}
+            cost = decision["estimated_cost"]
+
+        with self._lock:
+            self.run_spent += cost
+            self.estimated_total += decision["estimated_cost"]
+            self.calls += 1
+
+        if self.ledger is not None:
+            self.ledger.record(
+                self.agent, stage, decision["provider"], normalize_model(decision["model"]), tokens,
+                latency_ms=latency_ms, cost=cost,
+            )
+        return cost
+
+    def report(self) -> str:
+        """Multi-line summary of spend, limits and every degradation."""
+        with self._lock:
+            return self._report()
+
+    def _report(self) -> str:
+        def limit(value: Optional[float]) -> str:
+            return f"${value:.4f}" if value is not None else "none"
+
+        lines = [
+            "Budget report",
+            f"  Run spend:   ${self.run_spent:.4f} (limit {limit(self.run_limit)})",
+            f"  Day spend:   ${self.day_spent_before + self.run_spent:.4f} (limit {limit(self.daily_limit)})",
+            f"  Calls:       {self.calls} (worst-case estimate ${self.estimated_total:.4f})",
+            "  Decisions:   " + ", ".join(f"{k} {v}" for k, v in self.counts.items()),
+        ]
+        lines += [f"    - {event}" for event in self.events[-20:]]
+        return "\n".join(lines)
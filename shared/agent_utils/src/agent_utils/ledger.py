@@ -0,0 +1,433 @@
+"""Append-only cost ledger for LLM calls.
+
+Every call is recorded to SQLite with agent, stage, provider, model, tokens,
+cost and latency. Daily rollup rows and a log-bucketed latency histogram are
+maintained on insert. Spend and latency queries therefore read a few
+thousand rollup rows instead of scanning millions of calls, and stay
+sub-second as the ledger grows.
+"""
+
+import math
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, TypedDict, Union
+
+from .token_calculator import calculate_cost
+
+
+# Latency histogram buckets grow by 10% each, so percentiles are within ~5%
+LATENCY_BUCKET_GROWTH = 1.1
+
+GROUP_COLUMNS = ("day", "agent", "stage", "provider", "model")
+
+# The histogram is kept at a coarser grain than the spend rollup to stay small
+LATENCY_GROUP_COLUMNS = ("day", "agent", "model")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    day TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_tokens INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    cost REAL,
+    latency_ms REAL,
+    run_id TEXT
+);
+
+CREATE TABLE IF NOT EXISTS daily_rollup (
+    day TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    calls INTEGER NOT NULL,
+    prompt_tokens INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    cost REAL NOT NULL,
+    unpriced_calls INTEGER NOT NULL,
+    latency_ms_sum REAL NOT NULL,
+    latency_calls INTEGER NOT NULL,
+    PRIMARY KEY (day, agent, stage, provider, model)
+);
+
+CREATE TABLE IF NOT EXISTS latency_histogram (
+    day TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    model TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (day, agent, model, bucket)
+);
+
+CREATE INDEX IF NOT EXISTS idx_calls_day ON calls (day);
+CREATE INDEX IF NOT EXISTS idx_calls_run ON calls (run_id);
+"""
+
+_ROLLUP_UPSERT = """
+INSERT INTO daily_rollup VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (day, agent, stage, provider, model) DO UPDATE SET
+    calls = calls + excluded.calls,
+    prompt_tokens = prompt_tokens + excluded.prompt_tokens,
+    completion_tokens = completion_tokens + excluded.completion_tokens,
+    cost = cost + excluded.cost,
+    unpriced_calls = unpriced_calls + excluded.unpriced_calls,
+    latency_ms_sum = latency_ms_sum + excluded.latency_ms_sum,
+    latency_calls = latency_calls + excluded.latency_calls
+"""
+
+_HISTOGRAM_UPSERT = """
+INSERT INTO latency_histogram VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (day, agent, model, bucket) DO UPDATE SET count = count + excluded.count
+"""
+
+
+class LedgerEntry(TypedDict, total=False):
+    """One LLM call, as passed to CostLedger.record_many()."""
+    agent: str
+    stage: str
+    provider: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    cost: Optional[float]  # Computed from PRICING if omitted
+    latency_ms: Optional[float]
+    run_id: Optional[str]
+    ts: Optional[float]  # Unix timestamp (default: now)
+
+
+def latency_bucket(latency_ms: float) -> int:
+    """Histogram bucket index for a latency (bucket 0 holds everything <= 1ms)."""
+    if latency_ms <= 1:
+        return 0
+    return int(math.log(latency_ms) / math.log(LATENCY_BUCKET_GROWTH)) + 1
+
+
+def bucket_value(bucket: int) -> float:
+    """Representative latency (geometric midpoint) of a histogram bucket."""
+    if bucket <= 0:
+        return 1.0
+    low = LATENCY_BUCKET_GROWTH ** (bucket - 1)
+    return low * math.sqrt(LATENCY_BUCKET_GROWTH)
+
+
+def _day(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _where(filters: Dict[str, Optional[str]], since: Optional[str], until: Optional[str]):
+    clauses, params = [], []
+    for column, value in filters.items():
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if since is not None:
+        clauses.append("day >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("day <= ?")
+        params.append(until)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def _group_columns(by: Union[str, Sequence[str]], allowed: Sequence[str] = GROUP_COLUMNS) -> List[str]:
+    columns = [by] if isinstance(by, str) else list(by)
+    unknown = [c for c in columns if c not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown group column(s): {', '.join(unknown)}. Available: {', '.join(allowed)}")
+    return columns
+
+
+class CostLedger:
+    """
+    SQLite cost ledger, safe to share across threads.
+
+    Example:
+        >>> ledger = CostLedger("data/cost_ledger.sqlite")
+        >>> ledger.record("triage-agent", "layer1", "openai", "gpt-4o",
+        ...               {"prompt_tokens": 1200, "completion_tokens": 400}, latency_ms=2300)
+        >>> ledger.spend(by="day", since="2025-02-01")
+        >>> ledger.latency_percentiles(by="model")
+    """
+
+    def __init__(self, path: Union[str, Path] = "cost_ledger.sqlite"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def _price(self, provider: str, model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+        try:
+            return calculate_cost(provider, model, {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            })["total_cost"]
+        except ValueError:
+            return None  # Unknown model - recorded, counted as unpriced
+
+    def record(
+        self,
+        agent: str,
+        stage: str,
+        provider: str,
+        model: str,
+        tokens: Dict[str, int],
+        latency_ms: Optional[float] = None,
+        cost: Optional[float] = None,
+        run_id: Optional[str] = None,
+        ts: Optional[float] = None
+    ) -> None:
+        """
+        Record one LLM call.
+
+        Args:
+            agent: Agent name (e.g. "triage-agent")
+            stage: Pipeline stage (e.g. "layer1", "judge")
+            provider: Provider for pricing (openai, anthropic, deepseek)
+            model: Model name
+            tokens: Token usage with prompt_tokens and completion_tokens
+            latency_ms: Call latency in milliseconds
+            cost: Cost in USD (default: computed from PRICING; unknown
+                  models are recorded as unpriced)
+            run_id: Optional run identifier
+            ts: Unix timestamp (default: now)
+        """
+        self.record_many([LedgerEntry(
+            agent=agent, stage=stage, provider=provider, model=model,
+            prompt_tokens=tokens.get("prompt_tokens", 0),
+            completion_tokens=tokens.get("completion_tokens", 0),
+            cost=cost, latency_ms=latency_ms, run_id=run_id, ts=ts,
+        )])
+
+    def record_many(self, entries: Iterable[LedgerEntry]) -> int:
+        """
+        Record many calls in one transaction (e.g. importing old logs).
+
+        Rollup and histogram deltas are summed in memory first, so each
+        distinct group is upserted once per batch rather than once per call.
+
+        Returns:
+            Number of calls recorded
+        """
+        rows = []
+        rollups: Dict[tuple, List[float]] = {}
+        histogram: Dict[tuple, int] = {}
+
+        for entry in entries:
+            ts = entry.get("ts") or time.time()
+            provider, model = entry["provider"], entry["model"]
+            prompt_tokens = int(entry.get("prompt_tokens", 0))
+            completion_tokens = int(entry.get("completion_tokens", 0))
+            cost = entry.get("cost")
+            if cost is None:
+                cost = self._price(provider, model, prompt_tokens, completion_tokens)
+            latency_ms = entry.get("latency_ms")
+
+            key = (_day(ts), entry["agent"], entry.get("stage", ""), provider, model)
+            rows.append((ts, *key, prompt_tokens, completion_tokens, cost, latency_ms, entry.get("run_id")))
+
+            totals = rollups.setdefault(key, [0, 0, 0, 0.0, 0, 0.0, 0])
+            totals[0] += 1
+            totals[1] += prompt_tokens
+            totals[2] += completion_tokens
+            totals[3] += cost or 0.0
+            totals[4] += cost is None
+            if latency_ms is not None:
+                totals[5] += latency_ms
+                totals[6] += 1
+                bucket_key = (key[0], key[1], model, latency_bucket(latency_ms))
+                histogram[bucket_key] = histogram.get(bucket_key, 0) + 1
+
+        if not rows:
+            return 0
+
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO calls (ts, day, agent, stage, provider, model, prompt_tokens, "
+                    "completion_tokens, cost, latency_ms, run_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.executemany(_ROLLUP_UPSERT, [(*key, *totals) for key, totals in rollups.items()])
+                self._conn.executemany(_HISTOGRAM_UPSERT, [(*key, count) for key, count in histogram.items()])
+        return len(rows)
+
+    def spend(
+        self,
+        by: Union[str, Sequence[str]] = "day",
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        agent: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Calls, tokens, cost and mean latency grouped by one or more columns.
+
+        Reads the daily rollup, so cost is independent of the ledger size.
+
+        Args:
+            by: Column or columns from GROUP_COLUMNS (day, agent, stage, provider, model)
+            since: First day to include (YYYY-MM-DD, UTC)
+            until: Last day to include (YYYY-MM-DD, UTC)
+            agent: Only this agent
+            model: Only this model
+
+        Returns:
+            One dict per group, highest cost first
+        """
+        columns = _group_columns(by)
+        where, params = _where({"agent": agent, "model": model}, since, until)
+        group = ", ".join(columns)
+
+        query = (
+            f"SELECT {group}, SUM(calls), SUM(prompt_tokens), SUM(completion_tokens), SUM(cost), "
+            f"SUM(unpriced_calls), SUM(latency_ms_sum), SUM(latency_calls) "
+            f"FROM daily_rollup{where} GROUP BY {group} ORDER BY SUM(cost) DESC"
+        )
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        results = []
+        for row in rows:
+            n = len(columns)
+            calls, prompt, completion, cost, unpriced, latency_sum, latency_calls = row[n:]
+            results.append({
+                **dict(zip(columns, row[:n])),
+                "calls": calls,
+                "prompt_tokens": prompt,
+                "completion_tokens": completion,
+                "cost": cost,
+                "unpriced_calls": unpriced,
+                "mean_latency_ms": latency_sum / latency_calls if latency_calls else None,
+            })
+        return results
+
+    def total_cost(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        agent: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> float:
+        """Total spend in USD over the filtered range."""
+        where, params = _where({"agent": agent, "model": model}, since, until)
+        with self._lock:
+            row = self._conn.execute(f"SELECT SUM(cost) FROM daily_rollup{where}", params).fetchone()
+        return row[0] or 0.0
+
+    def latency_percentiles(
+        self,
+        by: Union[str, Sequence[str]] = "model",
+        percentiles: Sequence[float] = (50, 90, 99),
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        agent: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Latency percentiles per group, from the latency histogram.
+
+        Values are bucket midpoints, accurate to within ~5%.
+
+        Args:
+            by: Column or columns from LATENCY_GROUP_COLUMNS (day, agent, model)
+            percentiles: Percentiles to report (0-100)
+            since: First day to include (YYYY-MM-DD, UTC)
+            until: Last day to include (YYYY-MM-DD, UTC)
+            agent: Only this agent
+            model: Only this model
+
+        Returns:
+            One dict per group with "calls" and "p<N>" keys (milliseconds)
+        """
+        columns = _group_columns(by, LATENCY_GROUP_COLUMNS)
+        where, params = _where({"agent": agent, "model": model}, since, until)
+        group = ", ".join(columns)
+
+        query = (
+            f"SELECT {group}, bucket, SUM(count) FROM latency_histogram{where} "
+            f"GROUP BY {group}, bucket ORDER BY {group}, bucket"
+        )
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        histograms: Dict[tuple, List[tuple]] = {}
+        n = len(columns)
+        for row in rows:
+            histograms.setdefault(tuple(row[:n]), []).append((row[n], row[n + 1]))
+
+        results = []
+        for key, buckets in histograms.items():
+            total = sum(count for _, count in buckets)
+            result = {**dict(zip(columns, key)), "calls": total}
+            for p in percentiles:
+                target = p / 100 * total
+                running = 0
+                for bucket, count in buckets:
+                    running += count
+                    if running >= target:
+                        result[f"p{p:g}"] = round(bucket_value(bucket), 1)
+                        break
+            results.append(result)
+        return results
+
+    def calls(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        agent: Optional[str] = None,
+        model: Optional[str] = None,
+        run_id: Optional[str] = None,
+        limit: int = 1000
+    ) -> List[Dict]:
+        """Raw call records, newest first."""
+        where, params = _where({"agent": agent, "model": model, "run_id": run_id}, since, until)
+        with self._lock:
+            cursor = self._conn.execute(f"SELECT * FROM calls{where} ORDER BY ts DESC LIMIT ?", [*params, limit])
+            names = [d[0] for d in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def rebuild_rollups(self) -> None:
+        """Recompute the rollup and histogram tables from the raw calls."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM daily_rollup")
+                self._conn.execute("DELETE FROM latency_histogram")
+                self._conn.execute(
+                    "INSERT INTO daily_rollup SELECT day, agent, stage, provider, model, COUNT(*), "
+                    "SUM(prompt_tokens), SUM(completion_tokens), COALESCE(SUM(cost), 0), "
+                    "SUM(cost IS NULL), COALESCE(SUM(latency_ms), 0), COUNT(latency_ms) "
+                    "FROM calls GROUP BY day, agent, stage, provider, model"
+                )
+                rows = self._conn.execute(
+                    "SELECT day, agent, model, latency_ms FROM calls WHERE latency_ms IS NOT NULL"
+                )
+                counts: Dict[tuple, int] = {}
+                for *key, latency_ms in rows:
+                    bucket_key = (*key, latency_bucket(latency_ms))
+                    counts[bucket_key] = counts.get(bucket_key, 0) + 1
+                self._conn.executemany(
+                    "INSERT INTO latency_histogram VALUES (?, ?, ?, ?, ?)",
+                    [(*key, count) for key, count in counts.items()]
+                )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(calls), 0) FROM daily_rollup").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
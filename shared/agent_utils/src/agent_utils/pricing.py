@@ -0,0 +1,211 @@
+"""Versioned model pricing registry.
+
+Prices live in a data file (data/pricing.json by default). Each model has a
+list of prices with the date each one took effect, plus optional
+cached-input rates and a provider-level batch discount. On load, every name
+a call site might use is flattened into one lookup table. That covers
+canonical names, aliases, undated forms of dated names and dotted versions
+("claude-3.5-sonnet"), so resolving a name is a single dict lookup.
+
+Example:
+    >>> registry = default_registry()
+    >>> registry.resolve("openrouter", "anthropic/claude-3.5-sonnet")
+    ('anthropic', 'claude-3-5-sonnet-20241022')
+    >>> registry.price("openai", "openai/gpt-4o-mini")["cached_input"]
+    0.075
+"""
+
+import bisect
+import json
+import re
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, TypedDict, Union
+
+
+DEFAULT_PRICING_PATH = Path(__file__).parent / "data" / "pricing.json"
+
+# Trailing release dates: -20241022, -2024-08-06
+_DATE_SUFFIX = re.compile(r"-(\d{8}|\d{4}-\d{2}-\d{2})$")
+
+
+class ModelPrice(TypedDict):
+    """Prices for one model in USD per 1M tokens, as of a date."""
+    provider: str
+    model: str  # Canonical model name
+    effective_from: str  # YYYY-MM-DD
+    input: float
+    output: float
+    cached_input: float  # Input tokens served from the prompt cache
+    batch_input: float  # Input tokens via the batch API
+    batch_output: float  # Output tokens via the batch API
+
+
+def _key(name: str) -> str:
+    """Lookup key for a model name: lowercase, dots as dashes."""
+    return name.strip().lower().replace(".", "-")
+
+
+def _undated(key: str) -> str:
+    return _DATE_SUFFIX.sub("", key)
+
+
+class PricingRegistry:
+    """
+    Model prices with effective dates and alias resolution.
+
+    Args:
+        data: Parsed pricing data (see data/pricing.json for the format)
+        today: Date "current" prices are taken at (default: today)
+    """
+
+    def __init__(self, data: dict, today: Optional[str] = None):
+        self.version = data.get("version", "unknown")
+        today = today or date.today().isoformat()
+
+        self._history: Dict[Tuple[str, str], List[ModelPrice]] = {}
+        self._dates: Dict[Tuple[str, str], List[str]] = {}
+        self._aliases: Dict[Tuple[str, str], str] = {}
+        self._current: Dict[Tuple[str, str], ModelPrice] = {}
+        self._models: Dict[str, List[str]] = {}
+
+        undated: Dict[Tuple[str, str], set] = {}
+        for provider, spec in data["providers"].items():
+            discount = spec.get("batch_discount", 1.0)
+            self._models[provider] = list(spec["models"])
+
+            for model, model_spec in spec["models"].items():
+                history = []
+                for p in sorted(model_spec["prices"], key=lambda p: p["effective_from"]):
+                    history.append(ModelPrice(
+                        provider=provider,
+                        model=model,
+                        effective_from=p["effective_from"],
+                        input=p["input"],
+                        output=p["output"],
+                        cached_input=p.get("cached_input", p["input"]),
+                        batch_input=p["input"] * discount,
+                        batch_output=p["output"] * discount,
+                    ))
+                self._history[(provider, model)] = history
+                self._dates[(provider, model)] = [p["effective_from"] for p in history]
+
+                # Before its first listed price, a model is priced at that first price
+                in_effect = [p for p in history if p["effective_from"] <= today]
+                self._current[(provider, model)] = in_effect[-1] if in_effect else history[0]
+
+                for name in [model] + model_spec.get("aliases", []):
+                    self._aliases[(provider, _key(name))] = model
+                    undated.setdefault((provider, _undated(_key(name))), set()).add(model)
+
+        # Undated forms only where they're unambiguous ("claude-3-5-sonnet", not "claude-3")
+        for (provider, key), models in undated.items():
+            if len(models) == 1:
+                self._aliases.setdefault((provider, key), next(iter(models)))
+
+        # Flat table: (provider, lookup key) -> current price
+        self._flat: Dict[Tuple[str, str], ModelPrice] = {
+            alias: self._current[(alias[0], model)] for alias, model in self._aliases.items()
+        }
+        self._resolved: Dict[Tuple[str, str], Tuple[str, str]] = {}
+
+    @property
+    def providers(self) -> List[str]:
+        return list(self._models)
+
+    def models(self, provider: str) -> List[str]:
+        """Canonical model names for a provider."""
+        return list(self._models.get(provider, []))
+
+    def resolve(self, provider: str, model: str) -> Tuple[str, str]:
+        """
+        Resolve a model name as used at a call site to (provider, canonical model).
+
+        A known provider prefix ("openai/gpt-4o", as used with OpenRouter)
+        overrides the provider argument. Dated names that aren't listed fall
+        back to their undated form ("gpt-4o-2024-08-06" -> "gpt-4o").
+
+        Raises:
+            ValueError: If provider or model not found
+        """
+        cached = self._resolved.get((provider, model))
+        if cached is not None:
+            return cached
+
+        name = model
+        if "/" in model:
+            prefix, rest = model.split("/", 1)
+            if prefix in self._models:
+                provider, name = prefix, rest
+
+        if provider not in self._models:
+            available = ", ".join(self._models)
+            raise ValueError(f"Unknown provider: {provider}. Available providers: {available}")
+
+        key = _key(name)
+        canonical = self._aliases.get((provider, key)) or self._aliases.get((provider, _undated(key)))
+        if canonical is None:
+            available = ", ".join(self._models[provider])
+            raise ValueError(
+                f"Unknown model: {model} for provider {provider}. "
+                f"Available models: {available}"
+            )
+
+        self._resolved[(provider, model)] = (provider, canonical)
+        return provider, canonical
+
+    def price(self, provider: str, model: str, on: Optional[str] = None) -> ModelPrice:
+        """
+        Prices for a model.
+
+        Args:
+            provider: Provider name
+            model: Model name or alias (provider prefix allowed)
+            on: Date (YYYY-MM-DD) to price at; default is the current price
+
+        Returns:
+            ModelPrice in USD per 1M tokens
+
+        Raises:
+            ValueError: If provider or model not found
+        """
+        if on is None:
+            hit = self._flat.get((provider, _key(model)))
+            if hit is not None:
+                return hit
+            return self._current[self.resolve(provider, model)]
+
+        resolved = self.resolve(provider, model)
+        history = self._history[resolved]
+        index = bisect.bisect_right(self._dates[resolved], on) - 1
+        return history[max(index, 0)]
+
+    def history(self, provider: str, model: str) -> List[ModelPrice]:
+        """Every listed price for a model, oldest first."""
+        return list(self._history[self.resolve(provider, model)])
+
+    def table(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Current input/output prices as {provider: {model: {"input", "output"}}}."""
+        return {
+            provider: {
+                model: {
+                    "input": self._current[(provider, model)]["input"],
+                    "output": self._current[(provider, model)]["output"],
+                }
+                for model in models
+            }
+            for provider, models in self._models.items()
+        }
+
+
+def load_registry(path: Union[str, Path] = DEFAULT_PRICING_PATH, today: Optional[str] = None) -> PricingRegistry:
+    """Load a pricing registry from a JSON data file."""
+    with open(path, "r", encoding="utf-8") as f:
+        return PricingRegistry(json.load(f), today=today)
+
+
+@lru_cache(maxsize=1)
+def default_registry() -> PricingRegistry:
+    """The registry for the bundled data/pricing.json (loaded once)."""
+    return load_registry()
@@ -1,18 +1,27 @@
 """Token cost calculator for different LLM providers.
 
-Pricing data as of February 2025.
+Prices come from the versioned registry in pricing.py (data/pricing.json).
 """
 
-from typing import Dict, Literal, TypedDict
+from typing import TYPE_CHECKING, Dict, List, Literal, Optional, Sequence, Tuple, TypedDict, Union
 
+from .pricing import ModelPrice, default_registry
 
-class TokenUsage(TypedDict):
-    """Token usage from an LLM response."""
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class _TokenUsage(TypedDict):
     prompt_tokens: int
     completion_tokens: int
     total_tokens: int
 
 
+class TokenUsage(_TokenUsage, total=False):
+    """Token usage from an LLM response."""
+    cached_tokens: int  # Prompt tokens served from the cache (included in prompt_tokens)
+
+
 class CostBreakdown(TypedDict):
     """Cost breakdown for an LLM call."""
     prompt_cost: float
@@ -23,95 +32,60 @@ class CostBreakdown(TypedDict):
     tokens: TokenUsage
 
 
-# Pricing in USD per 1 million tokens
-# Last updated: February 2025
-PRICING = {
-    "openai": {
-        "gpt-4o": {
-            "input": 2.50,
-            "output": 10.00,
-        },
-        "gpt-4": {
-            "input": 30.00,
-            "output": 60.00,
-        },
-        "gpt-4-turbo": {
-            "input": 10.00,
-            "output": 30.00,
-        },
-        "gpt-3.5-turbo": {
-            "input": 0.50,
-            "output": 1.50,
-        },
-    },
-    "anthropic": {
-        "claude-3-5-sonnet-20241022": {
-            "input": 3.00,
-            "output": 15.00,
-        },
-        "claude-3-opus-20240229": {
-            "input": 15.00,
-            "output": 75.00,
-        },
-        "claude-3-sonnet-20240229": {
-            "input": 3.00,
-            "output": 15.00,
-        },
-        "claude-3-haiku-20240307": {
-            "input": 0.25,
-            "output": 1.25,
-        },
-    },
-    "deepseek": {
-        "deepseek-chat": {
-            "input": 0.27,
-            "output": 1.10,
-        },
-        "deepseek-coder": {
-            "input": 0.27,
-            "output": 1.10,
-        },
-    },
-}
+class GroupTotal(TypedDict):
+    """Summed usage and cost for one group of calls."""
+    calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    cost: float  # Unpriced calls contribute nothing
+    unpriced_calls: int
+
+
+class BulkCosts(TypedDict):
+    """Per-call costs (NumPy arrays, NaN where unpriced) and grouped totals."""
+    prompt_cost: "np.ndarray"
+    completion_cost: "np.ndarray"
+    total_cost: "np.ndarray"
+    priced: "np.ndarray"  # False where the model has no price
+    total: float
+    totals: Dict[str, GroupTotal]
+
+
+Provider = Literal["openai", "anthropic", "deepseek", "perplexity"]
+
+# Current pricing in USD per 1 million tokens, {provider: {model: {"input", "output"}}}
+PRICING = default_registry().table()
 
 
 def get_pricing(
-    provider: Literal["openai", "anthropic", "deepseek"],
-    model: str
-) -> Dict[str, float]:
+    provider: Provider,
+    model: str,
+    on: Optional[str] = None
+) -> ModelPrice:
     """
     Get pricing for a specific provider and model.
 
     Args:
         provider: LLM provider name
-        model: Model name
+        model: Model name or alias ("gpt-4o", "openai/gpt-4o-mini",
+               "claude-3.5-sonnet", "gpt-4o-2024-08-06")
+        on: Date (YYYY-MM-DD) to price at (default: current prices)
 
     Returns:
-        Dictionary with 'input' and 'output' prices per 1M tokens
+        ModelPrice with 'input' and 'output' (plus cached/batch) prices per 1M tokens
 
     Raises:
         ValueError: If provider or model not found
     """
-    if provider not in PRICING:
-        available = ", ".join(PRICING.keys())
-        raise ValueError(
-            f"Unknown provider: {provider}. Available providers: {available}"
-        )
-
-    if model not in PRICING[provider]:
-        available = ", ".join(PRICING[provider].keys())
-        raise ValueError(
-            f"Unknown model: {model} for provider {provider}. "
-            f"Available models: {available}"
-        )
-
-    return PRICING[provider][model]
+    return default_registry().price(provider, model, on=on)
 
 
 def calculate_cost(
-    provider: Literal["openai", "anthropic", "deepseek"],
+    provider: Provider,
     model: str,
     tokens: TokenUsage,
+    batch: bool = False,
+    on: Optional[str] = None
 ) -> CostBreakdown:
     """
     Calculate cost for an LLM call based on token usage.
@@ -119,7 +93,10 @@ def calculate_cost(
     Args:
         provider: LLM provider name (openai, anthropic, deepseek)
         model: Model name (e.g., "gpt-4o", "claude-3-5-sonnet-20241022")
-        tokens: Token usage with prompt_tokens and completion_tokens
+        tokens: Token usage with prompt_tokens and completion_tokens, and
+                optionally cached_tokens (billed at the cached-input rate)
+        batch: Priced at batch API rates
+        on: Date (YYYY-MM-DD) to price at (default: current prices)
 
     Returns:
         CostBreakdown with prompt_cost, completion_cost, and total_cost in USD
@@ -133,11 +110,17 @@ def calculate_cost(
     Raises:
         ValueError: If provider or model not found
     """
-    pricing = get_pricing(provider, model)
+    pricing = get_pricing(provider, model, on=on)
+    cached = min(tokens.get("cached_tokens", 0), tokens["prompt_tokens"])
+
+    if batch:
+        input_price, output_price = pricing["batch_input"], pricing["batch_output"]
+    else:
+        input_price, output_price = pricing["input"], pricing["output"]
 
     # Convert from per-million to per-token
-    prompt_cost = (tokens["prompt_tokens"] / 1_000_000) * pricing["input"]
-    completion_cost = (tokens["completion_tokens"] / 1_000_000) * pricing["output"]
+    prompt_cost = ((tokens["prompt_tokens"] - cached) * input_price + cached * pricing["cached_input"]) / 1_000_000
+    completion_cost = (tokens["completion_tokens"] / 1_000_000) * output_price
     total_cost = prompt_cost + completion_cost
 
     return CostBreakdown(
@@ -150,6 +133,143 @@ def calculate_cost(
     )
 
 
+def _factorize(values: Union[str, Sequence], n: int) -> Tuple["np.ndarray", List]:
+    """Integer codes and unique values for a column (a str broadcasts)."""
+    import numpy as np
+
+    if isinstance(values, str):
+        return np.zeros(n, dtype=np.intp), [values]
+    if isinstance(values, np.ndarray):
+        values = values.tolist()
+    if len(values) != n:
+        raise ValueError(f"Column length {len(values)} != {n}")
+
+    # C-level set/dict passes - much faster than np.unique on string arrays
+    uniques = sorted(set(values), key=str)
+    index = {value: i for i, value in enumerate(uniques)}
+    return np.fromiter(map(index.__getitem__, values), dtype=np.intp, count=n), uniques
+
+
+def calculate_costs_bulk(
+    provider: Union[str, Sequence[str]],
+    model: Union[str, Sequence[str]],
+    prompt_tokens: Sequence[int],
+    completion_tokens: Sequence[int],
+    cached_tokens: Optional[Sequence[int]] = None,
+    group_by: Optional[Sequence] = None,
+    batch: bool = False,
+    on: Optional[str] = None
+) -> BulkCosts:
+    """
+    Calculate costs for many calls at once from columnar data.
+
+    Each distinct (provider, model) pair is priced once; the arithmetic and
+    grouping are vectorized. Requires numpy (pip install agent_utils[numpy]).
+
+    Args:
+        provider: Provider per call, or one provider for all
+        model: Model per call (aliases and provider prefixes allowed), or one model for all
+        prompt_tokens: Prompt tokens per call
+        completion_tokens: Completion tokens per call
+        cached_tokens: Cached prompt tokens per call (included in prompt_tokens)
+        group_by: Label per call to total by (e.g. day or agent);
+                  default is the canonical "provider/model"
+        batch: Price at batch API rates
+        on: Date (YYYY-MM-DD) to price at (default: current prices)
+
+    Returns:
+        BulkCosts with per-call cost arrays and totals per group
+
+    Example:
+        >>> costs = calculate_costs_bulk("openai", ["gpt-4o", "gpt-4o-mini"], [1000, 1000], [500, 500])
+        >>> costs["totals"]["openai/gpt-4o"]["cost"]
+        0.0075
+
+    Raises:
+        ValueError: If the columns differ in length
+    """
+    import numpy as np
+
+    prompt = np.asarray(prompt_tokens, dtype=np.float64)
+    completion = np.asarray(completion_tokens, dtype=np.float64)
+    n = len(prompt)
+    if len(completion) != n:
+        raise ValueError(f"Column length {len(completion)} != {n}")
+    cached = np.minimum(np.asarray(cached_tokens, dtype=np.float64), prompt) if cached_tokens is not None else None
+
+    provider_codes, providers = _factorize(provider, n)
+    model_codes, models = _factorize(model, n)
+
+    # Price table over the (provider, model) grid, one registry lookup per pair
+    registry = default_registry()
+    shape = (len(providers), len(models))
+    input_price = np.full(shape, np.nan)
+    output_price = np.full(shape, np.nan)
+    cached_price = np.full(shape, np.nan)
+    labels = np.empty(shape, dtype=object)
+    for i, p in enumerate(providers):
+        for j, m in enumerate(models):
+            try:
+                price = registry.price(p, m, on=on)
+            except ValueError:
+                labels[i, j] = f"{p}/{m}"  # Unpriced - grouped under the name as given
+                continue
+            input_price[i, j] = price["batch_input"] if batch else price["input"]
+            output_price[i, j] = price["batch_output"] if batch else price["output"]
+            cached_price[i, j] = price["cached_input"]
+            labels[i, j] = f"{price['provider']}/{price['model']}"
+
+    pair = provider_codes * shape[1] + model_codes
+    input_price, output_price, cached_price = input_price.ravel(), output_price.ravel(), cached_price.ravel()
+
+    if cached is None:
+        prompt_cost = prompt * input_price[pair] / 1_000_000
+    else:
+        prompt_cost = ((prompt - cached) * input_price[pair] + cached * cached_price[pair]) / 1_000_000
+    completion_cost = completion * output_price[pair] / 1_000_000
+    total_cost = prompt_cost + completion_cost
+    priced = ~np.isnan(total_cost)
+
+    if group_by is None:
+        # Aliases of one model share a label, so group on labels, not raw pairs
+        group_names = sorted(set(labels.ravel().tolist()))
+        label_index = {name: g for g, name in enumerate(group_names)}
+        to_group = np.array([label_index[name] for name in labels.ravel().tolist()], dtype=np.intp)
+        group_codes = to_group[pair]
+    else:
+        group_codes, group_names = _factorize(group_by, n)
+
+    k = len(group_names)
+    sums = {
+        "calls": np.bincount(group_codes, minlength=k),
+        "prompt_tokens": np.bincount(group_codes, weights=prompt, minlength=k),
+        "completion_tokens": np.bincount(group_codes, weights=completion, minlength=k),
+        "cost": np.bincount(group_codes, weights=np.where(priced, total_cost, 0.0), minlength=k),
+        "unpriced_calls": np.bincount(group_codes, weights=~priced, minlength=k),
+    }
+
+    totals = {}
+    for g, name in enumerate(group_names):
+        if sums["calls"][g] == 0:
+            continue
+        totals[str(name)] = GroupTotal(
+            calls=int(sums["calls"][g]),
+            prompt_tokens=int(sums["prompt_tokens"][g]),
+            completion_tokens=int(sums["completion_tokens"][g]),
+            cost=float(sums["cost"][g]),
+            unpriced_calls=int(sums["unpriced_calls"][g]),
+        )
+
+    return BulkCosts(
+        prompt_cost=prompt_cost,
+        completion_cost=completion_cost,
+        total_cost=total_cost,
+        priced=priced,
+        total=float(sums["cost"].sum()),
+        totals=totals,
+    )
+
+
 def format_cost(cost: CostBreakdown, verbose: bool = False) -> str:
     """
     Format cost breakdown as a human-readable string.
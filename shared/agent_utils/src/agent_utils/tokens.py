@@ -0,0 +1,331 @@
+"""Token counting for OpenAI, Anthropic and DeepSeek models.
+
+Encoders are loaded once per encoding and memoized, counting is available
+one text at a time or batched, and a fast approximate mode (characters per
+token, calibrated against the exact tokenizer) lets pipelines pre-flight
+prompt sizes before every call for next to nothing.
+
+Anthropic and DeepSeek don't publish tiktoken encodings, so their counts use
+cl100k_base scaled by a per-family correction factor. They are estimates
+either way. tiktoken is optional: without it, or if an encoding can't be
+loaded, exact mode falls back to the approximation.
+"""
+
+import math
+import threading
+import warnings
+from functools import lru_cache
+from typing import Any, Dict, List, Literal, Optional, Sequence, TypedDict
+
+
+CountMode = Literal["exact", "approx"]
+
+
+class ModelFamily(TypedDict):
+    """How to count tokens for a family of models."""
+    encoding: str  # tiktoken encoding name
+    correction: float  # Multiplier applied to encoding counts (1.0 = exact)
+    chars_per_token: float  # Approx-mode ratio, calibrated on English prose
+    context_window: int  # Default context window in tokens
+
+
+class PreflightResult(TypedDict):
+    """Estimated size of an LLM call before it is made."""
+    model: str
+    prompt_tokens: int
+    max_output_tokens: int
+    total_tokens: int
+    context_window: Optional[int]  # None when the model's window is unknown
+    fits: bool
+    mode: str
+
+
+# Ratios measured against each encoding on mixed English prose/JSON prompts
+FAMILIES: Dict[str, ModelFamily] = {
+    "openai-o200k": {
+        "encoding": "o200k_base",
+        "correction": 1.0,
+        "chars_per_token": 4.1,
+        "context_window": 128_000,
+    },
+    "openai-cl100k": {
+        "encoding": "cl100k_base",
+        "correction": 1.0,
+        "chars_per_token": 3.9,
+        "context_window": 8_192,
+    },
+    "anthropic": {
+        "encoding": "cl100k_base",
+        "correction": 1.1,
+        "chars_per_token": 3.5,
+        "context_window": 200_000,
+    },
+    "deepseek": {
+        "encoding": "cl100k_base",
+        "correction": 1.0,
+        "chars_per_token": 3.9,
+        "context_window": 64_000,
+    },
+}
+
+# Model-specific context windows where they differ from the family default
+CONTEXT_WINDOWS: Dict[str, int] = {
+    "gpt-4-turbo": 128_000,
+    "gpt-4-32k": 32_768,
+    "gpt-3.5-turbo": 16_385,
+}
+
+# Chat format overhead (role markers etc.) per message and per request
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REQUEST = 3
+
+_calibration: Dict[str, float] = {}
+_calibration_lock = threading.Lock()
+
+
+def normalize_model(model: str) -> str:
+    """Strip an OpenRouter-style provider prefix ("openai/gpt-4o" -> "gpt-4o")."""
+    return model.split("/", 1)[1] if "/" in model else model
+
+
+def _known_family(name: str) -> Optional[str]:
+    """Family for a normalized, lowercased model name, or None if it isn't one we know."""
+    if name.startswith("claude"):
+        return "anthropic"
+    if name.startswith("deepseek"):
+        return "deepseek"
+    if name.startswith(("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4", "chatgpt-4o")):
+        return "openai-o200k"
+    if name.startswith(("gpt-4", "gpt-3.5")):
+        return "openai-cl100k"
+    return None
+
+
+def model_family(model: str) -> str:
+    """
+    Resolve a model name to a token-counting family.
+
+    Models outside the known families (Gemini, Llama, Mistral, ...) are counted
+    with cl100k_base, which is a reasonable estimate for most BPE tokenizers.
+
+    Args:
+        model: Model name, with or without provider prefix
+
+    Returns:
+        Family key in FAMILIES
+    """
+    return _known_family(normalize_model(model).lower()) or "openai-cl100k"
+
+
+def context_window(model: str) -> Optional[int]:
+    """Context window (tokens) for a model, or None if the model isn't in a known family."""
+    name = normalize_model(model).lower()
+    for prefix, window in CONTEXT_WINDOWS.items():
+        if name.startswith(prefix):
+            return window
+    family = _known_family(name)
+    return FAMILIES[family]["context_window"] if family else None
+
+
+@lru_cache(maxsize=None)
+def get_encoder(encoding: str) -> Optional[Any]:
+    """
+    Load a tiktoken encoding once per process.
+
+    Returns:
+        tiktoken Encoding, or None if tiktoken isn't installed or the encoding
+        can't be loaded (e.g. offline without a cached BPE file)
+    """
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(encoding)
+    except Exception as e:
+        warnings.warn(f"tiktoken encoding {encoding} unavailable ({e}); using approximate token counts")
+        return None
+
+
+def chars_per_token(model: str) -> float:
+    """Approx-mode ratio for a model's family (calibrated value if calibrate() was run)."""
+    family = model_family(model)
+    with _calibration_lock:
+        return _calibration.get(family, FAMILIES[family]["chars_per_token"])
+
+
+def _approx(length: int, ratio: float) -> int:
+    # Round first so float noise (410 / 4.1 = 100.00000000000001) does not add a token
+    return math.ceil(round(length / ratio, 6)) if length else 0
+
+
+def count_tokens(text: str, model: str = "gpt-4o", mode: CountMode = "exact") -> int:
+    """
+    Count tokens in a text.
+
+    Args:
+        text: Text to count
+        model: Model name (provider prefix allowed, e.g. "openai/gpt-4o-mini")
+        mode: "exact" uses the tokenizer; "approx" uses calibrated chars/token
+
+    Returns:
+        Token count (an estimate for approx mode and non-OpenAI models)
+
+    Example:
+        >>> count_tokens("Hello world", "gpt-4o", mode="approx")
+        3
+    """
+    return count_tokens_many([text], model, mode)[0]
+
+
+def count_tokens_many(
+    texts: Sequence[str],
+    model: str = "gpt-4o",
+    mode: CountMode = "exact",
+    num_threads: int = 8
+) -> List[int]:
+    """
+    Count tokens for many texts in one call.
+
+    Exact mode encodes the batch in parallel threads inside tiktoken; approx
+    mode is a single pass over text lengths.
+
+    Args:
+        texts: Texts to count
+        model: Model name
+        mode: "exact" or "approx"
+        num_threads: tiktoken worker threads for exact batches
+
+    Returns:
+        Token counts, in the same order as texts
+    """
+    family = FAMILIES[model_family(model)]
+
+    encoder = get_encoder(family["encoding"]) if mode == "exact" else None
+    if encoder is None:
+        ratio = chars_per_token(model)
+        return [_approx(len(text), ratio) for text in texts]
+
+    if len(texts) == 1:
+        counts = [len(encoder.encode_ordinary(texts[0]))]
+    else:
+        counts = [len(tokens) for tokens in encoder.encode_ordinary_batch(list(texts), num_threads=num_threads)]
+
+    correction = family["correction"]
+    if correction == 1.0:
+        return counts
+    return [math.ceil(count * correction) for count in counts]
+
+
+def calibrate(
+    texts: Sequence[str],
+    model: str = "gpt-4o",
+    exact_counts: Optional[Sequence[int]] = None
+) -> float:
+    """
+    Calibrate approx mode for a model's family against the exact tokenizer.
+
+    Run this on a sample of real prompts; later approx counts for the whole
+    family use the measured chars/token ratio.
+
+    Args:
+        texts: Representative texts
+        model: Model whose family to calibrate
+        exact_counts: Precomputed exact counts (default: count with the tokenizer)
+
+    Returns:
+        The calibrated chars/token ratio
+
+    Raises:
+        ValueError: If there is nothing to calibrate against
+    """
+    if exact_counts is None:
+        family = FAMILIES[model_family(model)]
+        if get_encoder(family["encoding"]) is None:
+            raise ValueError("Exact tokenizer unavailable; pass exact_counts to calibrate")
+        exact_counts = count_tokens_many(texts, model, mode="exact")
+
+    total_chars = sum(len(text) for text in texts)
+    total_tokens = sum(exact_counts)
+    if not total_chars or not total_tokens:
+        raise ValueError("Calibration needs non-empty texts")
+
+    ratio = total_chars / total_tokens
+    with _calibration_lock:
+        _calibration[model_family(model)] = ratio
+    return ratio
+
+
+def reset_calibration() -> None:
+    """Forget calibrated ratios and go back to the built-in defaults."""
+    with _calibration_lock:
+        _calibration.clear()
+
+
+def count_message_tokens(
+    messages: Sequence[Dict[str, str]],
+    model: str = "gpt-4o",
+    mode: CountMode = "exact"
+) -> int:
+    """
+    Count prompt tokens for a chat request, including per-message overhead.
+
+    Args:
+        messages: Chat messages ({"role": ..., "content": ...})
+        model: Model name
+        mode: "exact" or "approx"
+
+    Returns:
+        Estimated prompt tokens billed for the request
+    """
+    counts = count_tokens_many([m.get("content") or "" for m in messages], model, mode)
+    return sum(counts) + TOKENS_PER_MESSAGE * len(messages) + TOKENS_PER_REQUEST
+
+
+def preflight(
+    system_prompt: str,
+    user_prompt: str,
+    model: str = "gpt-4o",
+    max_output_tokens: int = 4000,
+    mode: CountMode = "approx",
+    context_limit: Optional[int] = None
+) -> PreflightResult:
+    """
+    Estimate an LLM call's size before making it.
+
+    Approx mode by default so it is cheap enough to run before every call.
+
+    Args:
+        system_prompt: System prompt
+        user_prompt: User prompt
+        model: Model name
+        max_output_tokens: max_tokens that will be requested
+        mode: "approx" (default) or "exact"
+        context_limit: Override the model's context window
+
+    Returns:
+        PreflightResult with token estimates and whether the call fits. For a
+        model with an unknown context window (and no context_limit) the size
+        check is skipped with a warning: context_window is None and fits is True.
+
+    Example:
+        >>> check = preflight(system, user, "openai/gpt-4o-mini", max_output_tokens=8000)
+        >>> if not check["fits"]:
+        ...     raise ValueError(f"Prompt too large: {check['total_tokens']} tokens")
+    """
+    prompt_tokens = count_message_tokens(
+        [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
+        model,
+        mode,
+    )
+    window = context_limit or context_window(model)
+    total = prompt_tokens + max_output_tokens
+    if window is None:
+        warnings.warn(f"Unknown context window for {model}; skipping the preflight size check")
+
+    return PreflightResult(
+        model=model,
+        prompt_tokens=prompt_tokens,
+        max_output_tokens=max_output_tokens,
+        total_tokens=total,
+        context_window=window,
+        fits=window is None or total <= window,
+        mode=mode,
+    )
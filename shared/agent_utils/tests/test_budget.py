@@ -0,0 +1,79 @@
+"""Tests for the budget guard."""
+
+import pytest
+from agent_utils import BudgetExceeded, BudgetGuard, CostLedger
+from agent_utils.budget import estimate_cost, price_per_token
+
+
+def test_estimate_cost_uses_pricing():
+    """Test worst-case cost assumes the full max_output_tokens."""
+    # gpt-4o: $2.50 in / $10.00 out per 1M
+    assert estimate_cost("openai", "gpt-4o", 1000, 500) == pytest.approx(0.0075)
+    assert estimate_cost("openai", "openai/gpt-4o", 1000, 500) == pytest.approx(0.0075)
+
+
+def test_unknown_model_priced_conservatively():
+    """Test unknown models use the provider's most expensive rates."""
+    assert price_per_token("openai", "gpt-9") == price_per_token("openai", "gpt-4")
+    with pytest.raises(ValueError):
+        price_per_token("nobody", "model")
+
+
+def test_proceed_within_budget():
+    """Test calls that fit proceed unchanged."""
+    guard = BudgetGuard(run_limit=1.00)
+    decision = guard.check("openai", "gpt-4o", prompt_tokens=1000, max_output_tokens=500)
+    assert decision["action"] == "proceed"
+    assert decision["model"] == "gpt-4o"
+
+
+def test_downgrade_keeps_provider_prefix():
+    """Test an over-budget call falls back to a cheaper model."""
+    guard = BudgetGuard(run_limit=0.01)
+    decision = guard.check("openai", "openai/gpt-4o", prompt_tokens=1000, max_output_tokens=4000)
+    assert decision["action"] == "downgrade"
+    assert decision["model"] == "openai/gpt-4o-mini"
+    assert decision["estimated_cost"] <= 0.01
+
+
+def test_shrink_batch_when_no_model_fits():
+    """Test the batch shrinks once the cheapest model is still too dear."""
+    guard = BudgetGuard(run_limit=0.01, fallbacks={})
+    decision = guard.check("openai", "gpt-4o", prompt_tokens=10000, max_output_tokens=100, batch_size=10)
+    assert decision["action"] == "shrink"
+    # $0.001 output leaves $0.009 for input at $0.0025 per 1k-token item
+    assert decision["batch_size"] == 3
+    assert decision["prompt_tokens"] == 3000
+
+
+def test_halt_raises_with_report():
+    """Test nothing fitting halts with a report."""
+    guard = BudgetGuard(run_limit=0.001)
+    with pytest.raises(BudgetExceeded) as exc:
+        guard.check("openai", "gpt-4o", prompt_tokens=10000, max_output_tokens=4000, allow_downgrade=False)
+    assert exc.value.decision["action"] == "halt"
+    assert "Budget report" in exc.value.report
+
+
+def test_commit_tracks_spend():
+    """Test commits charge actual usage, or the estimate without it."""
+    guard = BudgetGuard(run_limit=0.02)
+    decision = guard.check("openai", "gpt-4o", prompt_tokens=1000, max_output_tokens=500)
+    assert guard.commit(decision, tokens={"prompt_tokens": 1000, "completion_tokens": 100}) == pytest.approx(0.0035)
+    assert guard.commit(decision) == pytest.approx(0.0075)
+    assert guard.remaining() == pytest.approx(0.009)
+    assert guard.calls == 2
+
+
+def test_daily_limit_counts_ledger_spend(tmp_path):
+    """Test today's earlier ledger spend counts against the daily limit."""
+    ledger = CostLedger(tmp_path / "ledger.sqlite")
+    ledger.record("triage", "layer1", "openai", "gpt-4o", {"prompt_tokens": 1000, "completion_tokens": 500})
+
+    guard = BudgetGuard(daily_limit=0.01, ledger=ledger, agent="triage")
+    assert guard.remaining() == pytest.approx(0.0025)
+
+    decision = guard.check("openai", "gpt-4o", prompt_tokens=100, max_output_tokens=100)
+    guard.commit(decision, tokens={"prompt_tokens": 100, "completion_tokens": 100}, stage="layer2")
+    assert len(ledger) == 2
+    ledger.close()
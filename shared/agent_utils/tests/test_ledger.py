@@ -0,0 +1,101 @@
+"""Tests for the cost ledger."""
+
+import pytest
+from agent_utils import CostLedger
+from agent_utils.ledger import bucket_value, latency_bucket
+
+DAY1 = 1738411200.0  # 2025-02-01 12:00 UTC
+DAY2 = DAY1 + 86400
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = CostLedger(tmp_path / "ledger.sqlite")
+    yield ledger
+    ledger.close()
+
+
+def test_record_computes_cost(ledger):
+    """Test cost is computed from PRICING when not given."""
+    ledger.record("triage", "layer1", "openai", "gpt-4o",
+                  {"prompt_tokens": 1000, "completion_tokens": 500}, latency_ms=1200, ts=DAY1)
+    assert len(ledger) == 1
+    assert ledger.total_cost() == pytest.approx(0.0075)
+    call = ledger.calls()[0]
+    assert call["day"] == "2025-02-01"
+    assert call["cost"] == pytest.approx(0.0075)
+
+
+def test_unknown_model_is_unpriced(ledger):
+    """Test unknown models are recorded without a cost."""
+    ledger.record("triage", "layer1", "openai", "mystery-model",
+                  {"prompt_tokens": 1000, "completion_tokens": 500}, ts=DAY1)
+    row = ledger.spend(by="model")[0]
+    assert row["calls"] == 1
+    assert row["cost"] == 0.0
+    assert row["unpriced_calls"] == 1
+
+
+def test_spend_grouping_and_filters(ledger):
+    """Test spend aggregates by columns with day/agent filters."""
+    ledger.record_many([
+        {"agent": "triage", "stage": "layer1", "provider": "openai", "model": "gpt-4o",
+         "prompt_tokens": 1000, "completion_tokens": 0, "ts": DAY1, "latency_ms": 100},
+        {"agent": "triage", "stage": "judge", "provider": "openai", "model": "gpt-4o",
+         "prompt_tokens": 1000, "completion_tokens": 0, "ts": DAY2, "latency_ms": 300},
+        {"agent": "reddit", "stage": "analysis", "provider": "openai", "model": "gpt-4o",
+         "prompt_tokens": 2000, "completion_tokens": 0, "ts": DAY2},
+    ])
+
+    by_day = {row["day"]: row for row in ledger.spend(by="day")}
+    assert by_day["2025-02-01"]["calls"] == 1
+    assert by_day["2025-02-02"]["prompt_tokens"] == 3000
+
+    by_agent = ledger.spend(by=["agent", "stage"], agent="triage", since="2025-02-02")
+    assert by_agent == [{
+        "agent": "triage", "stage": "judge", "calls": 1, "prompt_tokens": 1000,
+        "completion_tokens": 0, "cost": pytest.approx(0.0025), "unpriced_calls": 0,
+        "mean_latency_ms": 300,
+    }]
+
+    assert ledger.total_cost(agent="reddit") == pytest.approx(0.005)
+
+
+def test_spend_rejects_unknown_column(ledger):
+    """Test grouping by an unknown column raises."""
+    with pytest.raises(ValueError, match="Unknown group column"):
+        ledger.spend(by="region")
+
+
+def test_latency_percentiles(ledger):
+    """Test percentiles from the histogram are within bucket resolution."""
+    ledger.record_many(
+        {"agent": "triage", "stage": "layer1", "provider": "openai", "model": "gpt-4o",
+         "prompt_tokens": 10, "completion_tokens": 10, "latency_ms": float(ms), "ts": DAY1}
+        for ms in range(1, 1001)
+    )
+    row = ledger.latency_percentiles(by="model", percentiles=(50, 99))[0]
+    assert row["calls"] == 1000
+    assert row["p50"] == pytest.approx(500, rel=0.06)
+    assert row["p99"] == pytest.approx(990, rel=0.06)
+
+
+def test_rebuild_rollups_matches_incremental(ledger):
+    """Test rebuilding rollups from raw calls gives the same aggregates."""
+    ledger.record_many(
+        {"agent": "a", "stage": "s", "provider": "openai", "model": "gpt-4o",
+         "prompt_tokens": i, "completion_tokens": i, "latency_ms": 10.0 * i, "ts": DAY1 + i * 3600}
+        for i in range(1, 50)
+    )
+    spend = ledger.spend(by=["day", "model"])
+    latency = ledger.latency_percentiles(by="day")
+
+    ledger.rebuild_rollups()
+    assert ledger.spend(by=["day", "model"]) == spend
+    assert ledger.latency_percentiles(by="day") == latency
+
+
+def test_latency_buckets_are_monotonic():
+    """Test bucket midpoints stay close to the latencies they hold."""
+    for ms in (0.5, 1.5, 42, 1234.5, 98765):
+        assert bucket_value(latency_bucket(ms)) == pytest.approx(max(ms, 1.0), rel=0.06)
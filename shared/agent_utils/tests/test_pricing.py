@@ -0,0 +1,115 @@
+"""Tests for the pricing registry."""
+
+import pytest
+from agent_utils import calculate_cost, get_pricing
+from agent_utils.pricing import PricingRegistry, default_registry
+
+DATA = {
+    "version": "test",
+    "providers": {
+        "openai": {
+            "batch_discount": 0.5,
+            "models": {
+                "gpt-4o": {
+                    "aliases": ["chatgpt-4o-latest"],
+                    "prices": [
+                        {"effective_from": "2024-10-01", "input": 2.50, "output": 10.00, "cached_input": 1.25},
+                        {"effective_from": "2024-05-13", "input": 5.00, "output": 15.00},
+                    ],
+                },
+            },
+        },
+        "anthropic": {
+            "models": {
+                "claude-3-5-sonnet-20241022": {
+                    "prices": [{"effective_from": "2024-06-20", "input": 3.00, "output": 15.00}],
+                },
+                "claude-3-opus-20240229": {
+                    "prices": [{"effective_from": "2024-03-04", "input": 15.00, "output": 75.00}],
+                },
+            },
+        },
+    },
+}
+
+
+@pytest.fixture
+def registry():
+    return PricingRegistry(DATA, today="2025-01-01")
+
+
+@pytest.mark.parametrize("provider,model,expected", [
+    ("openai", "gpt-4o", ("openai", "gpt-4o")),
+    ("openai", "GPT-4o", ("openai", "gpt-4o")),
+    ("openai", "chatgpt-4o-latest", ("openai", "gpt-4o")),
+    ("openai", "gpt-4o-2024-08-06", ("openai", "gpt-4o")),
+    ("openrouter", "openai/gpt-4o", ("openai", "gpt-4o")),
+    ("openrouter", "anthropic/claude-3.5-sonnet", ("anthropic", "claude-3-5-sonnet-20241022")),
+    ("anthropic", "claude-3-5-sonnet-20240620", ("anthropic", "claude-3-5-sonnet-20241022")),
+])
+def test_resolve_aliases(registry, provider, model, expected):
+    """Test prefixed, dotted, dated and listed aliases resolve to canonical names."""
+    assert registry.resolve(provider, model) == expected
+
+
+def test_resolve_unknown(registry):
+    """Test unknown providers and models raise ValueError."""
+    with pytest.raises(ValueError, match="Unknown provider"):
+        registry.resolve("nobody", "gpt-4o")
+    with pytest.raises(ValueError, match="Unknown model"):
+        registry.resolve("anthropic", "claude-2")
+
+
+def test_effective_dates(registry):
+    """Test prices are picked by effective date."""
+    assert registry.price("openai", "gpt-4o")["input"] == 2.50
+    assert registry.price("openai", "gpt-4o", on="2024-07-01")["input"] == 5.00
+    assert registry.price("openai", "gpt-4o", on="2024-10-01")["input"] == 2.50
+    # Before the first listed price, the first price applies
+    assert registry.price("openai", "gpt-4o", on="2023-01-01")["input"] == 5.00
+    assert [p["effective_from"] for p in registry.history("openai", "gpt-4o")] == ["2024-05-13", "2024-10-01"]
+
+
+def test_discount_tiers(registry):
+    """Test cached-input and batch prices, defaulting to no discount."""
+    gpt = registry.price("openai", "gpt-4o")
+    assert gpt["cached_input"] == 1.25
+    assert gpt["batch_input"] == 1.25
+    assert gpt["batch_output"] == 5.00
+
+    claude = registry.price("anthropic", "claude-3-5-sonnet-20241022")
+    assert claude["cached_input"] == 3.00
+    assert claude["batch_output"] == 15.00
+
+
+def test_table(registry):
+    """Test the flat PRICING-style table holds current canonical prices."""
+    assert registry.table()["openai"] == {"gpt-4o": {"input": 2.50, "output": 10.00}}
+
+
+def test_bundled_call_site_names():
+    """Test the model names used across the agents all have prices."""
+    registry = default_registry()
+    for provider, model in [
+        ("openrouter", "openai/gpt-4o-mini"),
+        ("openrouter", "anthropic/claude-3.5-sonnet"),
+        ("openrouter", "deepseek/deepseek-chat"),
+        ("anthropic", "claude-sonnet-4-20250514"),
+        ("perplexity", "sonar-pro"),
+    ]:
+        assert registry.price(provider, model)["input"] > 0
+
+
+def test_calculate_cost_with_alias_cache_and_batch():
+    """Test calculate_cost resolves aliases and applies discount tiers."""
+    tokens = {"prompt_tokens": 1000, "completion_tokens": 500, "total_tokens": 1500}
+    assert calculate_cost("openrouter", "openai/gpt-4o", tokens)["total_cost"] == pytest.approx(0.0075)
+
+    # 400 of the 1000 prompt tokens hit the cache at $1.25/1M
+    cached = calculate_cost("openai", "gpt-4o", {**tokens, "cached_tokens": 400})
+    assert cached["prompt_cost"] == pytest.approx(0.0015 + 0.0005)
+
+    batch = calculate_cost("openai", "gpt-4o", tokens, batch=True)
+    assert batch["total_cost"] == pytest.approx(0.00375)
+
+    assert get_pricing("openai", "gpt-4o", on="2024-07-01")["input"] == 5.00
@@ -195,3 +195,50 @@ def test_cheapest_to_most_expensive():
     print("\n=== Cost Comparison (1M input tokens) ===")
     for provider, model, cost in costs:
         print(f"{provider:10s} {model:30s} ${cost:.2f}")
+
+
+def test_calculate_costs_bulk_matches_calculate_cost():
+    """Test bulk costs agree with per-call costs and total by canonical model."""
+    np = pytest.importorskip("numpy")
+    from agent_utils import calculate_costs_bulk
+
+    providers = ["openai", "openrouter", "anthropic", "openai"]
+    models = ["gpt-4o", "openai/gpt-4o", "claude-3.5-sonnet", "mystery-model"]
+    prompt = [1000, 2000, 2000, 1000]
+    completion = [500, 0, 1000, 500]
+
+    costs = calculate_costs_bulk(providers, models, prompt, completion)
+
+    for i in range(3):
+        expected = calculate_cost(providers[i], models[i], {
+            "prompt_tokens": prompt[i], "completion_tokens": completion[i], "total_tokens": 0})
+        assert costs["total_cost"][i] == pytest.approx(expected["total_cost"])
+    assert np.isnan(costs["total_cost"][3])
+    assert costs["priced"].tolist() == [True, True, True, False]
+
+    totals = costs["totals"]
+    assert totals["openai/gpt-4o"]["calls"] == 2
+    assert totals["openai/gpt-4o"]["cost"] == pytest.approx(0.0125)
+    assert totals["anthropic/claude-3-5-sonnet-20241022"]["cost"] == pytest.approx(0.021)
+    assert totals["openai/mystery-model"]["unpriced_calls"] == 1
+    assert costs["total"] == pytest.approx(0.0335)
+
+
+def test_calculate_costs_bulk_group_by_and_tiers():
+    """Test custom grouping, broadcast columns, cached tokens and batch pricing."""
+    pytest.importorskip("numpy")
+    from agent_utils import calculate_costs_bulk
+
+    costs = calculate_costs_bulk(
+        "openai", "gpt-4o", [1000, 1000, 1000], [500, 500, 500],
+        cached_tokens=[400, 0, 0], group_by=["2025-02-01", "2025-02-01", "2025-02-02"],
+    )
+    assert costs["prompt_cost"][0] == pytest.approx(0.002)
+    assert costs["totals"]["2025-02-01"]["calls"] == 2
+    assert costs["totals"]["2025-02-01"]["cost"] == pytest.approx(0.0145)
+
+    batch = calculate_costs_bulk("openai", "gpt-4o", [1000], [500], batch=True)
+    assert batch["total"] == pytest.approx(0.00375)
+
+    with pytest.raises(ValueError):
+        calculate_costs_bulk(["openai"], "gpt-4o", [1000, 1000], [500, 500])
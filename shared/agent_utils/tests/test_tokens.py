@@ -0,0 +1,141 @@
+"""Tests for token counting."""
+
+import warnings
+
+import pytest
+from agent_utils import count_tokens, count_tokens_many, preflight
+from agent_utils.tokens import (
+    FAMILIES,
+    calibrate,
+    chars_per_token,
+    context_window,
+    count_message_tokens,
+    get_encoder,
+    model_family,
+    reset_calibration,
+)
+
+
+@pytest.fixture(autouse=True)
+def _reset_calibration():
+    reset_calibration()
+    yield
+    reset_calibration()
+
+
+def _require_encoder(encoding):
+    """Skip exact-count tests when tiktoken or the encoding file is unavailable."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        encoder = get_encoder(encoding)
+    if encoder is None:
+        pytest.skip(f"tiktoken encoding {encoding} unavailable")
+    return encoder
+
+
+def test_model_family_resolution():
+    """Test model names map to the right counting family."""
+    assert model_family("gpt-4o") == "openai-o200k"
+    assert model_family("openai/gpt-4o-mini") == "openai-o200k"
+    assert model_family("gpt-4") == "openai-cl100k"
+    assert model_family("gpt-3.5-turbo") == "openai-cl100k"
+    assert model_family("claude-3-5-sonnet-20241022") == "anthropic"
+    assert model_family("anthropic/claude-3-haiku") == "anthropic"
+    assert model_family("deepseek/deepseek-chat") == "deepseek"
+    assert model_family("google/gemini-2.0-flash-001") == "openai-cl100k"
+
+
+def test_context_window():
+    """Test model-specific windows override family defaults."""
+    assert context_window("gpt-4o") == 128_000
+    assert context_window("gpt-4-turbo") == 128_000
+    assert context_window("gpt-4") == 8_192
+    assert context_window("claude-3-opus-20240229") == 200_000
+    assert context_window("meta-llama/llama-3.1-70b-instruct") is None
+    assert context_window("mistralai/mistral-large") is None
+
+
+def test_count_tokens_approx():
+    """Test approximate counting uses the family ratio."""
+    text = "a" * 410
+    assert count_tokens(text, "gpt-4o", mode="approx") == 100
+    assert count_tokens("", "gpt-4o", mode="approx") == 0
+
+
+def test_count_tokens_many_matches_single():
+    """Test batch counts equal per-text counts, in order."""
+    texts = ["Hello world", "", "A longer sentence about product intelligence."]
+    for mode in ("approx", "exact"):
+        assert count_tokens_many(texts, "gpt-4o", mode=mode) == [
+            count_tokens(text, "gpt-4o", mode=mode) for text in texts
+        ]
+
+
+def test_calibrate_with_exact_counts():
+    """Test calibration updates the approx ratio for the whole family."""
+    ratio = calibrate(["x" * 500], "gpt-4o-mini", exact_counts=[100])
+    assert ratio == 5.0
+    assert chars_per_token("gpt-4o") == 5.0
+    assert count_tokens("x" * 50, "gpt-4o", mode="approx") == 10
+    # Other families keep their defaults
+    assert chars_per_token("claude-3-haiku") == FAMILIES["anthropic"]["chars_per_token"]
+
+
+def test_calibrate_empty():
+    """Test calibration rejects empty samples."""
+    with pytest.raises(ValueError, match="non-empty"):
+        calibrate([""], "gpt-4o", exact_counts=[0])
+
+
+def test_count_message_tokens_overhead():
+    """Test chat overhead is added per message and per request."""
+    messages = [{"role": "system", "content": ""}, {"role": "user", "content": ""}]
+    assert count_message_tokens(messages, "gpt-4o", mode="approx") == 2 * 4 + 3
+
+
+def test_preflight_fits():
+    """Test preflight reports totals and whether the call fits."""
+    check = preflight("System", "User " * 100, "gpt-4o", max_output_tokens=1000)
+    assert check["fits"] is True
+    assert check["total_tokens"] == check["prompt_tokens"] + 1000
+    assert check["context_window"] == 128_000
+
+
+def test_preflight_too_large():
+    """Test preflight flags prompts over the context window."""
+    check = preflight("System", "word " * 10_000, "gpt-4", max_output_tokens=1000)
+    assert check["fits"] is False
+
+    check = preflight("System", "User", "gpt-4o", max_output_tokens=500, context_limit=100)
+    assert check["fits"] is False
+
+
+def test_preflight_unknown_model_warns():
+    """Test a model with an unknown window skips the size check with a warning."""
+    with pytest.warns(UserWarning, match="Unknown context window"):
+        check = preflight("System " * 300, "User", "google/gemini-2.0-flash-001", max_output_tokens=8000)
+    assert check["fits"] is True
+    assert check["context_window"] is None
+
+    check = preflight("System", "User", "qwen/qwen-2.5-72b-instruct", max_output_tokens=500, context_limit=100)
+    assert check["fits"] is False
+
+
+def test_count_tokens_exact_openai():
+    """Test exact counts against known tiktoken output."""
+    encoder = _require_encoder("o200k_base")
+    text = "Hello world"
+    assert count_tokens(text, "gpt-4o") == len(encoder.encode(text))
+
+
+def test_count_tokens_exact_anthropic_correction():
+    """Test Anthropic counts are the cl100k count scaled up."""
+    encoder = _require_encoder("cl100k_base")
+    text = "The quick brown fox jumps over the lazy dog. " * 20
+    base = len(encoder.encode(text))
+    assert count_tokens(text, "claude-3-5-sonnet-20241022") > base
+
+
+def test_encoder_is_memoized():
+    """Test encoders are loaded once per encoding."""
+    assert get_encoder("cl100k_base") is get_encoder("cl100k_base")
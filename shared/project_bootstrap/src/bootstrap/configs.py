@@ -272,20 +272,46 @@ def track_tokens(response: Any) -> Dict[str, int]:
     return {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
 
 
-def log_tokens(tokens: Dict[str, int], operation: str, log_dir: Path = None) -> None:
+def log_tokens(
+    tokens: Dict[str, int],
+    operation: str,
+    log_dir: Path = None,
+    provider: str = None,
+    model: str = None,
+    latency_ms: float = None,
+) -> None:
     """
-    Log token usage to file.
+    Log token usage.
+
+    With agent_utils installed (and provider/model given), calls go to the
+    shared SQLite cost ledger (logs/cost_ledger.sqlite), which supports spend
+    and latency queries. Otherwise they are appended to logs/token_usage.jsonl.
 
     Args:
         tokens: Token usage dictionary
-        operation: Name of the operation
+        operation: Name of the operation (recorded as the ledger stage)
         log_dir: Directory to save logs (default: logs/)
+        provider: LLM provider (for the ledger)
+        model: Model name (for the ledger)
+        latency_ms: Call latency in milliseconds (for the ledger)
     """
     if log_dir is None:
         log_dir = Path(__file__).parent.parent.parent / "logs"
 
     log_dir.mkdir(exist_ok=True)
 
+    if provider and model:
+        try:
+            from agent_utils import CostLedger
+        except ImportError:
+            CostLedger = None
+
+        if CostLedger is not None:
+            ledger = CostLedger(log_dir / "cost_ledger.sqlite")
+            ledger.record(Path(__file__).parent.name, operation, provider, model, tokens, latency_ms=latency_ms)
+            ledger.close()
+            return
+
     timestamp = datetime.now().isoformat()
     log_entry = {
         "timestamp": timestamp,
@@ -501,7 +527,7 @@ def process(input_data: AgentInput) -> AgentOutput:
 
     # Track tokens and calculate cost
     tokens = track_tokens(response)
-    log_tokens(tokens, "process")
+    log_tokens(tokens, "process", provider="{context['llm_provider']}", model="gpt-4o")
 
     cost = calculate_cost("{context['llm_provider']}", "gpt-4o", tokens)
     print(f"💰 Cost: ${{cost['total_cost']:.4f}} ({{tokens['total_tokens']}} tokens)")